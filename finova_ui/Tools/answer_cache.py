@@ -0,0 +1,104 @@
+# Tools/answer_cache.py
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Optional
+
+from Tools.data_version import data_version
+from Tools.metrics import get_registry
+
+# Answers kept before the least recently used ones are evicted
+DEFAULT_MAX_ENTRIES = int(os.getenv("FINOVA_CHAT_CACHE_SIZE", "256"))
+
+# Seconds an answer stays valid even if the data doesn't change
+DEFAULT_TTL_SECONDS = float(os.getenv("FINOVA_CHAT_CACHE_TTL", "3600"))
+
+_NON_WORD_RE = re.compile(r"[^a-z0-9₹.]+")
+
+
+def normalize_question(question: str) -> str:
+    """Lowercase words and numbers only, so case, punctuation and spacing don't split a question."""
+    return " ".join(_NON_WORD_RE.sub(" ", str(question).lower()).split()).strip(" .")
+
+
+class AnswerCache:
+    """
+    In-memory cache of chat answers.
+
+    Keys combine the normalized question, the data version (Tools/data_version.py)
+    and today's date, so answers are dropped as soon as transactions are
+    written and relative questions ("last month") are re-asked the next
+    day. Entries expire after `ttl_seconds`; beyond `max_entries` the least
+    recently used one is evicted.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(question: str, *extra) -> str:
+        """Cache key of `question` on the current data; `extra` adds more context (e.g. row count)."""
+        payload = [normalize_question(question), data_version(), date.today().isoformat(), *extra]
+        return hashlib.sha256(json.dumps(payload, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[object]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl_seconds:
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.entries.move_to_end(key)
+                self.hits += 1
+
+        get_registry().incr("cache_misses" if entry is None else "cache_hits", cache="chat")
+        return None if entry is None else entry[1]
+
+    def put(self, key: str, answer):
+        with self._lock:
+            self.entries[key] = (time.monotonic(), answer)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self.entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache() -> AnswerCache:
+    """Process-wide chat answer cache (shared by all Streamlit sessions)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache()
+        return _cache
@@ -0,0 +1,210 @@
+# Tools/category_cache.py
+
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from Tools.local_store import load_json, save_json
+from Tools.merchant_tools import normalize_merchants
+from Tools.metrics import get_registry
+
+CACHE_FILE = "category_cache.json"
+CACHE_COLLECTION = "category_cache"
+
+# Version of the cache key scheme, stored with the entries. Bump it when
+# cache_keys changes; files saved under an older scheme are re-keyed on load.
+#   1: normalize_description (no version stored)
+#   2: merchant key (Tools/merchant_tools.py)
+#   3: merchant key without UPI app notes; none for nameless P2P payments
+KEY_VERSION = 3
+
+# Most descriptions kept before the least recently used ones are evicted
+DEFAULT_MAX_ENTRIES = int(os.getenv("FINOVA_CATEGORY_CACHE_SIZE", "50000"))
+
+_NON_WORD_RE = re.compile(r"[^A-Z&]+")
+
+
+def normalize_description(description) -> str:
+    """
+    Cache key for a description: upper-case letters only, so reference
+    numbers, UPI ids and punctuation don't split the same merchant.
+    """
+    return " ".join(_NON_WORD_RE.sub(" ", str(description).upper()).split())
+
+
+def cache_keys(descriptions) -> List[str]:
+    """
+    Cache keys for many descriptions: the merchant key, so channel prefixes,
+    UPI handles and city suffixes don't split the same merchant either.
+    Descriptions without one (person-to-person payments naming no payee)
+    get None and are never cached.
+    """
+    return normalize_merchants(list(descriptions))["merchant_key"].tolist()
+
+
+def _mongo_enabled() -> bool:
+    return os.getenv("FINOVA_CATEGORY_CACHE_MONGO", "").lower() in ("1", "true", "yes")
+
+
+class CategoryCache:
+    """
+    Persistent merchant key → category memo for Agent 6.
+
+    Entries live in an LRU-ordered dict that is saved as JSON in the local
+    data directory, so the cache works without MongoDB. When
+    FINOVA_CATEGORY_CACHE_MONGO is set, entries are also mirrored to the
+    `category_cache` collection and merged in on load.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, use_mongo: bool = None):
+        self.max_entries = max_entries
+        self.use_mongo = _mongo_enabled() if use_mongo is None else use_mongo
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    # ---------------------------------------
+    # Persistence
+    # ---------------------------------------
+    def _load(self):
+        data = load_json(CACHE_FILE, default={}) or {}
+        entries = data.get("entries", [])
+        version = data.get("key_version", 1)
+        if entries and version != KEY_VERSION:
+            entries = self._migrate(entries, version)
+        for key, category in entries:
+            self.entries[key] = category
+
+        if self.use_mongo:
+            try:
+                query = {"key_version": KEY_VERSION}
+                for doc in self._collection().find(query, {"category": 1}):
+                    self.entries.setdefault(doc["_id"], doc["category"])
+            except Exception as e:
+                print(f"Category cache: could not load from MongoDB: {e}")
+
+        self._evict()
+        if entries and version != KEY_VERSION:
+            self.save()
+
+    @staticmethod
+    def _migrate(entries, version: int) -> list:
+        """
+        Re-key entries saved under an older key scheme. Older keys are
+        letters-only descriptions, which give the same merchant key as the
+        descriptions they came from; later entries win where keys merge.
+        Entries of an unknown (newer) scheme are dropped.
+        """
+        if version > KEY_VERSION:
+            print(f"Category cache: dropping {len(entries)} entries of key version {version}")
+            return []
+        keys = cache_keys([key for key, _ in entries])
+        migrated = [(new_key, category) for new_key, (_, category) in zip(keys, entries) if new_key]
+        print(f"Category cache: re-keyed {len(entries)} entries from key version {version} "
+              f"to {KEY_VERSION} ({len(dict(migrated))} distinct keys)")
+        return migrated
+
+    def _collection(self):
+        from Tools.mongo_tools import get_mongo_client
+
+        client = get_mongo_client()
+        return client[os.getenv("FINOVA_DB_NAME")][CACHE_COLLECTION]
+
+    def save(self):
+        """Write the cache to the local data directory."""
+        with self._lock:
+            entries = list(self.entries.items())
+        save_json(CACHE_FILE, {"key_version": KEY_VERSION, "entries": entries})
+
+    def _save_to_mongo(self, mapping: Dict[str, str]):
+        from pymongo import UpdateOne
+
+        now = pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S")
+        ops = [
+            UpdateOne({"_id": key}, {"$set": {"category": category, "key_version": KEY_VERSION,
+                                              "updated_at": now}}, upsert=True)
+            for key, category in mapping.items()
+        ]
+        try:
+            self._collection().bulk_write(ops, ordered=False)
+        except Exception as e:
+            print(f"Category cache: could not write to MongoDB: {e}")
+
+    # ---------------------------------------
+    # Lookup / store
+    # ---------------------------------------
+    def _evict(self):
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def lookup(self, descriptions) -> List[Optional[str]]:
+        """Return the cached category per description, or None on a miss."""
+        results = []
+        keys = cache_keys(descriptions)
+        with self._lock:
+            for key in keys:
+                category = None if key is None else self.entries.get(key)
+                if category is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    self.entries.move_to_end(key)
+                results.append(category)
+
+        hits = sum(category is not None for category in results)
+        registry = get_registry()
+        registry.incr("cache_hits", hits, cache="category")
+        registry.incr("cache_misses", len(results) - hits, cache="category")
+        return results
+
+    def store(self, descriptions, categories, persist: bool = True):
+        """Remember the categories (e.g. LLM answers) for these descriptions."""
+        mapping = {
+            key: category
+            for key, category in zip(cache_keys(descriptions), categories)
+            if key is not None and isinstance(category, str) and category
+        }
+        if not mapping:
+            return
+
+        with self._lock:
+            for key, category in mapping.items():
+                self.entries[key] = category
+                self.entries.move_to_end(key)
+            self._evict()
+
+        if persist:
+            self.save()
+            if self.use_mongo:
+                self._save_to_mongo(mapping)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self.entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_category_cache() -> CategoryCache:
+    """Process-wide category cache, loaded on first use."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = CategoryCache()
+        return _cache
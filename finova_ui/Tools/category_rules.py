@@ -0,0 +1,128 @@
+# Tools/category_rules.py
+
+import re
+from typing import List, Optional
+
+import pandas as pd
+
+# Standard categories used by Agent 6
+STANDARD_CATEGORIES = [
+    "Groceries",
+    "Transport",
+    "Dining",
+    "Shopping",
+    "Bills & Utilities",
+    "Healthcare",
+    "Entertainment",
+    "Rent",
+    "Salary",
+    "Transfer",
+    "Investment",
+    "Other",
+]
+
+# Keyword / regex rules per category, checked in this order so that the
+# more specific category wins (e.g. "SALARY FUND TRANSFER" is Salary, not
+# Transfer, and "AMAZON PRIME VIDEO" is Entertainment, not Shopping).
+CATEGORY_RULES = [
+    ("Salary", [r"\bSALARY\b", r"\bPAYROLL\b", r"\bSAL CR\b"]),
+    ("Rent", [r"\bRENT\b"]),
+    ("Investment", [
+        r"\bSIP\b", r"MUTUAL FUND", r"FIXED DEPOSIT", r"\bZERODHA\b", r"\bGROWW\b",
+        r"\bPPF\b", r"\bNPS\b",
+    ]),
+    ("Bills & Utilities", [
+        r"ELECTRICITY", r"\bBSES\b", r"WATER BILL", r"GAS BILL", r"INTERNET BILL",
+        r"BROADBAND", r"\bFIBER\b", r"MOBILE RECHARGE", r"\bRECHARGE\b", r"\bDTH\b",
+        r"\bAIRTEL\b", r"\bJIO\b", r"\bVODAFONE\b", r"\bUTILITY\b",
+    ]),
+    ("Healthcare", [
+        r"PHARMACY", r"PHARMEASY", r"\bAPOLLO\b", r"HOSPITAL", r"\bCLINIC\b",
+        r"\bMEDICAL\b", r"DIAGNOSTIC", r"\b1MG\b",
+    ]),
+    ("Groceries", [
+        r"GROCER", r"BIG ?BAZAAR", r"\bD-?MART\b", r"BIG ?BASKET", r"\bBLINKIT\b",
+        r"\bZEPTO\b", r"\bINSTAMART\b", r"\bGROFERS\b", r"RELIANCE (?:FRESH|SMART)",
+        r"NATURES BASKET", r"SUPERMARKET", r"HYPERMARKET",
+    ]),
+    ("Dining", [
+        r"RESTAURANT", r"\bZOMATO\b", r"\bSWIGGY\b", r"\bCAFE\b", r"DOMINO", r"PIZZA",
+        r"MC ?DONALD", r"\bKFC\b", r"STARBUCKS", r"BIRYANI",
+    ]),
+    ("Transport", [
+        r"\bUBER\b", r"\bOLA\b", r"\bRAPIDO\b", r"\bIRCTC\b", r"\bMETRO\b", r"\bFUEL\b",
+        r"PETROL", r"INDIAN OIL", r"\bIOCL\b", r"\bHPCL\b", r"\bBPCL\b",
+        r"BHARAT PETROLEUM", r"FASTAG",
+    ]),
+    ("Entertainment", [
+        r"NETFLIX", r"SPOTIFY", r"HOTSTAR", r"PRIME VIDEO", r"BOOKMYSHOW", r"\bPVR\b",
+        r"\bINOX\b", r"MOVIE",
+    ]),
+    ("Shopping", [
+        r"AMAZON", r"FLIPKART", r"MYNTRA", r"\bAJIO\b", r"\bNYKAA\b", r"\bMEESHO\b",
+        r"SNAPDEAL", r"ONLINE SHOPPING", r"CLOTHING", r"LIFESTYLE", r"SHOPPERS STOP",
+        r"PANTALOONS", r"WESTSIDE", r"DECATHLON",
+    ]),
+    # NEFT / IMPS / RTGS only name the channel: payments to a merchant or
+    # an insurer go through them too, so those rows are left to the LLM
+    ("Transfer", [
+        r"\bATM\b.*\b(?:WDL|WD|WITHDRAWAL)\b", r"CASH WITHDRAWAL",
+        r"BANK TRANSFER", r"FUND TRANSFER", r"SELF TRANSFER",
+    ]),
+    ("Other", [r"OPENING BALANCE", r"CLOSING BALANCE"]),
+]
+
+# Descriptions that look like a rule hit but usually mean something else;
+# these always go to the LLM.
+AMBIGUOUS_PATTERNS = [r"\bREFUND\b", r"\bREVERSAL\b", r"\bCASHBACK\b", r"\bCHARGEBACK\b"]
+
+_COMPILED_RULES = [
+    (category, re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE))
+    for category, patterns in CATEGORY_RULES
+]
+_AMBIGUOUS_RE = re.compile("|".join(AMBIGUOUS_PATTERNS), re.IGNORECASE)
+_LABEL_RE = re.compile(r"[^a-z]+")
+_STANDARD_BY_LABEL = {
+    _LABEL_RE.sub("", category.lower().replace("&", "and")): category
+    for category in STANDARD_CATEGORIES
+}
+
+
+def standard_category(label) -> Optional[str]:
+    """
+    The STANDARD_CATEGORIES entry a model's label stands for, ignoring case,
+    spacing and "&" vs "and" ("bills and utilities" -> "Bills & Utilities");
+    None for anything else.
+    """
+    if not isinstance(label, str):
+        return None
+    return _STANDARD_BY_LABEL.get(_LABEL_RE.sub("", label.lower().replace("&", "and")))
+
+
+def categorize_by_rules(descriptions) -> List[Optional[str]]:
+    """
+    Categorize descriptions with the keyword rules.
+
+    Each distinct description is matched once (one vectorized pass per
+    category), so a million rows of repeating merchants take well under
+    a second.
+
+    Returns:
+        list with a category per description, or None where no rule
+        matches confidently (those rows need the LLM).
+    """
+    codes, uniques = pd.factorize(pd.Series(descriptions, dtype=object).fillna("").astype(str))
+    uniques = pd.Series(uniques)
+
+    categories = pd.Series(None, index=uniques.index, dtype=object)
+    for category, pattern in _COMPILED_RULES:
+        unmatched = categories.isna()
+        if not unmatched.any():
+            break
+        hits = uniques[unmatched].str.contains(pattern)
+        categories[hits[hits].index] = category
+
+    categories[uniques.str.contains(_AMBIGUOUS_RE)] = None
+
+    by_unique = [c if isinstance(c, str) else None for c in categories.tolist()]
+    return [by_unique[c] for c in codes]
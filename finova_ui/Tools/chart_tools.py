@@ -5,7 +5,9 @@ from typing import List, Dict, Tuple
 
 import matplotlib.pyplot as plt
 import pandas as pd
+from matplotlib.figure import Figure
 
+from Tools.merchant_tools import normalize_merchants
 
 # Soft pastel theme
 plt.rcParams.update({
@@ -34,6 +36,15 @@ def _to_dataframe(transactions: List[Dict]) -> pd.DataFrame:
     # Net flow per transaction
     df["net"] = df["credit"] - df["debit"]
 
+    # Merchant key, for transactions stored before it was extracted at parse time
+    if "merchant_key" not in df.columns or df["merchant_key"].isna().any():
+        keys = normalize_merchants(df.get("description", pd.Series("", index=df.index)).tolist())
+        keys.index = df.index
+        if "merchant_key" in df.columns:
+            df["merchant_key"] = df["merchant_key"].fillna(keys["merchant_key"])
+        else:
+            df["merchant_key"] = keys["merchant_key"]
+
     return df
 
 
@@ -42,6 +53,12 @@ def _ensure_output_dir(output_dir: str) -> str:
     return output_dir
 
 
+def _save(fig: Figure, path: str) -> str:
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
 def generate_insight_charts(
     transactions: List[Dict],
     output_dir: str = "finova_ui/charts",
@@ -57,66 +74,60 @@ def generate_insight_charts(
             - highest_debit: {description, amount, date} or None
             - highest_credit: {description, amount, date} or None
             - top_categories: list of {category, amount}
+            - top_merchants: list of {merchant, amount, count}
+            - recurring_payments: list of {merchant, months, average_amount}
         chart_paths: dict with keys:
             - "category_spend"
             - "balance_trend"
           and values as file paths to the saved PNGs.
     """
+    summary_data, chart_paths = generate_flow_charts(transactions, output_dir)
+    category_summary, category_paths = generate_category_charts(transactions, output_dir)
+    return {**summary_data, **category_summary}, {**category_paths, **chart_paths}
+
+
+def generate_flow_charts(
+    transactions: List[Dict],
+    output_dir: str = "finova_ui/charts",
+) -> Tuple[Dict, Dict[str, str]]:
+    """
+    The part of generate_insight_charts that doesn't need categories: the
+    balance trend chart and every summary key but top_categories. It can
+    run on freshly parsed transactions while they are being categorized.
+
+    Charts are drawn on their own Figure objects, not pyplot's current
+    figure, so this and generate_category_charts can run in parallel
+    threads.
+    """
     output_dir = _ensure_output_dir(output_dir)
     df = _to_dataframe(transactions)
     print(df)
     chart_paths: Dict[str, str] = {}
 
     # -----------------------------
-    # 1. Category Spending Pie Chart (Debits only)
-    # -----------------------------
-    debit_only = df[df["debit"] > 0]
-    if not debit_only.empty:
-        cat = debit_only.groupby("category").agg(total_spend=("debit", "sum"))
-        cat = cat.reset_index()
-
-        plt.figure()
-        plt.pie(
-            cat["total_spend"],
-            labels=cat["category"],
-            autopct="%1.1f%%",
-            startangle=140,
-            colors=PASTEL_COLORS,
-        )
-        plt.title("Spending by Category (Debits)")
-        plt.tight_layout()
-
-        cat_path = os.path.join(output_dir, "category_spend.png")
-        plt.savefig(cat_path)
-        plt.close()
-        chart_paths["category_spend"] = cat_path
-        print("Cat Path: " + cat_path)
-
-    # -----------------------------
-    # 2. Daily Balance Trend Line Chart
+    # 1. Daily Balance Trend Line Chart
     # -----------------------------
     if "balance" in df.columns:
         bal_df = df.dropna(subset=["date", "balance"]).copy()
         if not bal_df.empty:
             bal_df = bal_df.sort_values("date")
 
-            plt.figure()
-            plt.plot(bal_df["date"], bal_df["balance"])
-            plt.xlabel("Date")
-            plt.ylabel("Balance")
-            plt.title("Daily Account Balance Trend")
-            plt.xticks(rotation=45)
-            plt.tight_layout()
-
-            bal_path = os.path.join(output_dir, "balance_trend.png")
-            plt.savefig(bal_path)
-            plt.close()
+            fig = Figure()
+            ax = fig.subplots()
+            ax.plot(bal_df["date"], bal_df["balance"])
+            ax.set_xlabel("Date")
+            ax.set_ylabel("Balance")
+            ax.set_title("Daily Account Balance Trend")
+            ax.tick_params(axis="x", labelrotation=45)
+
+            bal_path = _save(fig, os.path.join(output_dir, "balance_trend.png"))
             chart_paths["balance_trend"] = bal_path
             print("Bal Path: " + bal_path)
 
     # -----------------------------
-    # 3. Build structured summary data
+    # 2. Build structured summary data
     # -----------------------------
+    debit_only = df[df["debit"] > 0]
     total_debits = float(df["debit"].sum())
     total_credits = float(df["credit"].sum())
     net_total = total_credits - total_debits
@@ -141,24 +152,83 @@ def generate_insight_charts(
             "date": date_str,
         }
 
-    top_categories_list = []
+    top_merchants_list = []
+    recurring_list = []
     if not debit_only.empty:
-        top_cat = debit_only.groupby("category")["debit"].sum().sort_values(
-            ascending=False
-        )
-        for cat_name, amt in top_cat.head(5).items():
-            top_categories_list.append(
-                {"category": str(cat_name), "amount": float(amt)}
+        by_merchant = debit_only.groupby("merchant_key")["debit"].agg(["sum", "count"])
+        for merchant, row in by_merchant.sort_values("sum", ascending=False).head(5).iterrows():
+            top_merchants_list.append(
+                {"merchant": str(merchant), "amount": float(row["sum"]), "count": int(row["count"])}
             )
 
+        # Recurring: the same merchant debited in at least 3 different months
+        dated = debit_only.dropna(subset=["date"])
+        dated = dated.assign(month=dated["date"].dt.to_period("M"))
+        recurring = dated.groupby("merchant_key").agg(
+            months=("month", "nunique"),
+            average_amount=("debit", "mean"),
+        )
+        recurring = recurring[recurring["months"] >= 3].sort_values("months", ascending=False)
+        for merchant, row in recurring.iterrows():
+            recurring_list.append({
+                "merchant": str(merchant),
+                "months": int(row["months"]),
+                "average_amount": float(row["average_amount"]),
+            })
+
     summary_data: Dict = {
         "total_credits": total_credits,
         "total_debits": total_debits,
         "net_cashflow": net_total,
         "highest_debit": highest_debit,
         "highest_credit": highest_credit,
-        "top_categories": top_categories_list,
+        "top_merchants": top_merchants_list,
+        "recurring_payments": recurring_list,
     }
 
     return summary_data, chart_paths
 
+
+def generate_category_charts(
+    transactions: List[Dict],
+    output_dir: str = "finova_ui/charts",
+) -> Tuple[Dict, Dict[str, str]]:
+    """
+    The part of generate_insight_charts that needs categorized
+    transactions: the category spend chart and top_categories.
+    """
+    output_dir = _ensure_output_dir(output_dir)
+    df = _to_dataframe(transactions)
+    chart_paths: Dict[str, str] = {}
+    top_categories_list = []
+
+    # -----------------------------
+    # Category Spending Pie Chart (Debits only)
+    # -----------------------------
+    debit_only = df[df["debit"] > 0]
+    if not debit_only.empty:
+        cat = debit_only.groupby("category").agg(total_spend=("debit", "sum"))
+        cat = cat.reset_index()
+
+        fig = Figure()
+        ax = fig.subplots()
+        ax.pie(
+            cat["total_spend"],
+            labels=cat["category"],
+            autopct="%1.1f%%",
+            startangle=140,
+            colors=PASTEL_COLORS,
+        )
+        ax.set_title("Spending by Category (Debits)")
+
+        cat_path = _save(fig, os.path.join(output_dir, "category_spend.png"))
+        chart_paths["category_spend"] = cat_path
+        print("Cat Path: " + cat_path)
+
+        top_cat = cat.set_index("category")["total_spend"].sort_values(ascending=False)
+        for cat_name, amt in top_cat.head(5).items():
+            top_categories_list.append(
+                {"category": str(cat_name), "amount": float(amt)}
+            )
+
+    return {"top_categories": top_categories_list}, chart_paths
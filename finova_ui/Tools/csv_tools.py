@@ -1,16 +1,55 @@
 # Tools/csv_tools.py
 
+import re
+
 import pandas as pd
 from datetime import datetime
 
+from Tools.merchant_tools import normalize_merchants
+from Tools.profile_tools import header_signature, get_profile, save_profile
+
 COLUMN_ALIASES = {
     "date": ["date", "txn date", "transaction date", "value date", "posting date"],
     "description": ["description", "narration", "details", "particulars", "payee", "desc"],
     "debit": ["debit", "withdrawal", "spent", "dr", "debits"],
     "credit": ["credit", "deposit", "received", "cr", "credits"],
-    "balance": ["balance", "available balance", "closing balance"]
+    "balance": ["balance", "available balance", "closing balance"],
+    "amount": ["amount", "txn amount", "transaction amount"],
 }
 
+# Rows per chunk when streaming large statements
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Rows sampled when learning a new bank profile
+PROFILE_SAMPLE_SIZE = 200
+
+_THOUSANDS_RE = re.compile(r"^-?\d{1,3}(,\d{2,3})+(\.\d+)?$")
+
+# Strict date formats tried by detect_date_formats. Day-first variants come
+# before month-first ones, so ambiguous statements default to day-first.
+DATE_FORMAT_CANDIDATES = [
+    "%Y-%m-%d",
+    "%Y/%m/%d",
+    "%d-%b-%Y",
+    "%d-%b-%y",
+    "%d %b %Y",
+    "%d-%B-%Y",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+    "%d.%m.%Y",
+    "%d/%m/%y",
+    "%d-%m-%y",
+    "%m/%d/%Y",
+    "%m-%d-%Y",
+    "%m/%d/%y",
+    "%b %d, %Y",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+]
+
+# Most formats a single file is allowed to mix
+MAX_DATE_FORMATS = 3
+
 def find_column(df, possible_names):
     """Find the real column name regardless of spelling/casing."""
     df_cols = [c.lower().strip() for c in df.columns]
@@ -22,67 +61,407 @@ def find_column(df, possible_names):
     return None
 
 
-def parse_statement_csv(path=None, uploaded_file=None, bank_name="Unknown bank", account_id="Unknown"):
-    # Load CSV either from path or in-memory upload
+def _parse_date_value(raw_date: str) -> str:
+    """Parse a single raw date string the same way the row-by-row parser did."""
+    try:
+        parsed_date = pd.to_datetime(raw_date, errors="coerce").date()
+        return parsed_date.isoformat() if parsed_date else raw_date
+    except:
+        return raw_date
+
+
+def _sample_dates(series: pd.Series) -> pd.Series:
+    """First non-empty date strings of a column, in file order."""
+    sample = series.dropna().astype(str).str.strip().head(PROFILE_SAMPLE_SIZE)
+    return sample[sample != ""]
+
+
+def _order_score(parsed: pd.Series) -> float:
+    """How sorted (ascending or descending) a parsed date sample is, from 0 to 1."""
+    diffs = parsed.dropna().diff().dropna()
+    if diffs.empty:
+        return 0.0
+    return max((diffs >= pd.Timedelta(0)).mean(), (diffs <= pd.Timedelta(0)).mean())
+
+
+def detect_date_formats(series: pd.Series, preferred=None) -> list:
+    """
+    Pick strict date formats for a column by sampling it once.
+
+    Returns the format that parses every sampled value, or a small set of
+    formats (at most MAX_DATE_FORMATS) that together cover a mixed column.
+    When several formats fit (e.g. 03/04/2025 is valid day-first and
+    month-first), the one that keeps the statement in date order wins,
+    and day-first is preferred on a tie. An empty list means no format fits.
+
+    Args:
+        series: the raw date column
+        preferred: format to try first, e.g. from the bank profile
+    """
+    sample = _sample_dates(series)
+    if sample.empty:
+        return []
+
+    candidates = DATE_FORMAT_CANDIDATES
+    if preferred:
+        candidates = [preferred] + [f for f in candidates if f != preferred]
+
+    parsed_by_format = {
+        fmt: pd.to_datetime(sample, format=fmt, errors="coerce")
+        for fmt in candidates
+    }
+
+    # A preferred format that still fits is reused without further checks
+    if preferred and parsed_by_format[preferred].notna().all():
+        return [preferred]
+
+    full_matches = [fmt for fmt, parsed in parsed_by_format.items() if parsed.notna().all()]
+    if full_matches:
+        # max() keeps the first (day-first) candidate on equal scores
+        return [max(full_matches, key=lambda fmt: _order_score(parsed_by_format[fmt]))]
+
+    # Mixed column: greedily add the format covering most remaining values
+    formats = []
+    remaining = pd.Series(True, index=sample.index)
+    while remaining.any() and len(formats) < MAX_DATE_FORMATS:
+        best = max(candidates, key=lambda fmt: (parsed_by_format[fmt].notna() & remaining).sum())
+        covered = parsed_by_format[best].notna() & remaining
+        if not covered.any():
+            break
+        formats.append(best)
+        remaining &= ~covered
+
+    return formats
+
+
+def _parse_date_column(series: pd.Series, date_formats=None, stats=None) -> list:
+    """
+    Convert a whole date column to ISO strings.
+
+    Statements repeat the same few dates many times, so the column is
+    factorized and only the distinct values are converted, one vectorized
+    call per detected format. Values none of the detected formats match are
+    not guessed: they become "NaT" and are counted in
+    stats["date_parse_failures"]. Only when no format was detected at all
+    is the lenient per-value parser used (the old behaviour); those rows
+    are counted in stats["date_lenient_parses"].
+    """
+    raw = series.astype(str)
+    codes, uniques = pd.factorize(raw)
+    uniques = pd.Series(uniques)
+
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype="datetime64[ns]")
+    for date_format in date_formats or []:
+        missing = parsed.isna()
+        if not missing.any():
+            break
+        parsed[missing] = pd.to_datetime(uniques[missing], format=date_format, errors="coerce")
+
+    iso = parsed.dt.strftime("%Y-%m-%d").tolist()
+    unmatched = [i for i, value in enumerate(iso) if not isinstance(value, str)]
+    lenient = [] if date_formats else unmatched
+    for i in unmatched:
+        iso[i] = "NaT" if date_formats else _parse_date_value(uniques[i])
+
+    if stats is not None:
+        def rows(unique_ids):
+            return int(pd.Series(codes).isin(unique_ids).sum()) if unique_ids else 0
+
+        failed = [i for i in unmatched if iso[i] == "NaT"]
+        stats["date_parse_failures"] = stats.get("date_parse_failures", 0) + rows(failed)
+        guessed = [i for i in lenient if iso[i] != "NaT"]
+        stats["date_lenient_parses"] = stats.get("date_lenient_parses", 0) + rows(guessed)
+
+    return [iso[c] for c in codes]
+
+
+def _amount_column(df, col, missing=0) -> list:
+    """Convert an amount column to floats, using `missing` for blanks or absent columns."""
+    if col is None:
+        return [missing] * len(df)
+
+    values = df[col].astype(float)
+    return values.astype(object).where(values.notna(), missing).tolist()
+
+
+def transactions_from_frame(df, date_col, desc_col, debit_col, credit_col, balance_col,
+                            bank_name="Unknown bank", account_id="Unknown",
+                            date_formats=None, stats=None) -> list:
+    """
+    Build normalized transaction dicts from a DataFrame, one column at a time.
+
+    `date_formats` come from detect_date_formats; without them the date
+    column is parsed leniently value by value. Parse failures are counted
+    into the optional `stats` dict.
+    """
+    dates = _parse_date_column(df[date_col], date_formats, stats)
+    descriptions = df[desc_col].astype(str).tolist() if desc_col in df.columns else [""] * len(df)
+    debits = _amount_column(df, debit_col)
+    credits = _amount_column(df, credit_col)
+    balances = _amount_column(df, balance_col, missing=None)
+    merchants = normalize_merchants(descriptions)
+
+    return [
+        {
+            "date": date,
+            "description": description,
+            "debit": debit,
+            "credit": credit,
+            "balance": balance,
+            "bank_name": bank_name,
+            "account_id": account_id,
+            "merchant_key": merchant,
+            "channel": channel,
+            "counterparty": counterparty,
+        }
+        for date, description, debit, credit, balance, merchant, channel, counterparty
+        in zip(dates, descriptions, debits, credits, balances,
+               merchants["merchant_key"], merchants["channel"], merchants["counterparty"])
+    ]
+
+
+# ============================================================
+# Bank profiles (column mapping + formats learned per header)
+# ============================================================
+def _read_csv(path=None, uploaded_file=None, **kwargs):
+    """Read a CSV either from path or in-memory upload."""
     if uploaded_file is not None:
-        df = pd.read_csv(uploaded_file)
-    else:
-        df = pd.read_csv(path)
+        return pd.read_csv(uploaded_file, **kwargs)
+    return pd.read_csv(path, **kwargs)
 
-    df_original = df.copy()
 
-    # Normalize column names
-    df.columns = [c.lower().strip() for c in df.columns]
+def _read_header(path=None, uploaded_file=None) -> list:
+    """Read only the header row, rewinding in-memory uploads afterwards."""
+    header = _read_csv(path, uploaded_file, nrows=0)
+    if uploaded_file is not None:
+        uploaded_file.seek(0)
+    return list(header.columns)
+
+
+def _guess_description_column(df, date_col):
+    """Pick the text column with the longest values, falling back to the second column."""
+    best_col, best_len = None, 0
+    for col in df.columns:
+        if col == date_col or df[col].dtype != object:
+            continue
+        avg_len = df[col].head(PROFILE_SAMPLE_SIZE).astype(str).str.len().mean()
+        if avg_len > best_len:
+            best_col, best_len = col, avg_len
+
+    return best_col if best_col is not None else df.columns[1]
 
-    # Detect columns
-    date_col = find_column(df, COLUMN_ALIASES["date"])
-    desc_col = find_column(df, COLUMN_ALIASES["description"])
-    debit_col = find_column(df, COLUMN_ALIASES["debit"])
-    credit_col = find_column(df, COLUMN_ALIASES["credit"])
-    balance_col = find_column(df, COLUMN_ALIASES["balance"])
+
+def _resolve_columns(df) -> dict:
+    """
+    Map the standard transaction fields to the columns of this statement.
+
+    Expects column names that are already lower-cased and stripped.
+    """
+    columns = {
+        field: find_column(df, aliases)
+        for field, aliases in COLUMN_ALIASES.items()
+    }
 
     # Fallbacks if missing
-    if date_col is None:
+    if columns["date"] is None:
         raise Exception("No date-like column found.")
-    if desc_col is None:
-        desc_col = df.columns[1]   # second column as fallback
+    if columns["description"] is None:
+        columns["description"] = _guess_description_column(df, columns["date"])
+
+    return columns
+
+
+def _infer_thousands(df, columns: dict):
+    """Return ',' if the amount columns were read as text like '1,23,456.00'."""
+    for field in ("debit", "credit", "balance", "amount"):
+        col = columns.get(field)
+        if col is None or df[col].dtype != object:
+            continue
+        sample = df[col].dropna().astype(str).str.strip().head(PROFILE_SAMPLE_SIZE)
+        if sample.str.match(_THOUSANDS_RE).any():
+            return ","
+    return None
+
+
+def learn_profile(df) -> dict:
+    """Detect column mapping, date format, sign convention and thousands separator."""
+    columns = _resolve_columns(df)
+
+    if columns["debit"] is not None or columns["credit"] is not None:
+        sign_convention = "split"
+    elif columns["amount"] is not None:
+        sign_convention = "signed"
+    else:
+        sign_convention = "none"
+
+    return {
+        "columns": columns,
+        "date_format": next(iter(detect_date_formats(df[columns["date"]])), None),
+        "sign_convention": sign_convention,
+        "thousands": _infer_thousands(df, columns),
+    }
+
+
+def _profile_for(signature: str, df) -> dict:
+    """Reuse the stored profile for this header, or learn and store one."""
+    profile = get_profile(signature)
+    if profile is None:
+        profile = save_profile(signature, learn_profile(df))
+        print(f"Learned new bank profile for header: {signature}")
+    return profile
+
+
+def ensure_profile(path=None, uploaded_file=None) -> dict:
+    """
+    Stored profile for the statement's header, learned from its first
+    DEFAULT_CHUNK_SIZE rows if the header is new (as iter_statement_csv does).
+
+    Lets a caller learn profiles up front in one process, e.g. before
+    handing files to parser processes that would otherwise each learn and
+    save the same new header.
+    """
+    signature = header_signature(_read_header(path, uploaded_file))
+    profile = get_profile(signature)
+    if profile is None:
+        df = _read_csv(path, uploaded_file, nrows=DEFAULT_CHUNK_SIZE)
+        if uploaded_file is not None:
+            uploaded_file.seek(0)
+        df.columns = [c.lower().strip() for c in df.columns]
+        profile = _profile_for(signature, df)
+    return profile
+
+
+def _prepare_frame(df, profile: dict):
+    """Apply the profile's number format and derive debit/credit columns if needed."""
+    columns = profile["columns"]
+
+    # Amounts that were read as text because of thousand separators
+    if profile["thousands"]:
+        for field in ("debit", "credit", "balance", "amount"):
+            col = columns.get(field)
+            if col is not None and df[col].dtype == object:
+                df[col] = pd.to_numeric(
+                    df[col].astype(str).str.replace(profile["thousands"], "", regex=False),
+                    errors="coerce",
+                )
 
     # Convert missing debit/credit formats
-    if debit_col is None and credit_col is None:
+    if profile["sign_convention"] == "signed":
         # Case: single column for amount with +/- values
-        if "amount" in df.columns:
-            df["debit"] = df["amount"].apply(lambda x: abs(x) if x < 0 else 0)
-            df["credit"] = df["amount"].apply(lambda x: x if x > 0 else 0)
-        else:
-            # Create empty debit/credit
-            df["debit"] = 0
-            df["credit"] = 0
+        amount = df[columns["amount"]]
+        df["debit"] = (-amount).where(amount < 0, 0)
+        df["credit"] = amount.where(amount > 0, 0)
+    elif profile["sign_convention"] == "none":
+        # Create empty debit/credit
+        df["debit"] = 0
+        df["credit"] = 0
+
+    return df
+
+
+def _normalize_frame(df, profile: dict, bank_name: str, account_id: str,
+                     date_formats=None, stats=None) -> list:
+    columns = profile["columns"]
+    if profile["sign_convention"] == "split":
+        debit_col, credit_col = columns["debit"], columns["credit"]
+    else:
+        debit_col, credit_col = "debit", "credit"
+
+    return transactions_from_frame(
+        df,
+        date_col=columns["date"],
+        desc_col=columns["description"],
+        debit_col=debit_col,
+        credit_col=credit_col,
+        balance_col=columns["balance"],
+        bank_name=bank_name,
+        account_id=account_id,
+        date_formats=date_formats,
+        stats=stats,
+    )
+
+
+def _report_date_failures(stats: dict, total: int):
+    failures = stats.get("date_parse_failures", 0)
+    if failures:
+        print(f"⚠️ {failures} of {total} rows have an unparseable date")
+    lenient = stats.get("date_lenient_parses", 0)
+    if lenient:
+        print(f"⚠️ No date format detected; {lenient} of {total} rows were parsed leniently")
+
+
+def _read_options(profile) -> dict:
+    """pandas read options for a known profile (e.g. thousands separator)."""
+    if profile and profile["thousands"]:
+        return {"thousands": profile["thousands"]}
+    return {}
+
+
+# ============================================================
+# Public parsers
+# ============================================================
+def parse_statement_csv(path=None, uploaded_file=None, bank_name="Unknown bank", account_id="Unknown"):
+    signature = header_signature(_read_header(path, uploaded_file))
+    profile = get_profile(signature)
+
+    df = _read_csv(path, uploaded_file, **_read_options(profile))
+
+    # Normalize column names
+    df.columns = [c.lower().strip() for c in df.columns]
+    if profile is None:
+        profile = _profile_for(signature, df)
+
+    df = _prepare_frame(df, profile)
+
+    # Detect the date format once for this file, then convert the whole column
+    date_formats = detect_date_formats(df[profile["columns"]["date"]], profile["date_format"])
 
     # Build normalized transactions
-    transactions = []
-    for _, row in df.iterrows():
-        # Parse date safely
-        raw_date = str(row[date_col])
-
-        try:
-            parsed_date = pd.to_datetime(raw_date, errors="coerce").date()
-            parsed_date = parsed_date.isoformat() if parsed_date else raw_date
-        except:
-            parsed_date = raw_date
-
-        tx = {
-            "date": parsed_date,
-            "description": str(row.get(desc_col, "")),
-            "debit": float(row[debit_col]) if debit_col and pd.notna(row.get(debit_col)) else 0,
-            "credit": float(row[credit_col]) if credit_col and pd.notna(row.get(credit_col)) else 0,
-            "balance": float(row[balance_col]) if balance_col and pd.notna(row.get(balance_col)) else None,
-            "bank_name": bank_name,
-            "account_id": account_id,
-        }
-        transactions.append(tx)
+    stats = {"date_parse_failures": 0, "date_lenient_parses": 0}
+    transactions = _normalize_frame(df, profile, bank_name, account_id, date_formats, stats)
+    _report_date_failures(stats, len(transactions))
 
     return {
         "bank_name": bank_name,
         "account_id": account_id,
         "transactions": transactions,
+        "date_formats": date_formats,
+        "date_parse_failures": stats["date_parse_failures"],
+        "date_lenient_parses": stats["date_lenient_parses"],
     }
+
+
+def iter_statement_csv(path=None, uploaded_file=None, bank_name="Unknown bank",
+                       account_id="Unknown", chunksize=DEFAULT_CHUNK_SIZE):
+    """
+    Streaming variant of parse_statement_csv.
+
+    Reads the CSV `chunksize` rows at a time and yields lists of normalized
+    transactions, so only one chunk is held in memory at once. The bank
+    profile is looked up from the header (or learned from the first chunk)
+    and the date format is detected on the first chunk; both are reused
+    for the rest of the file.
+
+    Yields:
+        list of transaction dicts (same shape as parse_statement_csv)
+    """
+    signature = header_signature(_read_header(path, uploaded_file))
+    profile = get_profile(signature)
+    date_formats = None
+    stats = {"date_parse_failures": 0, "date_lenient_parses": 0}
+    total = 0
+
+    reader = _read_csv(path, uploaded_file, chunksize=chunksize, **_read_options(profile))
+    for df in reader:
+        df.columns = [c.lower().strip() for c in df.columns]
+        if profile is None:
+            profile = _profile_for(signature, df)
+        if date_formats is None:
+            date_formats = detect_date_formats(df[profile["columns"]["date"]], profile["date_format"])
+
+        df = _prepare_frame(df, profile)
+        batch = _normalize_frame(df, profile, bank_name, account_id, date_formats, stats)
+        total += len(batch)
+        yield batch
+
+    _report_date_failures(stats, total)
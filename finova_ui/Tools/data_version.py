@@ -0,0 +1,25 @@
+# Tools/data_version.py
+
+import time
+import uuid
+
+from Tools.local_store import load_json, save_json
+
+VERSION_FILE = "data_version.json"
+
+
+def data_version() -> str:
+    """
+    Token identifying the current state of the stored transactions. It
+    changes on every write (bump_data_version), in this process or in
+    another one sharing the data directory (CLI pipeline, batch ingest).
+    """
+    data = load_json(VERSION_FILE, default={}) or {}
+    return data.get("version", "initial")
+
+
+def bump_data_version() -> str:
+    """Record that transactions were written; caches keyed by the version go stale."""
+    version = uuid.uuid4().hex
+    save_json(VERSION_FILE, {"version": version, "updated_at": time.time()})
+    return version
@@ -0,0 +1,313 @@
+# Tools/llm_scheduler.py
+
+import asyncio
+import concurrent.futures
+import contextvars
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Iterable, Iterator, Optional
+
+from Tools.metrics import get_registry, note_retry
+
+# Quota of the Gemini project (defaults: gemini-2.0-flash free tier)
+REQUESTS_PER_MINUTE = float(os.getenv("FINOVA_GEMINI_RPM", "15"))
+TOKENS_PER_MINUTE = float(os.getenv("FINOVA_GEMINI_TPM", "1000000"))
+
+# Retries of rate-limited / transient failures, with jittered exponential backoff
+MAX_ATTEMPTS = int(os.getenv("FINOVA_GEMINI_MAX_ATTEMPTS", "5"))
+BACKOFF_BASE_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+
+# Lower value = served first. Chat is interactive, Agent 6 runs in the background.
+LANES = {"interactive": 0, "normal": 1, "background": 2}
+
+# How often a waiting request re-checks the queue at most
+_POLL_SECONDS = 0.05
+
+_current_lane = contextvars.ContextVar("finova_llm_lane", default="normal")
+
+RETRYABLE_STATUS = {408, 429, 500, 502, 503, 504}
+RETRYABLE_MARKERS = ("RESOURCE_EXHAUSTED", "UNAVAILABLE", "DEADLINE_EXCEEDED", "INTERNAL")
+
+
+@contextmanager
+def lane(name: str):
+    """
+    Run the model calls made inside this block in a priority lane:
+
+        with lane("interactive"):
+            answer = await invoke(chat_agent, question)
+
+    The lane follows asyncio tasks and threads started from the block.
+    """
+    if name not in LANES:
+        raise ValueError(f"Unknown lane {name!r}; use one of {list(LANES)}")
+    token = _current_lane.set(name)
+    try:
+        yield
+    finally:
+        _current_lane.reset(token)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """Rate limits (429), server errors, timeouts and dropped connections."""
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    if code in RETRYABLE_STATUS:
+        return True
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    if type(error).__module__.startswith(("httpx", "httpcore", "aiohttp")):
+        return True
+    return any(marker in str(error) for marker in RETRYABLE_MARKERS)
+
+
+class TokenBucket:
+    """`capacity` units refilled continuously over one minute. Not thread-safe by itself."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.available = per_minute
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.available = min(self.capacity, self.available + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.available -= amount
+
+
+class LlmScheduler:
+    """
+    Central admission control for model requests.
+
+    Every request waits for a slot in two token buckets, requests per minute
+    and tokens per minute (estimated up front, corrected with the real
+    usage afterwards). Waiting requests are served by lane, then in arrival
+    order. Rate-limited and transient failures are retried with full-jitter
+    exponential backoff. Identical requests already in flight are
+    coalesced: later callers share the first caller's result.
+
+    State is guarded by a threading lock and waiting is done by polling, so
+    one scheduler serves every thread and event loop of the process
+    (Streamlit sessions each run their own asyncio.run).
+    """
+
+    def __init__(self, requests_per_minute: float = REQUESTS_PER_MINUTE,
+                 tokens_per_minute: float = TOKENS_PER_MINUTE,
+                 max_attempts: int = MAX_ATTEMPTS):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_attempts = max_attempts
+        self._queue = []
+        self._sequence = itertools.count()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    # ---------------------------------------
+    # Admission
+    # ---------------------------------------
+    async def _admit(self, estimated_tokens: int, lane_name: str):
+        ticket = (LANES[lane_name], next(self._sequence))
+        with self._lock:
+            heapq.heappush(self._queue, ticket)
+
+        start = time.perf_counter()
+        try:
+            while True:
+                with self._lock:
+                    if self._queue[0] == ticket:
+                        wait = max(self.requests.wait_time(1),
+                                   self.tokens.wait_time(estimated_tokens))
+                        if wait == 0:
+                            self.requests.take(1)
+                            self.tokens.take(estimated_tokens)
+                            heapq.heappop(self._queue)
+                            break
+                    else:
+                        wait = _POLL_SECONDS
+                await asyncio.sleep(min(wait, 1.0) if wait else _POLL_SECONDS)
+        except BaseException:
+            with self._lock:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+            raise
+
+        get_registry().incr("scheduler_wait_seconds", time.perf_counter() - start, lane=lane_name)
+
+    def _settle(self, estimated_tokens: int, used_tokens: Optional[int]):
+        """Charge the difference between the estimate and the real token usage."""
+        if used_tokens is not None:
+            with self._lock:
+                self.tokens.take(used_tokens - estimated_tokens)
+
+    # ---------------------------------------
+    # Requests
+    # ---------------------------------------
+    async def submit(
+        self,
+        call: Callable[[], Awaitable],
+        key: str = None,
+        estimated_tokens: int = 1,
+        tokens_used: Callable[[object], Optional[int]] = None,
+        lane_name: str = None,
+    ):
+        """
+        Run `call()` (a coroutine factory, invoked once per attempt) under the
+        rate limits and return its result. `key` identifies identical
+        requests for coalescing; `tokens_used(result)` reports the real
+        token usage when the model returns it.
+        """
+        lane_name = lane_name or _current_lane.get()
+
+        if key is not None:
+            with self._lock:
+                shared = self._in_flight.get(key)
+                if shared is None:
+                    self._in_flight[key] = concurrent.futures.Future()
+            if shared is not None:
+                get_registry().incr("scheduler_coalesced", lane=lane_name)
+                return await asyncio.wrap_future(shared)
+
+        try:
+            result = await self._run(call, estimated_tokens, tokens_used, lane_name)
+        except BaseException as e:
+            if key is not None:
+                self._finish(key, error=e)
+            raise
+        if key is not None:
+            self._finish(key, result=result)
+        return result
+
+    def _finish(self, key: str, result=None, error: BaseException = None):
+        with self._lock:
+            shared = self._in_flight.pop(key)
+        if error is not None:
+            shared.set_exception(error)
+            # Retrieve it so unshared failures aren't reported as "never retrieved"
+            shared.exception()
+        else:
+            shared.set_result(result)
+
+    def _retry_delay(self, error: Exception, attempt: int, lane_name: str) -> float:
+        """Backoff before the next attempt; re-raises `error` when it must not be retried."""
+        if attempt == self.max_attempts or not is_retryable(error):
+            raise error
+        delay = random.uniform(0, min(BACKOFF_MAX_SECONDS,
+                                      BACKOFF_BASE_SECONDS * 2 ** (attempt - 1)))
+        print(f"Model request failed ({type(error).__name__}: {str(error)[:120]}); "
+              f"retry {attempt}/{self.max_attempts - 1} in {delay:.1f}s")
+        get_registry().incr("scheduler_retries", lane=lane_name)
+        note_retry()
+        return delay
+
+    async def _run(self, call, estimated_tokens, tokens_used, lane_name):
+        for attempt in range(1, self.max_attempts + 1):
+            await self._admit(estimated_tokens, lane_name)
+            try:
+                result = await call()
+            except Exception as e:
+                await asyncio.sleep(self._retry_delay(e, attempt, lane_name))
+                continue
+
+            self._settle(estimated_tokens, tokens_used(result) if tokens_used else None)
+            return result
+
+    def run_sync(self, fn: Callable, key: str = None, estimated_tokens: int = 1,
+                 tokens_used: Callable = None, lane_name: str = None):
+        """Blocking variant of submit() for sync callers: runs `fn()` in a worker thread."""
+        lane_name = lane_name or _current_lane.get()
+        return asyncio.run(self.submit(
+            lambda: asyncio.to_thread(fn),
+            key=key,
+            estimated_tokens=estimated_tokens,
+            tokens_used=tokens_used,
+            lane_name=lane_name,
+        ))
+
+    def stream_sync(self, fn: Callable[[], Iterable], estimated_tokens: int = 1,
+                    tokens_used: Callable = None, lane_name: str = None) -> Iterator:
+        """
+        Streaming variant of run_sync: yields the chunks of `fn()` (e.g.
+        generate_content_stream) as they arrive. The request is admitted
+        under the rate limits first; failures before the first chunk are
+        retried, a stream that breaks part way is not. Streams are never
+        coalesced. `tokens_used(last_chunk)` reports the real usage.
+
+        Closing the generator (e.g. the reader went away) closes the
+        underlying stream.
+        """
+        lane_name = lane_name or _current_lane.get()
+
+        for attempt in range(1, self.max_attempts + 1):
+            asyncio.run(self._admit(estimated_tokens, lane_name))
+            stream = None
+            try:
+                stream = iter(fn())
+                first = next(stream)
+            except StopIteration:
+                return
+            except Exception as e:
+                _close(stream)
+                time.sleep(self._retry_delay(e, attempt, lane_name))
+                continue
+            break
+
+        last = first
+        try:
+            yield first
+            for last in stream:
+                yield last
+        finally:
+            _close(stream)
+            self._settle(estimated_tokens, tokens_used(last) if tokens_used else None)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "waiting": len(self._queue),
+                "in_flight": len(self._in_flight),
+                "requests_available": round(self.requests.available, 2),
+                "tokens_available": round(self.tokens.available),
+            }
+
+
+def _close(stream):
+    close = getattr(stream, "close", None)
+    if close is not None:
+        close()
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> LlmScheduler:
+    """Process-wide scheduler for Gemini requests."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = LlmScheduler()
+        return _scheduler
+
+
+def estimate_tokens(text: str, expected_output: int = 256) -> int:
+    """Rough token count of a prompt (about 4 characters per token) plus the expected answer."""
+    return len(text or "") // 4 + expected_output
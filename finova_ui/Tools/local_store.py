@@ -0,0 +1,45 @@
+# Tools/local_store.py
+
+import json
+import os
+
+# Local state that must survive restarts (bank profiles, caches, models)
+DATA_DIR = os.getenv(
+    "FINOVA_DATA_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".finova_data"),
+)
+
+
+def data_path(filename: str) -> str:
+    """Return the full path of a file inside the local data directory."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
+
+
+def load_json(filename: str, default=None):
+    """Load a JSON file from the data directory, or `default` if it is missing or unreadable."""
+    path = data_path(filename)
+    if not os.path.exists(path):
+        return default
+
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        print(f"Could not read {path}: {e}")
+        return default
+
+
+def save_json(filename: str, data) -> str:
+    """
+    Write JSON to the data directory atomically (temp file + rename),
+    so a crash or a concurrent writer never leaves a half-written file.
+    """
+    path = data_path(filename)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+
+    with open(tmp_path, "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+    os.replace(tmp_path, path)
+
+    return path
@@ -0,0 +1,142 @@
+# Tools/merchant_tools.py
+
+import re
+
+import pandas as pd
+
+# Payment channel detected from the description (the earliest match wins)
+CHANNEL_PATTERNS = [
+    ("UPI", r"\bUPI\b"),
+    ("NEFT", r"\bNEFT\b"),
+    ("IMPS", r"\bIMPS\b"),
+    ("RTGS", r"\bRTGS\b"),
+    ("ATM", r"\bATM\b|CASH WITHDRAWAL"),
+    ("POS", r"\bPOS\b|CARD PURCHASE|DEBIT CARD|CREDIT CARD"),
+    ("ECS", r"\bECS\b|\bNACH\b|AUTO ?DEBIT|\bSI\b"),
+    ("CHEQUE", r"\bCHQ\b|\bCHEQUE\b|\bCLG\b"),
+    ("ONLINE", r"\bONLINE\b|NET ?BANKING|\bNETBANKING\b"),
+]
+
+# Channel prefixes and banking boilerplate removed before the merchant name
+_PREFIX_PATTERNS = [
+    r"\bPOS CARD PURCHASE\b", r"\bCARD PURCHASE\b", r"\bDEBIT CARD\b",
+    r"\bATM CASH WITHDRAWAL\b", r"\bCASH WITHDRAWAL\b",
+    r"\bBANK TRANSFER\b", r"\bFUND TRANSFER\b",
+    r"\bONLINE (?:PURCHASE|SHOPPING|PAYMENT)\b",
+    r"\b(?:UPI|NEFT|IMPS|RTGS|POS|ECS|NACH|CHQ|CLG)\b",
+]
+
+# Filler words that don't identify a merchant
+_NOISE_WORDS = [
+    "PAYMENT", "PAYMENTS", "PURCHASE", "ORDER", "TXN", "REF", "CR", "DR",
+    "TO", "FROM", "BY", "VIA", "FOR", "CREDIT", "DEBIT",
+    "PVT", "PRIVATE", "LTD", "LIMITED", "INDIA", "COM", "IN", "SUBSCRIPTION",
+    # Default notes of UPI apps ("Payment from Phone", "Sent using Paytm UPI")
+    "PHONE", "MOBILE", "APP", "SENT", "USING", "RECEIVED", "COLLECT", "REQUEST",
+]
+
+# City suffixes that split one merchant into many ("BIG BAZAAR GHAZIABAD")
+_CITY_SUFFIXES = [
+    "GHAZIABAD", "NOIDA", "DELHI", "NEW DELHI", "GURGAON", "GURUGRAM", "MUMBAI",
+    "PUNE", "BANGALORE", "BENGALURU", "CHENNAI", "HYDERABAD", "KOLKATA",
+    "AHMEDABAD", "JAIPUR", "LUCKNOW", "CHANDIGARH", "INDORE", "BHOPAL", "KOCHI",
+]
+
+# UPI apps named at the end of a payment note ("RAJ KUMAR Sent using Paytm UPI")
+_APP_SUFFIXES = ["PAYTM", "GPAY", "GOOGLE PAY", "PHONEPE", "BHIM", "UPI"]
+
+_CHANNEL_RE = re.compile(
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in CHANNEL_PATTERNS)
+)
+_PREFIX_RE = re.compile("|".join(_PREFIX_PATTERNS))
+# UPI handles (name@bank) or long numbers (phone, account, UPI ref)
+_COUNTERPARTY_RE = re.compile(r"([\w.\-]+@[A-Z]+|\b\d{6,}\b)")
+# Separators that join reference numbers to names ("UPI-1234567890-AMAZON")
+_SEPARATOR_RE = re.compile(r"[-/*]")
+# Bank part of a UPI handle ("SWIGGY@YBL")
+_HANDLE_BANK_RE = re.compile(r"@[A-Z]+\b")
+# Whole UPI handle ("9876543210@YBL")
+_HANDLE_RE = re.compile(r"([\w.]+@[A-Z]+)")
+_DIGIT_TOKEN_RE = re.compile(r"\S*\d\S*")
+_NON_LETTER_RE = re.compile(r"[^A-Z&]+")
+_NOISE_RE = re.compile(r"\b(?:" + "|".join(_NOISE_WORDS) + r")\b")
+_CITY_RE = re.compile(r"(?:\s+(?:" + "|".join(_CITY_SUFFIXES) + r"))+$")
+_APP_RE = re.compile(r"(?:\s+(?:" + "|".join(_APP_SUFFIXES) + r"))+$")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def _fallback_key(description: str) -> str:
+    """
+    Letters-only form of the description without channel prefixes, UPI
+    handle banks and noise words, used when nothing else is left ("" if
+    that is empty too).
+    """
+    text = _HANDLE_BANK_RE.sub(" ", _SEPARATOR_RE.sub(" ", description))
+    letters = _NON_LETTER_RE.sub(" ", _PREFIX_RE.sub(" ", text))
+    return " ".join(_NOISE_RE.sub(" ", letters).split())
+
+
+def normalize_merchants(descriptions) -> pd.DataFrame:
+    """
+    Extract merchant_key, channel and counterparty from raw descriptions.
+
+    All regexes are compiled once and applied with vectorized pandas string
+    operations to the distinct descriptions only, so repeated merchants
+    cost nothing extra.
+
+        "UPI-1234567890-AMAZON INDIA PAYMENT"
+            -> merchant_key "AMAZON", channel "UPI", counterparty "1234567890"
+        "POS CARD PURCHASE - BIG BAZAAR GHAZIABAD"
+            -> merchant_key "BIG BAZAAR", channel "POS", counterparty "BIG BAZAAR"
+        "UPI/9876543210@YBL/Payment from Phone"
+            -> merchant_key "9876543210@YBL", channel "UPI"
+
+    A description with no name in it, only a channel, reference numbers
+    and filler words (a person-to-person UPI transfer), is keyed on its
+    UPI handle. Without one its merchant_key is None: there is nothing to
+    tell one such payee from another, so they must not share a key.
+
+    Returns:
+        DataFrame with merchant_key, channel and counterparty columns,
+        one row per description (same order). channel is None when no
+        payment channel is recognised.
+    """
+    raw = pd.Series(descriptions, dtype=object).fillna("").astype(str)
+    codes, uniques = pd.factorize(raw)
+    text = pd.Series(uniques, dtype=object).str.upper().str.strip()
+
+    # Channel: name of the group that matched
+    matched = text.str.extract(_CHANNEL_RE).notna()
+    channel = matched.idxmax(axis=1).where(matched.any(axis=1), None)
+
+    counterparty_id = text.str.extract(_COUNTERPARTY_RE)[0]
+
+    key = text.str.replace(_SEPARATOR_RE, " ", regex=True)
+    key = key.str.replace(_HANDLE_BANK_RE, " ", regex=True)
+    key = key.str.replace(_PREFIX_RE, " ", regex=True)
+    key = key.str.replace(_DIGIT_TOKEN_RE, " ", regex=True)
+    key = key.str.replace(_NON_LETTER_RE, " ", regex=True)
+    key = key.str.replace(_NOISE_RE, " ", regex=True)
+    key = key.str.replace(_SPACES_RE, " ", regex=True).str.strip()
+    key = key.str.replace(_APP_RE, "", regex=True).str.strip()
+    key = key.str.replace(_CITY_RE, "", regex=True).str.strip()
+
+    empty = key == ""
+    key[empty] = text[empty].map(_fallback_key)
+    nameless = key == ""
+    key = key.where(~nameless, text.str.extract(_HANDLE_RE)[0])
+
+    counterparty = counterparty_id.where(counterparty_id.notna(), key)
+
+    result = pd.DataFrame({
+        "merchant_key": key.astype(object),
+        "channel": channel.astype(object),
+        "counterparty": counterparty.astype(object),
+    })
+    result = result.where(result.notna(), None)
+    return result.iloc[codes].reset_index(drop=True)
+
+
+def merchant_key(description) -> str:
+    """Merchant key of a single description (see normalize_merchants)."""
+    return normalize_merchants([description])["merchant_key"].iloc[0]
@@ -0,0 +1,256 @@
+# Tools/metrics.py
+
+import contextvars
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+# Calls kept for the "last N calls" view
+HISTORY_SIZE = int(os.getenv("FINOVA_METRICS_HISTORY", "500"))
+
+# If set, every call record is also appended to this JSON lines file
+JSONL_PATH = os.getenv("FINOVA_METRICS_JSONL", "")
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# Call being tracked in this context (the scheduler adds its retries to it)
+_current_call = contextvars.ContextVar("finova_current_call", default=None)
+# Attempts of a caller's retry loop already made before the calls of this context
+_prior_attempts = contextvars.ContextVar("finova_prior_attempts", default=0)
+
+
+@dataclass
+class CallRecord:
+    """One model call: an agent invocation or a direct generate_content request."""
+
+    kind: str
+    name: str
+    started_at: float = field(default_factory=time.time)
+    seconds: float = 0.0
+    first_event_seconds: Optional[float] = None
+    prompt_chars: int = 0
+    response_chars: int = 0
+    prompt_tokens: Optional[int] = None
+    response_tokens: Optional[int] = None
+    total_tokens: Optional[int] = None
+    retries: int = 0
+    cache_hit: bool = False
+    status: str = "ok"
+    error: Optional[str] = None
+
+    def mark_first_event(self):
+        """Record the time to the first streamed event (only the first call counts)."""
+        if self.first_event_seconds is None:
+            self.first_event_seconds = time.perf_counter() - self._perf_start
+
+    def add_usage(self, usage):
+        """Add token counts from a google.genai usage_metadata object (if any)."""
+        if usage is None:
+            return
+        for attr, source in (("prompt_tokens", "prompt_token_count"),
+                             ("response_tokens", "candidates_token_count"),
+                             ("total_tokens", "total_token_count")):
+            value = getattr(usage, source, None)
+            if value is not None:
+                setattr(self, attr, (getattr(self, attr) or 0) + value)
+
+
+class MetricsRegistry:
+    """
+    In-process store of model call metrics.
+
+    Keeps the last HISTORY_SIZE call records plus running totals per
+    (kind, name), and free-form counters such as cache hits. Exports as
+    JSON lines (one call per line) or Prometheus text format.
+    """
+
+    def __init__(self, history_size: int = HISTORY_SIZE, jsonl_path: str = JSONL_PATH):
+        self.jsonl_path = jsonl_path
+        self._history = deque(maxlen=history_size)
+        self._totals: Dict[Tuple[str, str], dict] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, call: CallRecord):
+        with self._lock:
+            self._history.append(call)
+            totals = self._totals.setdefault((call.kind, call.name), {
+                "calls": 0, "errors": 0, "seconds": 0.0, "retries": 0, "cache_hits": 0,
+                "prompt_tokens": 0, "response_tokens": 0, "prompt_chars": 0,
+                "response_chars": 0, "buckets": [0] * len(LATENCY_BUCKETS),
+            })
+            totals["calls"] += 1
+            totals["errors"] += call.status != "ok"
+            totals["seconds"] += call.seconds
+            totals["retries"] += call.retries
+            totals["cache_hits"] += call.cache_hit
+            totals["prompt_tokens"] += call.prompt_tokens or 0
+            totals["response_tokens"] += call.response_tokens or 0
+            totals["prompt_chars"] += call.prompt_chars
+            totals["response_chars"] += call.response_chars
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if call.seconds <= bound:
+                    totals["buckets"][i] += 1
+
+        if self.jsonl_path:
+            with self._lock:
+                with open(self.jsonl_path, "a", encoding="utf-8") as file:
+                    file.write(json.dumps(asdict(call)) + "\n")
+
+    def incr(self, name: str, amount: float = 1, **labels):
+        """Add to a free-form counter, e.g. incr("cache_hits", 12, cache="category")."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def recent(self, n: int = 20) -> List[dict]:
+        """The last `n` calls, newest first."""
+        with self._lock:
+            calls = list(self._history)[-n:]
+        return [asdict(call) for call in reversed(calls)]
+
+    def reset(self):
+        with self._lock:
+            self._history.clear()
+            self._totals.clear()
+            self._counters.clear()
+
+    # ---------------------------------------
+    # Export
+    # ---------------------------------------
+    def to_jsonl(self) -> str:
+        with self._lock:
+            calls = list(self._history)
+        return "".join(json.dumps(asdict(call)) + "\n" for call in calls)
+
+    def to_prometheus(self) -> str:
+        with self._lock:
+            totals = {key: dict(value) for key, value in self._totals.items()}
+            counters = dict(self._counters)
+
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP finova_{name} {help_text}")
+            lines.append(f"# TYPE finova_{name} {kind}")
+            for labels, value in samples:
+                label_text = ",".join(f'{k}="{v}"' for k, v in labels)
+                lines.append(f"finova_{name}{{{label_text}}} {value}")
+
+        def per_call(field_name):
+            return [((("kind", kind), ("name", name)), t[field_name])
+                    for (kind, name), t in totals.items()]
+
+        metric("model_calls_total", "counter", "Model calls.", per_call("calls"))
+        metric("model_call_errors_total", "counter", "Failed model calls.", per_call("errors"))
+        metric("model_call_retries_total", "counter", "Retried attempts.", per_call("retries"))
+        metric("model_call_cache_hits_total", "counter", "Calls answered from a cache.",
+               per_call("cache_hits"))
+        metric("model_prompt_tokens_total", "counter", "Prompt tokens.", per_call("prompt_tokens"))
+        metric("model_response_tokens_total", "counter", "Response tokens.",
+               per_call("response_tokens"))
+        metric("model_prompt_chars_total", "counter", "Prompt characters.", per_call("prompt_chars"))
+        metric("model_response_chars_total", "counter", "Response characters.",
+               per_call("response_chars"))
+
+        lines.append("# HELP finova_model_call_seconds Model call wall time.")
+        lines.append("# TYPE finova_model_call_seconds histogram")
+        for (kind, name), t in totals.items():
+            labels = f'kind="{kind}",name="{name}"'
+            for bound, count in zip(LATENCY_BUCKETS, t["buckets"]):
+                lines.append(f'finova_model_call_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'finova_model_call_seconds_bucket{{{labels},le="+Inf"}} {t["calls"]}')
+            lines.append(f"finova_model_call_seconds_sum{{{labels}}} {t['seconds']}")
+            lines.append(f"finova_model_call_seconds_count{{{labels}}} {t['calls']}")
+
+        for name in sorted({name for name, _ in counters}):
+            metric(f"{name}_total", "counter", f"{name.replace('_', ' ').capitalize()}.",
+                   [(labels, value) for (n, labels), value in counters.items() if n == name])
+
+        return "\n".join(lines) + "\n"
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> MetricsRegistry:
+    """Process-wide metrics registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
+
+
+def note_retry():
+    """Count one retried attempt on the call tracked in this context (if any)."""
+    call = _current_call.get()
+    if call is not None:
+        call.retries += 1
+
+
+@contextmanager
+def retry_attempt(number: int):
+    """
+    Mark the calls made inside this block as attempt `number` of a retry
+    loop, so their records count the earlier attempts as retries:
+
+        for number in range(1, max_attempts + 1):
+            with retry_attempt(number):
+                answer = await invoke(agent, prompt)
+    """
+    token = _prior_attempts.set(number - 1)
+    try:
+        yield
+    finally:
+        _prior_attempts.reset(token)
+
+
+def record_cache_hit(kind: str, name: str, prompt: str = "", response: str = ""):
+    """Record a call that was answered from a cache instead of the model."""
+    get_registry().record(CallRecord(kind=kind, name=name, prompt_chars=len(prompt or ""),
+                                     response_chars=len(response or ""), cache_hit=True))
+
+
+@contextmanager
+def track_call(kind: str, name: str, prompt: str = ""):
+    """
+    Time a model call and record it in the registry when the block exits.
+
+        with track_call("agent", agent.name, prompt=text) as call:
+            ...
+            call.mark_first_event()
+            call.response_chars = len(answer)
+
+    Exceptions are recorded as status "error" and re-raised; a stream
+    closed by its reader before the end is recorded as "cancelled".
+    Retries of the LLM scheduler inside the block are counted on the call.
+    """
+    call = CallRecord(kind=kind, name=name, prompt_chars=len(prompt or ""),
+                      retries=_prior_attempts.get())
+    start = call._perf_start = time.perf_counter()
+    # Restored with set(), not reset(): a streaming generator may be
+    # closed from another context than the one it started in
+    outer = _current_call.get()
+    _current_call.set(call)
+    try:
+        yield call
+    except GeneratorExit:
+        call.status = "cancelled"
+        raise
+    except BaseException as e:
+        call.status = "error"
+        call.error = f"{type(e).__name__}: {e}"[:300]
+        raise
+    finally:
+        _current_call.set(outer)
+        call.seconds = time.perf_counter() - start
+        get_registry().record(call)
+
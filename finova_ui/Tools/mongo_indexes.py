@@ -0,0 +1,135 @@
+# Tools/mongo_indexes.py
+
+import hashlib
+import os
+import threading
+from collections import Counter
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.collation import Collation, CollationStrength
+from pymongo.errors import PyMongoError
+
+# Accounts, banks and categories are matched case-insensitively (the chat
+# model and users spell them freely). Queries must pass this collation to
+# use the account / category indexes below; queries on the date alone run
+# without one (Tools/query_tools.query_collation) and use the `date` index.
+CASE_INSENSITIVE = Collation(locale="en", strength=CollationStrength.SECONDARY)
+
+# Fields that identify a transaction for the dedup key
+DEDUP_FIELDS = ("bank_name", "account_id", "date", "description", "debit", "credit", "balance")
+
+INDEXES = {
+    "transactions": [
+        # Chat queries filtered by account / category, with or without a period
+        IndexModel([("account_id", ASCENDING), ("date", ASCENDING)],
+                   name="account_date", collation=CASE_INSENSITIVE),
+        IndexModel([("category", ASCENDING), ("date", ASCENDING)],
+                   name="category_date", collation=CASE_INSENSITIVE),
+        # Period-only questions ("how much did I spend last month?") and the
+        # first / last date. No collation: ISO dates need none, and queries
+        # without one (the default) can use it
+        IndexModel([("date", ASCENDING)], name="date"),
+        # Re-uploading a statement doesn't store its rows twice
+        IndexModel([("dedup_key", ASCENDING)], name="dedup_key", unique=True,
+                   partialFilterExpression={"dedup_key": {"$exists": True}}),
+        # Rows of one upload, e.g. to clean up an upload that never finished
+        IndexModel([("upload_id", ASCENDING)], name="upload_id",
+                   partialFilterExpression={"upload_id": {"$exists": True}}),
+    ],
+    "uploaded_files": [
+        # Upload history, newest first
+        IndexModel([("uploaded_at", DESCENDING)], name="uploaded_at"),
+        IndexModel([("upload_id", ASCENDING)], name="upload_id", unique=True,
+                   partialFilterExpression={"upload_id": {"$exists": True}}),
+    ],
+}
+
+_ensured = set()
+_ensure_lock = threading.Lock()
+_started = set()
+_started_lock = threading.Lock()
+
+
+def ensure_indexes(db_name: str = None, force: bool = False) -> dict:
+    """
+    Create the indexes of INDEXES in `db_name` (default FINOVA_DB_NAME).
+
+    Idempotent: MongoDB skips indexes that already exist with the same
+    spec, and each database is only checked once per process (unless
+    `force`), so this is safe to call on every startup or Streamlit rerun.
+    Failures (cluster unreachable, an existing index with other options)
+    are reported, not raised, so the app still starts.
+    """
+    from Tools.mongo_tools import get_mongo_client
+
+    db_name = db_name or os.getenv("FINOVA_DB_NAME")
+    with _ensure_lock:
+        if db_name in _ensured and not force:
+            return {"status": "skipped", "db": db_name}
+
+        created = {}
+        try:
+            db = get_mongo_client()[db_name]
+            for collection_name, indexes in INDEXES.items():
+                _drop_changed_collation(db[collection_name], indexes)
+                created[collection_name] = db[collection_name].create_indexes(indexes)
+        except (PyMongoError, ValueError) as e:
+            print(f"Could not ensure MongoDB indexes on {db_name}: {e}")
+            return {"status": "error", "db": db_name, "error": str(e)[:300], "created": created}
+
+        _ensured.add(db_name)
+        return {"status": "success", "db": db_name, "created": created}
+
+
+def _drop_changed_collation(collection, indexes):
+    """
+    Drop existing indexes whose collation differs from their INDEXES entry
+    of the same name (e.g. `date`, created with CASE_INSENSITIVE before), so
+    create_indexes can build them again instead of failing.
+    """
+    existing = collection.index_information()
+    for model in indexes:
+        spec = model.document
+        current = existing.get(spec["name"])
+        if current is not None and current.get("collation", {}).get("locale") != \
+                spec.get("collation", {}).get("locale"):
+            print(f"Rebuilding index {collection.name}.{spec['name']} with its new collation")
+            collection.drop_index(spec["name"])
+
+
+def ensure_indexes_in_background(db_name: str = None):
+    """
+    Run ensure_indexes in a daemon thread, once per database and process,
+    so an app start doesn't wait for the cluster.
+    """
+    db_name = db_name or os.getenv("FINOVA_DB_NAME")
+    with _started_lock:
+        if db_name in _started:
+            return
+        _started.add(db_name)
+    threading.Thread(target=ensure_indexes, args=(db_name,), daemon=True,
+                     name="finova-ensure-indexes").start()
+
+
+def _dedup_base(txn: dict) -> str:
+    return "|".join(str(txn.get(field)) for field in DEDUP_FIELDS)
+
+
+def add_dedup_keys(batches):
+    """
+    Set `dedup_key` on every transaction of a stream of batches (in place)
+    and pass the batches on.
+
+    Identical rows within one stream (two same-day coffees without a
+    balance) are numbered, so all of them are stored, while storing the
+    same statement again hits the unique index and is reported as
+    duplicates.
+    """
+    occurrences = Counter()
+    for batch in batches:
+        for txn in batch:
+            base = _dedup_base(txn)
+            txn["dedup_key"] = hashlib.sha1(
+                f"{base}|{occurrences[base]}".encode("utf-8")).hexdigest()
+            occurrences[base] += 1
+        yield batch
@@ -2,16 +2,203 @@
 
 import pandas as pd
 from pymongo import MongoClient
+from pymongo.errors import BulkWriteError
+from pymongo.write_concern import WriteConcern
 import os
+import threading
+import time
+import uuid
+from itertools import islice
+
+from Tools.data_version import bump_data_version, data_version
+from Tools.mongo_indexes import add_dedup_keys
+from Tools.search_index import adopt_data_version, index_transactions
+
+# Atlas requires TLS; set FINOVA_MONGO_TLS=0 for a local mongod without it
+TLS = os.getenv("FINOVA_MONGO_TLS", "1").lower() not in ("0", "false", "no")
+
+# Connection pool of the shared client
+MAX_POOL_SIZE = int(os.getenv("FINOVA_MONGO_MAX_POOL_SIZE", "50"))
+MIN_POOL_SIZE = int(os.getenv("FINOVA_MONGO_MIN_POOL_SIZE", "0"))
+MAX_IDLE_TIME_MS = int(os.getenv("FINOVA_MONGO_MAX_IDLE_MS", "300000"))
+
+# Fail fast instead of hanging a Streamlit rerun when the cluster is unreachable;
+# sockets get longer for big insert_many batches
+SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("FINOVA_MONGO_SELECTION_TIMEOUT_MS", "5000"))
+CONNECT_TIMEOUT_MS = int(os.getenv("FINOVA_MONGO_CONNECT_TIMEOUT_MS", "5000"))
+SOCKET_TIMEOUT_MS = int(os.getenv("FINOVA_MONGO_SOCKET_TIMEOUT_MS", "60000"))
+
+# How often the client checks the health of every server in the background
+HEARTBEAT_FREQUENCY_MS = int(os.getenv("FINOVA_MONGO_HEARTBEAT_MS", "10000"))
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def client_options() -> dict:
+    """Keyword arguments of the shared MongoClient."""
+    tls = {"tls": True, "tlsAllowInvalidCertificates": True} if TLS else {"tls": False}
+    return {
+        **tls,
+        "maxPoolSize": MAX_POOL_SIZE,
+        "minPoolSize": MIN_POOL_SIZE,
+        "maxIdleTimeMS": MAX_IDLE_TIME_MS,
+        "serverSelectionTimeoutMS": SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": CONNECT_TIMEOUT_MS,
+        "socketTimeoutMS": SOCKET_TIMEOUT_MS,
+        "heartbeatFrequencyMS": HEARTBEAT_FREQUENCY_MS,
+        "retryWrites": True,
+        "retryReads": True,
+        "appname": "finova",
+    }
+
 
 def get_mongo_client():
     """
-    Returns a MongoDB Atlas client using MONGODB_URI from .env
+    Returns the process-wide MongoDB Atlas client for MONGODB_URI from .env.
+
+    The client is created on first use and shared by every caller and
+    thread (MongoClient is thread-safe and pools its connections), so
+    calls reuse open TLS connections instead of building a new client,
+    discovering the cluster and handshaking each time. A forked child
+    process gets its own client, since pools can't cross a fork.
     """
     uri = os.getenv("MONGODB_URI")
     if not uri:
         raise ValueError("MONGODB_URI not found in .env")
-    return MongoClient(uri, tls=True, tlsAllowInvalidCertificates=True)
+
+    key = (os.getpid(), uri)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = MongoClient(uri, **client_options())
+            _clients[key] = client
+        return client
+
+
+def close_mongo_client():
+    """Close the shared clients of this process (the next get_mongo_client() opens a new one)."""
+    with _clients_lock:
+        clients = [client for (pid, _), client in _clients.items() if pid == os.getpid()]
+        for key in [key for key in _clients if key[0] == os.getpid()]:
+            del _clients[key]
+    for client in clients:
+        client.close()
+
+
+def mongo_health() -> dict:
+    """Ping the cluster through the shared client: {"ok", "latency_ms"} or {"ok": False, "error"}."""
+    start = time.perf_counter()
+    try:
+        get_mongo_client().admin.command("ping")
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"[:300]}
+    return {"ok": True, "latency_ms": round((time.perf_counter() - start) * 1000, 2)}
+
+
+# Documents per insert_many call
+INSERT_BATCH_SIZE = int(os.getenv("FINOVA_MONGO_BATCH_SIZE", "1000"))
+
+# Write concern of transaction inserts: "majority", or the number of nodes
+# that must acknowledge ("1"; "0" = unacknowledged, fastest, no error reports)
+WRITE_CONCERN = os.getenv("FINOVA_MONGO_WRITE_CONCERN", "majority")
+
+# Write errors kept per batch in the report
+MAX_REPORTED_ERRORS = 10
+
+DUPLICATE_KEY = 11000
+
+
+def write_concern(w=None) -> WriteConcern:
+    """WriteConcern for `w` (default FINOVA_MONGO_WRITE_CONCERN)."""
+    w = WRITE_CONCERN if w is None else w
+    return WriteConcern(w=int(w) if str(w).isdigit() else w)
+
+
+def iter_batches(documents, batch_size: int = INSERT_BATCH_SIZE):
+    """Split any iterable of documents into lists of at most `batch_size`."""
+    iterator = iter(documents)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def insert_batches(collection, batches, batch_size: int = INSERT_BATCH_SIZE,
+                   w=None, on_batch=None) -> dict:
+    """
+    Insert batches of documents with unordered insert_many calls of at
+    most `batch_size` documents each (one round trip per call).
+
+    Unordered inserts don't stop at a rejected document (e.g. a duplicate
+    key): the server writes the rest of the batch and reports the failures,
+    which are collected per batch with their position in the stream.
+    Rows rejected by a unique index (already stored) are also counted in
+    `duplicate_count`.
+    `on_batch(documents)` is called with the stored documents of every
+    batch after it was written (rejected ones left out).
+    """
+    collection = collection.with_options(write_concern=write_concern(w))
+    report = {"inserted_count": 0, "failed_count": 0, "duplicate_count": 0, "batch_count": 0,
+              "errors": []}
+    offset = 0
+
+    for incoming in batches:
+        for batch in iter_batches(incoming, batch_size):
+            report["batch_count"] += 1
+            stored = batch
+            try:
+                collection.insert_many(batch, ordered=False)
+                inserted = len(batch)
+            except BulkWriteError as e:
+                write_errors = e.details.get("writeErrors", [])
+                rejected = {err["index"] for err in write_errors}
+                stored = [doc for i, doc in enumerate(batch) if i not in rejected]
+                inserted = e.details.get("nInserted", len(batch) - len(write_errors))
+                report["failed_count"] += len(write_errors)
+                report["duplicate_count"] += sum(err.get("code") == DUPLICATE_KEY for err in write_errors)
+                report["errors"].append({
+                    "batch": report["batch_count"],
+                    "inserted": inserted,
+                    "failed": len(write_errors),
+                    "errors": [
+                        {"index": offset + err["index"], "code": err.get("code"),
+                         "message": str(err.get("errmsg", ""))[:200]}
+                        for err in write_errors[:MAX_REPORTED_ERRORS]
+                    ],
+                })
+                print(f"batch {report['batch_count']}: {len(write_errors)} of {len(batch)} rejected")
+
+            report["inserted_count"] += inserted
+            offset += len(batch)
+            if on_batch is not None:
+                on_batch(stored)
+
+    return report
+
+
+def _indexing(version: str, on_batch=None):
+    """
+    on_batch callback adding the stored transactions to the chat search
+    index (if it is at `version`), then calling `on_batch`.
+    """
+    def callback(documents):
+        index_transactions(documents, version)
+        if on_batch is not None:
+            on_batch(documents)
+    return callback
+
+
+def _bump_data_version(previous: str):
+    """Bump the data version after a transactions write; the search index, kept current by _indexing, follows."""
+    adopt_data_version(previous, bump_data_version())
+
+
+def _status(report: dict) -> str:
+    if report["failed_count"] > report["duplicate_count"]:
+        return "partial" if report["inserted_count"] else "error"
+    return "success" if report["inserted_count"] or report["duplicate_count"] else "error"
 
 
 def insert_transactions(db_name: str, collection_name: str, transactions: list):
@@ -26,15 +213,113 @@ def insert_transactions(db_name: str, collection_name: str, transactions: list):
     if not transactions:
         return {"status": "error", "message": "No transactions to insert"}
 
-    result = collection.insert_many(transactions)
+    version = data_version()
+    try:
+        report = insert_batches(collection, add_dedup_keys([transactions]),
+                                on_batch=_indexing(version) if collection_name == "transactions" else None)
+    finally:
+        _bump_data_version(version)
+
+    return {
+        "status": _status(report),
+        "inserted_count": report["inserted_count"],
+        "failed_count": report["failed_count"],
+        "duplicate_count": report["duplicate_count"],
+        "errors": report["errors"],
+        "collection": collection_name
+    }
+
+
+def insert_transaction_batches(db_name: str, collection_name: str, batches,
+                               batch_size: int = INSERT_BATCH_SIZE) -> dict:
+    """
+    Inserts transactions batch by batch as they arrive from an iterator
+    (e.g. iter_statement_csv), so the whole statement is never held in memory.
+    Each insert_many call writes at most `batch_size` documents.
+    """
+    client = get_mongo_client()
+    collection = client[db_name][collection_name]
+
+    written = {"batches": 0, "txns": 0}
+
+    def progress(batch):
+        written["batches"] += 1
+        written["txns"] += len(batch)
+        print(f"inserted batch {written['batches']}: {written['txns']} txns so far")
+
+    version = data_version()
+    try:
+        report = insert_batches(collection, add_dedup_keys(batches), batch_size=batch_size,
+                                on_batch=_indexing(version, progress) if collection_name == "transactions" else progress)
+    finally:
+        _bump_data_version(version)
+
+    if report["batch_count"] == 0:
+        return {"status": "error", "message": "No transactions to insert"}
 
     return {
-        "status": "success",
-        "inserted_count": len(result.inserted_ids),
+        "status": _status(report),
+        "inserted_count": report["inserted_count"],
+        "failed_count": report["failed_count"],
+        "duplicate_count": report["duplicate_count"],
+        "batch_count": report["batch_count"],
+        "errors": report["errors"],
         "collection": collection_name
     }
 
 
+def save_upload(db_name: str, filename: str, batches, bank_name: str = "User Upload",
+                batch_size: int = INSERT_BATCH_SIZE, w=None, on_batch=None) -> dict:
+    """
+    Stores an upload, its transactions and its uploaded_files record, as one
+    logical operation.
+
+    The record is written first with status "in_progress" and an upload_id
+    that every stored transaction carries. After the batched inserts it gets
+    the counts and its final status: "success", "partial" (some rows were
+    rejected, see "errors") or "error". Rows of an upload that never
+    finished can be found, or removed, by their upload_id.
+    """
+    db = get_mongo_client()[db_name]
+    uploads_col = db["uploaded_files"]
+    upload_id = uuid.uuid4().hex
+
+    uploads_col.insert_one({
+        "upload_id": upload_id,
+        "filename": filename,
+        "uploaded_at": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "transaction_count": 0,
+        "bank_name": bank_name,
+        "status": "in_progress",
+    })
+
+    def tagged(batches):
+        for batch in batches:
+            yield [{**tx, "upload_id": upload_id} for tx in batch]
+
+    version = data_version()
+    try:
+        report = insert_batches(db["transactions"], add_dedup_keys(tagged(batches)),
+                                batch_size=batch_size, w=w, on_batch=_indexing(version, on_batch))
+    except Exception as e:
+        uploads_col.update_one({"upload_id": upload_id},
+                               {"$set": {"status": "error", "error": str(e)[:500]}})
+        raise
+    finally:
+        _bump_data_version(version)
+
+    status = _status(report)
+    uploads_col.update_one({"upload_id": upload_id}, {"$set": {
+        "status": status,
+        "transaction_count": report["inserted_count"],
+        "failed_count": report["failed_count"],
+        "duplicate_count": report["duplicate_count"],
+        "batch_count": report["batch_count"],
+        "errors": report["errors"][:MAX_REPORTED_ERRORS],
+    }})
+    return {"status": status, "upload_id": upload_id, **report}
+
+
 def list_transactions(db_name: str, collection_name: str, limit=5):
     """
     Fetches a few sample transactions.
@@ -0,0 +1,59 @@
+# Tools/profile_tools.py
+
+import threading
+
+from Tools.local_store import load_json, save_json
+
+PROFILES_FILE = "bank_profiles.json"
+
+_profiles = None
+_lock = threading.Lock()
+
+
+def header_signature(columns) -> str:
+    """
+    Normalized header signature used as the profile key.
+
+    Two exports from the same bank share the same header, so the signature
+    is simply the cleaned column names in order.
+    """
+    return "|".join(str(c).lower().strip() for c in columns)
+
+
+def _load_profiles() -> dict:
+    global _profiles
+    if _profiles is None:
+        _profiles = load_json(PROFILES_FILE, default={})
+    return _profiles
+
+
+def get_profile(signature: str):
+    """Return the stored profile for a header signature, or None if not seen before."""
+    with _lock:
+        return _load_profiles().get(signature)
+
+
+def save_profile(signature: str, profile: dict) -> dict:
+    """
+    Store a profile for a header signature and persist all profiles to disk.
+
+    A profile looks like:
+        {
+          "columns": {"date": ..., "description": ..., "debit": ...,
+                      "credit": ..., "balance": ..., "amount": ...},
+          "date_format": "%d-%b-%Y" or None,
+          "sign_convention": "split" | "signed" | "none",
+          "thousands": "," or None,
+        }
+    """
+    with _lock:
+        profiles = _load_profiles()
+        profiles[signature] = profile
+        save_json(PROFILES_FILE, profiles)
+    return profile
+
+
+def list_profiles() -> dict:
+    """Return all known profiles keyed by header signature."""
+    with _lock:
+        return dict(_load_profiles())
@@ -0,0 +1,449 @@
+# Tools/query_tools.py
+
+import json
+import os
+import re
+import threading
+from datetime import date
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+
+# Allowed values of the structured query the chat model produces
+METRICS = ("debit", "credit", "net")
+AGGREGATES = ("sum", "avg", "min", "max", "count", "list", "search", "none")
+GROUP_BYS = ("month", "category", "merchant", "account")
+TYPES = ("debit", "credit")
+
+DEFAULT_QUERY = {
+    "start_date": None,
+    "end_date": None,
+    "bank_name": None,
+    "account_id": None,
+    "category": None,
+    "merchant": None,
+    "type": None,
+    "metric": "debit",
+    "aggregate": "sum",
+    "group_by": None,
+    "limit": 10,
+}
+
+MAX_LIMIT = 100
+
+# Columns returned for aggregate "list"
+LIST_COLUMNS = ["date", "description", "debit", "credit", "category", "account_id"]
+
+_GROUP_COLUMNS = {"month": "month", "category": "category", "merchant": "merchant_key",
+                  "account": "account_id"}
+
+# Group key of transactions without a merchant_key (missing, None or ""), in
+# both engines. Merchant keys are letters or UPI handles, so it can't clash.
+NO_MERCHANT = "(no merchant)"
+_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}$")
+_JSON_RE = re.compile(r"\{.*\}", re.S)
+
+
+# ============================================================
+# Query spec
+# ============================================================
+def parse_query(raw) -> dict:
+    """
+    Validate a structured transaction query (a dict, or model text containing
+    one JSON object) and fill in the defaults. Raises ValueError when it is
+    not a usable query.
+    """
+    if isinstance(raw, str):
+        match = _JSON_RE.search(raw)
+        if not match:
+            raise ValueError(f"No JSON object in query: {raw[:200]!r}")
+        raw = json.loads(match.group(0))
+    if not isinstance(raw, dict):
+        raise ValueError(f"Query must be a JSON object, got {type(raw).__name__}")
+
+    unknown = set(raw) - set(DEFAULT_QUERY)
+    if unknown:
+        raise ValueError(f"Unknown query fields: {sorted(unknown)}")
+
+    query = dict(DEFAULT_QUERY)
+    query.update({key: value for key, value in raw.items() if value not in ("", None)})
+
+    for field in ("start_date", "end_date"):
+        if query[field] is not None and not _DATE_RE.match(str(query[field])):
+            raise ValueError(f"{field} must be YYYY-MM-DD, got {query[field]!r}")
+    for field, allowed in (("metric", METRICS), ("aggregate", AGGREGATES),
+                           ("group_by", GROUP_BYS), ("type", TYPES)):
+        if query[field] is not None and query[field] not in allowed:
+            raise ValueError(f"{field} must be one of {list(allowed)}, got {query[field]!r}")
+
+    query["limit"] = max(1, min(int(query["limit"]), MAX_LIMIT))
+    return query
+
+
+# ============================================================
+# pandas engine
+# ============================================================
+def _to_frame(transactions) -> pd.DataFrame:
+    df = transactions.copy() if isinstance(transactions, pd.DataFrame) else pd.DataFrame(transactions)
+    for column in ("date", "description", "bank_name", "account_id", "category", "merchant_key"):
+        if column not in df.columns:
+            df[column] = None
+    df["date"] = df["date"].astype("string").str[:10]
+    df["debit"] = pd.to_numeric(df.get("debit"), errors="coerce").fillna(0.0)
+    df["credit"] = pd.to_numeric(df.get("credit"), errors="coerce").fillna(0.0)
+    df["net"] = df["credit"] - df["debit"]
+    df["month"] = df["date"].str[:7]
+    # As stored: rows without a key are not given one here, which the
+    # Mongo engine could not do either
+    df["merchant_key"] = df["merchant_key"].where(df["merchant_key"].ne(""), None)
+    return df
+
+
+def _filter_mask(df: pd.DataFrame, query: dict) -> pd.Series:
+    mask = pd.Series(True, index=df.index)
+    if query["start_date"]:
+        mask &= df["date"].ge(query["start_date"]).fillna(False)
+    if query["end_date"]:
+        mask &= df["date"].le(query["end_date"]).fillna(False)
+    for field in ("bank_name", "account_id", "category"):
+        if query[field]:
+            mask &= df[field].astype("string").str.lower().eq(str(query[field]).lower()).fillna(False)
+    if query["merchant"]:
+        needle = str(query["merchant"]).lower()
+        in_key = df["merchant_key"].astype("string").str.lower().str.contains(needle, regex=False)
+        in_text = df["description"].astype("string").str.lower().str.contains(needle, regex=False)
+        mask &= (in_key.fillna(False) | in_text.fillna(False))
+    if query["type"]:
+        mask &= df[query["type"]] > 0
+    return mask
+
+
+def _value(series: pd.Series, aggregate: str):
+    value = series.agg(aggregate if aggregate != "avg" else "mean")
+    return None if pd.isna(value) else round(float(value), 2)
+
+
+def run_query(transactions, query: dict) -> dict:
+    """
+    Run a validated query over transaction dicts (or a DataFrame) with pandas.
+
+    Returns a small JSON-ready result: the query, the number of matched
+    transactions and either `value`, `groups` ([{"key", "value"}]) or
+    `transactions` (aggregate "list").
+    """
+    df = _to_frame(transactions)
+    matched = df[_filter_mask(df, query)]
+    result = {"query": query, "matched": int(len(matched))}
+
+    aggregate, metric = query["aggregate"], query["metric"]
+    if aggregate in ("search", "none"):
+        return result
+
+    if aggregate == "list":
+        rows = matched.sort_values(metric, ascending=metric == "net").head(query["limit"])
+        result["transactions"] = json.loads(rows[LIST_COLUMNS].to_json(orient="records"))
+        return result
+
+    if query["group_by"] is None:
+        result["value"] = int(len(matched)) if aggregate == "count" else _value(matched[metric], aggregate)
+        return result
+
+    keys = matched[_GROUP_COLUMNS[query["group_by"]]]
+    if query["group_by"] == "merchant":
+        keys = keys.fillna(NO_MERCHANT)
+    grouped = matched.groupby(keys, dropna=False)[metric]
+    values = grouped.size() if aggregate == "count" else grouped.agg(
+        aggregate if aggregate != "avg" else "mean")
+    if query["group_by"] == "month":
+        values = values.sort_index().tail(query["limit"])
+    else:
+        values = values.sort_values(ascending=False).head(query["limit"])
+    result["groups"] = [
+        {"key": None if pd.isna(key) else str(key), "value": round(float(value), 2)}
+        for key, value in values.items()
+    ]
+    return result
+
+
+# ============================================================
+# MongoDB engine
+# ============================================================
+def _mongo_metric(metric: str):
+    debit = {"$ifNull": ["$debit", 0]}
+    credit = {"$ifNull": ["$credit", 0]}
+    return {"debit": debit, "credit": credit, "net": {"$subtract": [credit, debit]}}[metric]
+
+
+def _mongo_match(query: dict) -> dict:
+    match = {}
+    if query["start_date"] or query["end_date"]:
+        match["date"] = {}
+        if query["start_date"]:
+            match["date"]["$gte"] = query["start_date"]
+        if query["end_date"]:
+            match["date"]["$lte"] = query["end_date"]
+    # Equality under the case-insensitive collation, so the indexes apply
+    for field in ("bank_name", "account_id", "category"):
+        if query[field]:
+            match[field] = str(query[field])
+    if query["merchant"]:
+        needle = {"$regex": re.escape(str(query["merchant"])), "$options": "i"}
+        match["$or"] = [{"merchant_key": needle}, {"description": needle}]
+    if query["type"]:
+        match[query["type"]] = {"$gt": 0}
+    return match
+
+
+def query_collation(query: dict):
+    """
+    Collation to run a validated query with: CASE_INSENSITIVE when it
+    matches or groups by names (so "food" finds "Food" and the account /
+    category indexes apply), None when it only filters by date, so the
+    uncollated `date` index applies.
+    """
+    from Tools.mongo_indexes import CASE_INSENSITIVE
+
+    names = ("bank_name", "account_id", "category")
+    if any(query[field] for field in names) or query["group_by"] not in (None, "month"):
+        return CASE_INSENSITIVE
+    return None
+
+
+def to_pipeline(query: dict) -> List[dict]:
+    """
+    The Mongo aggregation pipeline equivalent of run_query for a validated
+    query; run it with query_collation(query) (see run_query_mongo).
+    """
+    pipeline = [{"$match": _mongo_match(query)}]
+    aggregate, metric = query["aggregate"], query["metric"]
+
+    if aggregate == "list":
+        pipeline += [
+            {"$addFields": {"_metric": _mongo_metric(metric)}},
+            {"$sort": {"_metric": 1 if metric == "net" else -1}},
+            {"$limit": query["limit"]},
+            {"$project": {"_id": 0, **{column: 1 for column in LIST_COLUMNS}}},
+        ]
+        return pipeline
+
+    group_id = None
+    if query["group_by"] == "month":
+        group_id = {"$substrCP": ["$date", 0, 7]}
+    elif query["group_by"] == "merchant":
+        group_id = {"$cond": [{"$gt": [{"$ifNull": ["$merchant_key", ""]}, ""]},
+                              "$merchant_key", NO_MERCHANT]}
+    elif query["group_by"]:
+        group_id = f"${_GROUP_COLUMNS[query['group_by']]}"
+
+    if aggregate in ("search", "none", "count"):
+        value = {"$sum": 1}
+    else:
+        value = {f"${aggregate}": _mongo_metric(metric)}
+    pipeline.append({"$group": {"_id": group_id, "value": value, "matched": {"$sum": 1}}})
+
+    if query["group_by"] == "month":
+        pipeline += [{"$sort": {"_id": -1}}, {"$limit": query["limit"]}, {"$sort": {"_id": 1}}]
+    elif query["group_by"]:
+        pipeline += [{"$sort": {"value": -1}}, {"$limit": query["limit"]}]
+    return pipeline
+
+
+def run_query_mongo(collection, query: dict) -> dict:
+    """
+    Run a validated query inside MongoDB; same result shape as run_query.
+    Names are compared case-insensitively through the collation of the
+    transaction indexes (Tools/mongo_indexes.py, see query_collation).
+    """
+    collation = query_collation(query)
+    docs = list(collection.aggregate(to_pipeline(query), collation=collation))
+    result = {"query": query}
+
+    if query["aggregate"] == "list":
+        result["matched"] = collection.count_documents(_mongo_match(query), collation=collation)
+        result["transactions"] = docs
+        return result
+
+    if query["group_by"] is None:
+        doc = docs[0] if docs else {"matched": 0, "value": None}
+        result["matched"] = doc["matched"]
+        if query["aggregate"] not in ("search", "none"):
+            value = doc["value"]
+            result["value"] = None if value is None else round(float(value), 2)
+        return result
+
+    result["matched"] = collection.count_documents(_mongo_match(query), collation=collation)
+    result["groups"] = [
+        {"key": None if doc["_id"] is None else str(doc["_id"]),
+         "value": round(float(doc["value"] or 0), 2)}
+        for doc in docs
+    ]
+    return result
+
+
+def query_transactions(
+    bank_name: str = "",
+    account_id: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    category: str = "",
+    merchant: str = "",
+    type: str = "",
+    metric: str = "debit",
+    aggregate: str = "sum",
+    group_by: str = "",
+    limit: int = 10,
+) -> dict:
+    """
+    Answer a question about the user's stored transactions with one aggregate.
+
+    Filters (all optional, leave empty to not filter): bank_name, account_id,
+    start_date / end_date (YYYY-MM-DD, inclusive), category, merchant
+    (substring of the merchant or description), type ("debit" for spending,
+    "credit" for income).
+    metric: "debit", "credit" or "net" (credit - debit).
+    aggregate: "sum", "avg", "min", "max", "count" or "list" (largest transactions).
+    group_by: "", "month", "category", "merchant" or "account".
+
+    Returns the matched transaction count and the value, groups or transactions.
+    """
+    from Tools.mongo_tools import get_mongo_client
+
+    try:
+        query = parse_query({
+            "bank_name": bank_name, "account_id": account_id, "start_date": start_date,
+            "end_date": end_date, "category": category, "merchant": merchant, "type": type,
+            "metric": metric, "aggregate": aggregate, "group_by": group_by, "limit": limit,
+        })
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+
+    collection = get_mongo_client()[os.getenv("FINOVA_DB_NAME")]["transactions"]
+    return run_query_mongo(collection, query)
+
+
+# ============================================================
+# Chat prompts
+# ============================================================
+def describe_data(transactions, top_merchants: int = 30) -> dict:
+    """Small overview of the stored data the model needs to write a query."""
+    df = _to_frame(transactions)
+    dates = df["date"].dropna()
+
+    def distinct(column, limit=50):
+        return sorted(str(v) for v in df[column].dropna().unique())[:limit]
+
+    return {
+        "today": date.today().isoformat(),
+        "transactions": int(len(df)),
+        "first_date": dates.min() if len(dates) else None,
+        "last_date": dates.max() if len(dates) else None,
+        "banks": distinct("bank_name"),
+        "accounts": distinct("account_id"),
+        "categories": distinct("category"),
+        "top_merchants": df.loc[df["debit"] > 0, "merchant_key"].value_counts()
+        .head(top_merchants).index.tolist(),
+    }
+
+
+def describe_data_mongo(collection, top_merchants: int = 30) -> dict:
+    """
+    describe_data computed inside MongoDB: only the overview leaves the
+    server, never the transactions themselves.
+    """
+    from Tools.mongo_indexes import CASE_INSENSITIVE
+
+    def edge_date(direction):
+        # No collation: served by the `date` index
+        doc = collection.find_one({"date": {"$gt": ""}}, {"_id": 0, "date": 1},
+                                  sort=[("date", direction)])
+        return str(doc["date"])[:10] if doc else None
+
+    def distinct(field, limit=50):
+        values = collection.distinct(field, collation=CASE_INSENSITIVE)
+        return sorted(str(v) for v in values if v is not None)[:limit]
+
+    merchants = collection.aggregate([
+        {"$match": {"debit": {"$gt": 0}, "merchant_key": {"$nin": [None, ""]}}},
+        {"$group": {"_id": "$merchant_key", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": top_merchants},
+    ])
+
+    return {
+        "today": date.today().isoformat(),
+        "transactions": collection.estimated_document_count(),
+        "first_date": edge_date(1),
+        "last_date": edge_date(-1),
+        "banks": distinct("bank_name"),
+        "accounts": distinct("account_id"),
+        "categories": distinct("category"),
+        "top_merchants": [doc["_id"] for doc in merchants],
+    }
+
+
+_overview = {"version": None, "overview": None}
+_overview_lock = threading.Lock()
+
+
+def get_data_overview(collection) -> dict:
+    """
+    describe_data_mongo of `collection`, recomputed only when the data
+    version (Tools/data_version.py) changed, not for every chat question.
+    """
+    from Tools.data_version import data_version
+
+    with _overview_lock:
+        version = data_version()
+        if _overview["version"] != version:
+            _overview["overview"] = describe_data_mongo(collection)
+            _overview["version"] = version
+        return _overview["overview"]
+
+
+def query_prompt(question: str, overview: Dict) -> str:
+    return f"""
+    You are Finova, an AI assistant. Translate the user's question about their
+    transactions into ONE JSON query that Finova will run on their data.
+
+    Data overview: {json.dumps(overview, default=str)}
+
+    Query fields (omit or null = not filtered):
+    - start_date, end_date: "YYYY-MM-DD", inclusive
+    - bank_name, account_id, category: exact values from the overview
+    - merchant: part of a merchant name
+    - type: "debit" (spending) or "credit" (income)
+    - metric: one of {list(METRICS)}
+    - aggregate: one of {list(AGGREGATES)}; "list" returns the largest
+      transactions, "search" means the question is open-ended and needs the
+      transactions most relevant to it rather than one aggregate, "none"
+      means the question doesn't need the user's data
+    - group_by: one of {list(GROUP_BYS)} or null
+    - limit: number of groups / transactions (default 10)
+
+    Resolve relative periods ("last month") against "today" and the data dates.
+
+    User asked: {question}
+
+    Respond with ONLY the JSON object.
+    """
+
+
+def answer_prompt(question: str, result: Optional[dict] = None, context: Optional[dict] = None) -> str:
+    """
+    Prompt for phrasing the answer from a query `result`, or from retrieval
+    `context` (Tools/search_index.py) for open-ended questions.
+    """
+    if context is not None:
+        data = ("Transactions most relevant to the question, with monthly and category "
+                f"totals of their data: {json.dumps(context, default=str)}")
+    elif result is None or result["query"]["aggregate"] == "none":
+        data = "No data lookup was needed; answer as a general personal finance question."
+    else:
+        data = f"Result of the query Finova ran on their transactions: {json.dumps(result, default=str)}"
+    return f"""
+    You are Finova, an AI assistant. All amounts are in INR (₹).
+    User asked: {question}
+    {data}
+    Provide a clear answer based only on this result.
+    """
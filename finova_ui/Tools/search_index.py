@@ -0,0 +1,223 @@
+# Tools/search_index.py
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import Callable, Dict, List, Optional
+
+from Tools.data_version import data_version
+
+# BM25 parameters
+K1 = 1.5
+B = 0.75
+
+# Bounds of the chat context built from the index
+DEFAULT_TOP_K = 25
+DEFAULT_MONTHS = 24
+DEFAULT_CATEGORIES = 15
+
+# Fields of a transaction kept in the index and shown to the model
+CONTEXT_FIELDS = ("date", "description", "debit", "credit", "category", "account_id")
+
+_TOKEN_RE = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+# Reference numbers (UPI / NEFT ids, card numbers) only add noise
+_MAX_NUMBER_DIGITS = 6
+_MONTHS = ["january", "february", "march", "april", "may", "june", "july",
+           "august", "september", "october", "november", "december"]
+
+
+def tokenize(text) -> List[str]:
+    """Lowercase word and number tokens, without long reference numbers."""
+    return [
+        token for token in _TOKEN_RE.findall(str(text or "").lower())
+        if not token.isdigit() or len(token) < _MAX_NUMBER_DIGITS
+    ]
+
+
+def _amount(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def transaction_tokens(txn: dict) -> List[str]:
+    """
+    Searchable terms of a transaction: its description, merchant, category
+    and channel, the rounded amount, debit / credit, and the month and year
+    (as "2024", "april", "apr") so questions naming a period match it.
+    """
+    tokens = []
+    for field in ("description", "merchant_key", "counterparty", "category", "channel"):
+        tokens += tokenize(txn.get(field))
+
+    debit, credit = _amount(txn.get("debit")), _amount(txn.get("credit"))
+    if debit:
+        tokens += ["debit", str(round(debit))]
+    if credit:
+        tokens += ["credit", str(round(credit))]
+
+    date = str(txn.get("date") or "")
+    if len(date) >= 7 and date[5:7].isdigit() and 1 <= int(date[5:7]) <= 12:
+        month = _MONTHS[int(date[5:7]) - 1]
+        tokens += [date[:4], month, month[:3]]
+    return tokens
+
+
+def identity(txn: dict):
+    """
+    Stored identity of a transaction (its dedup_key or _id), or None for
+    rows that were never stored. Rows are not compared by content: two
+    equal purchases on the same day are two transactions.
+    """
+    key = txn.get("dedup_key") or txn.get("_id")
+    return None if key is None else str(key)
+
+
+class TransactionIndex:
+    """
+    In-process BM25 inverted index over transactions, plus running monthly
+    and per-category totals.
+
+    Rows are tokenized once when they are added. search() only touches
+    the postings of the question's terms, and context() returns a bounded
+    amount of data (top-k rows, the last N months, the top categories)
+    however many statements are stored.
+    """
+
+    def __init__(self, version: str = None):
+        # Data version (Tools/data_version.py) the index was built from
+        self.version = version
+        self._docs: List[dict] = []
+        self._lengths: List[int] = []
+        self._postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self._seen = set()
+        self._total_length = 0
+        self._months: Dict[str, Dict[str, float]] = {}
+        self._categories: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._docs)
+
+    def add(self, transactions) -> int:
+        """Index new transactions; returns how many were not indexed yet."""
+        added = 0
+        with self._lock:
+            for txn in transactions:
+                key = identity(txn)
+                if key is not None:
+                    if key in self._seen:
+                        continue
+                    self._seen.add(key)
+
+                doc_id = len(self._docs)
+                tokens = transaction_tokens(txn)
+                self._docs.append({field: txn.get(field) for field in CONTEXT_FIELDS})
+                self._lengths.append(len(tokens))
+                self._total_length += len(tokens)
+                for term, count in Counter(tokens).items():
+                    self._postings[term][doc_id] = count
+
+                debit, credit = _amount(txn.get("debit")), _amount(txn.get("credit"))
+                month = str(txn.get("date") or "")[:7] or "unknown"
+                for totals in (self._months.setdefault(month, {"debit": 0.0, "credit": 0.0, "count": 0}),
+                               self._categories.setdefault(txn.get("category") or "Uncategorized",
+                                                           {"debit": 0.0, "credit": 0.0, "count": 0})):
+                    totals["debit"] += debit
+                    totals["credit"] += credit
+                    totals["count"] += 1
+                added += 1
+        return added
+
+    def search(self, question: str, k: int = DEFAULT_TOP_K) -> List[dict]:
+        """The `k` transactions scoring highest for `question` under BM25, best first."""
+        with self._lock:
+            n = len(self._docs)
+            if n == 0:
+                return []
+            average_length = self._total_length / n
+            scores = defaultdict(float)
+            for term in set(tokenize(question)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = K1 * (1 - B + B * self._lengths[doc_id] / average_length)
+                    scores[doc_id] += idf * tf * (K1 + 1) / (tf + norm)
+
+            best = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+            return [dict(self._docs[doc_id], score=round(score, 3)) for doc_id, score in best]
+
+    def context(self, question: str, k: int = DEFAULT_TOP_K, months: int = DEFAULT_MONTHS,
+                categories: int = DEFAULT_CATEGORIES) -> dict:
+        """
+        Bounded chat context for an open-ended question: the top-k matching
+        transactions, totals of the last `months` months and of the top
+        `categories` spending categories.
+        """
+        matches = self.search(question, k)
+
+        def rounded(totals):
+            return {"debit": round(totals["debit"], 2), "credit": round(totals["credit"], 2),
+                    "count": totals["count"]}
+
+        with self._lock:
+            month_totals = {m: rounded(t) for m, t in sorted(self._months.items())[-months:]}
+            top_categories = sorted(self._categories.items(), key=lambda item: -item[1]["debit"])
+            category_totals = {c: rounded(t) for c, t in top_categories[:categories]}
+            indexed = len(self._docs)
+
+        return {
+            "indexed_transactions": indexed,
+            "relevant_transactions": matches,
+            "monthly_totals": month_totals,
+            "category_totals": category_totals,
+        }
+
+
+_index: Optional[TransactionIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_search_index(loader: Callable[[], List[dict]]) -> TransactionIndex:
+    """
+    Process-wide transaction index, built from `loader()` (all stored
+    transactions). Writes of this process are added to it as they happen
+    (index_transactions); it is only rebuilt when the data version changed
+    otherwise, i.e. another process (CLI pipeline, batch ingest) wrote.
+    """
+    global _index
+    with _index_lock:
+        version = data_version()
+        if _index is None or _index.version != version:
+            index = TransactionIndex(version)
+            index.add(loader())
+            _index = index
+        return _index
+
+
+def index_transactions(transactions: List[dict], version: str) -> int:
+    """
+    Add transactions this process just stored to the live index, if it is
+    at `version` (the data version when the write started). An index that
+    is already stale is left alone: the next get_search_index rebuilds it.
+    """
+    with _index_lock:
+        index = _index
+    if index is None or index.version != version:
+        return 0
+    return index.add(transactions)
+
+
+def adopt_data_version(previous: str, version: str):
+    """
+    Move the live index from `previous` to `version` after a write of this
+    process, whose rows were added by index_transactions, bumped it.
+    """
+    with _index_lock:
+        if _index is not None and _index.version == previous:
+            _index.version = version
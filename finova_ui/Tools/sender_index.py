@@ -0,0 +1,171 @@
+# Tools/sender_index.py
+
+import re
+import threading
+
+from Tools.local_store import load_json, save_json
+
+SENDERS_FILE = "sender_index.json"
+
+# Statement senders known up front: domain -> bank name
+KNOWN_SENDERS = {
+    "samplebank.com": "SampleBank",
+    "hdfcbank.net": "HDFC Bank",
+    "hdfcbank.com": "HDFC Bank",
+    "icicibank.com": "ICICI Bank",
+    "sbi.co.in": "State Bank of India",
+    "axisbank.com": "Axis Bank",
+    "kotak.com": "Kotak Mahindra Bank",
+    "yesbank.in": "Yes Bank",
+    "idfcfirstbank.com": "IDFC FIRST Bank",
+    "pnb.co.in": "Punjab National Bank",
+    "bankofbaroda.com": "Bank of Baroda",
+}
+
+# Mail providers anyone can send from: their senders are keyed by full
+# address, so one classified sender doesn't classify the whole domain
+GENERIC_DOMAINS = {
+    "gmail.com", "googlemail.com", "yahoo.com", "yahoo.co.in", "ymail.com",
+    "outlook.com", "hotmail.com", "live.com", "msn.com", "icloud.com", "me.com",
+    "aol.com", "proton.me", "protonmail.com", "zoho.com", "zohomail.in",
+    "rediffmail.com", "gmx.com", "mail.com", "yandex.com",
+}
+
+# Statement type from the subject line, checked in order
+STATEMENT_TYPE_PATTERNS = [
+    ("credit_card", re.compile(r"credit\s*card|card\s*statement", re.I)),
+    ("loan", re.compile(r"\bloan\b|\bemi\b", re.I)),
+    ("fixed_deposit", re.compile(r"fixed\s*deposit|\bfd\b", re.I)),
+    ("demat", re.compile(r"demat|trading|holding", re.I)),
+    ("current_account", re.compile(r"current\s*a(?:/)?c(?:count)?\b", re.I)),
+    ("savings_account", re.compile(r"savings?\s*a(?:/)?c(?:count)?\b|bank\s*statement|account\s*statement", re.I)),
+]
+
+_senders = None
+_lock = threading.Lock()
+
+
+def sender_domain(from_address: str) -> str:
+    """Lower-case domain of an address like 'HDFC Alerts <alerts@hdfcbank.net>'."""
+    match = re.search(r"@([\w.\-]+)", str(from_address or ""))
+    return match.group(1).lower().rstrip(".") if match else ""
+
+
+def sender_address(from_address: str) -> str:
+    """Lower-case address of 'HDFC Alerts <alerts@hdfcbank.net>' ('alerts@hdfcbank.net')."""
+    match = re.search(r"[\w.+\-]+@[\w.\-]+", str(from_address or ""))
+    return match.group(0).lower().rstrip(".") if match else ""
+
+
+def _is_generic(domain: str) -> bool:
+    return any(d in GENERIC_DOMAINS for d in _parent_domains(domain))
+
+
+def _sender_keys(from_address: str):
+    """
+    Index keys to look a sender up by, most specific first: the full
+    address for generic mail providers, else the domain and its parents.
+    """
+    domain = sender_domain(from_address)
+    if not domain:
+        return []
+    if _is_generic(domain):
+        return [sender_address(from_address)]
+    return list(_parent_domains(domain))
+
+
+def _parent_domains(domain: str):
+    """'mail.alerts.hdfcbank.net' -> itself, 'alerts.hdfcbank.net', 'hdfcbank.net'."""
+    parts = domain.split(".")
+    for start in range(0, max(len(parts) - 1, 1)):
+        yield ".".join(parts[start:])
+
+
+def statement_type_from_subject(subject: str):
+    """Statement type named in the subject line, or None."""
+    for statement_type, pattern in STATEMENT_TYPE_PATTERNS:
+        if pattern.search(str(subject or "")):
+            return statement_type
+    return None
+
+
+def _load_senders() -> dict:
+    global _senders
+    if _senders is None:
+        _senders = {
+            domain: {"bank_name": bank_name, "statement_type": None}
+            for domain, bank_name in KNOWN_SENDERS.items()
+        }
+        learned = load_json(SENDERS_FILE, default={}) or {}
+        # Entries for a whole generic provider (learned before addresses were used) are dropped
+        _senders.update({key: value for key, value in learned.items() if key not in GENERIC_DOMAINS})
+    return _senders
+
+
+def classify_email(email_json: dict):
+    """
+    Classify a statement email without the LLM.
+
+    Uses bank_name/statement_type from the email tool when present, otherwise
+    the sender index (exact domain, then parent domains; the full address
+    for generic mail providers) plus the subject line. Returns the Agent 2 JSON shape with an extra "source" key, or None
+    for unknown senders.
+    """
+    bank_name = email_json.get("bank_name")
+    statement_type = email_json.get("statement_type")
+    if bank_name and statement_type:
+        return {
+            "bank_name": bank_name,
+            "statement_type": statement_type,
+            "confidence": "high",
+            "source": "email",
+        }
+
+    keys = _sender_keys(email_json.get("from_address"))
+    with _lock:
+        senders = _load_senders()
+        entry = next((senders[key] for key in keys if key in senders), None)
+    if entry is None:
+        return None
+
+    statement_type = (
+        statement_type
+        or statement_type_from_subject(email_json.get("subject"))
+        or entry.get("statement_type")
+    )
+    if not statement_type:
+        return None
+
+    return {
+        "bank_name": bank_name or entry["bank_name"],
+        "statement_type": statement_type,
+        "confidence": "high",
+        "source": "index",
+    }
+
+
+def learn_sender(email_json: dict, classification: dict):
+    """
+    Remember a classification (e.g. the LLM's answer) for the email's sender
+    domain, or for the sender's address on a generic mail provider.
+    """
+    keys = _sender_keys(email_json.get("from_address"))
+    bank_name = classification.get("bank_name")
+    if not keys or not bank_name:
+        return
+
+    with _lock:
+        senders = _load_senders()
+        senders[keys[0]] = {
+            "bank_name": bank_name,
+            "statement_type": classification.get("statement_type"),
+        }
+        learned = {d: v for d, v in senders.items()
+                   if v != {"bank_name": KNOWN_SENDERS.get(d), "statement_type": None}}
+        save_json(SENDERS_FILE, learned)
+
+
+def list_senders() -> dict:
+    """Return all known senders (domains or addresses) with their bank name and last statement type."""
+    with _lock:
+        return dict(_load_senders())
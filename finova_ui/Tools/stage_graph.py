@@ -0,0 +1,114 @@
+# Tools/stage_graph.py
+
+import asyncio
+import inspect
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple
+
+
+@dataclass
+class Stage:
+    name: str
+    fn: Callable
+    inputs: Tuple[str, ...] = ()
+    blocking: bool = False
+    start: float = None
+    end: float = None
+
+    @property
+    def seconds(self) -> float:
+        if self.start is None or self.end is None:
+            return 0.0
+        return self.end - self.start
+
+
+@dataclass
+class StageGraph:
+    """
+    Small dependency graph of pipeline stages.
+
+    Each stage names the stages whose results it takes as positional
+    arguments, and starts as soon as those have finished, so independent
+    branches run concurrently. Async stages run on the event loop; stages
+    marked `blocking` (pymongo, matplotlib, file I/O) run in a worker thread.
+    A failing stage fails every stage downstream of it, and run() raises the
+    first error once everything else has settled.
+    """
+
+    stages: Dict[str, Stage] = field(default_factory=dict)
+    started_at: float = None
+    finished_at: float = None
+
+    def add(self, name: str, fn: Callable, inputs=(), blocking: bool = False) -> "StageGraph":
+        if name in self.stages:
+            raise ValueError(f"Duplicate stage: {name}")
+        missing = [i for i in inputs if i not in self.stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages {missing}")
+        self.stages[name] = Stage(name, fn, tuple(inputs), blocking)
+        return self
+
+    async def _run_stage(self, stage: Stage, tasks: Dict[str, asyncio.Task]):
+        args = [await tasks[name] for name in stage.inputs]
+
+        stage.start = time.perf_counter()
+        try:
+            if stage.blocking:
+                result = await asyncio.to_thread(stage.fn, *args)
+            else:
+                result = stage.fn(*args)
+                if inspect.isawaitable(result):
+                    result = await result
+        finally:
+            stage.end = time.perf_counter()
+        return result
+
+    async def run(self) -> Dict[str, object]:
+        """Run every stage and return their results keyed by stage name."""
+        self.started_at = time.perf_counter()
+        tasks: Dict[str, asyncio.Task] = {}
+        # Stages can only depend on earlier ones, so insertion order is a valid topological order
+        for stage in self.stages.values():
+            tasks[stage.name] = asyncio.create_task(self._run_stage(stage, tasks))
+
+        outcomes = await asyncio.gather(*tasks.values(), return_exceptions=True)
+        self.finished_at = time.perf_counter()
+
+        for outcome in outcomes:
+            if isinstance(outcome, BaseException):
+                raise outcome
+        return dict(zip(tasks.keys(), outcomes))
+
+    # ---------------------------------------
+    # Timing report
+    # ---------------------------------------
+    def critical_path(self) -> List[str]:
+        """
+        Chain of stages that determined the total run time: starting from the
+        stage that finished last, repeatedly step to the input that finished last.
+        """
+        finished = [s for s in self.stages.values() if s.end is not None]
+        if not finished:
+            return []
+
+        stage = max(finished, key=lambda s: s.end)
+        path = [stage.name]
+        while stage.inputs:
+            stage = max((self.stages[name] for name in stage.inputs), key=lambda s: s.end or 0)
+            path.append(stage.name)
+        return list(reversed(path))
+
+    def report(self) -> str:
+        total = (self.finished_at or 0) - (self.started_at or 0)
+        sequential = sum(s.seconds for s in self.stages.values())
+        critical = self.critical_path()
+
+        lines = [f"{'stage':<20} {'start (s)':>9} {'time (s)':>9}"]
+        for stage in sorted(self.stages.values(), key=lambda s: s.start or 0):
+            offset = (stage.start - self.started_at) if stage.start is not None else 0.0
+            marker = " *" if stage.name in critical else ""
+            lines.append(f"{stage.name:<20} {offset:>9.2f} {stage.seconds:>9.2f}{marker}")
+        lines.append(f"Pipeline: {total:.2f}s (sum of stages {sequential:.2f}s)")
+        lines.append("Critical path (*): " + " → ".join(critical))
+        return "\n".join(lines)
@@ -0,0 +1,195 @@
+# Tools/txn_classifier.py
+
+import os
+import threading
+import time
+from typing import List, Tuple
+
+import joblib
+import numpy as np
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+
+from Tools.category_cache import normalize_description
+from Tools.category_rules import STANDARD_CATEGORIES
+from Tools.local_store import data_path
+
+MODEL_FILE = "txn_classifier.joblib"
+
+# Predictions below this probability go to the LLM instead
+CONFIDENCE_THRESHOLD = float(os.getenv("FINOVA_CLASSIFIER_THRESHOLD", "0.85"))
+
+# Where a stored label came from. Only independent answers are learned:
+# rules, the LLM, labels a user set or confirmed, and rows stored before
+# sources were recorded (None). The classifier's own predictions ("model")
+# and copies of earlier answers ("cache") would reinforce its mistakes,
+# and fallback labels are not real answers.
+TRAINABLE_SOURCES = [None, "rule", "llm", "user"]
+
+
+class TransactionClassifier:
+    """
+    Lightweight local text classifier for transaction descriptions.
+
+    Character n-grams of the normalized description are hashed into a
+    fixed-size feature space and fed to a linear model trained with
+    partial_fit, so it can keep learning from newly stored transactions
+    without refitting from scratch. Labels outside STANDARD_CATEGORIES are
+    learned as "Other".
+    """
+
+    def __init__(self, n_features: int = 2 ** 18):
+        self.vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=(3, 5),
+            n_features=n_features,
+            alternate_sign=False,
+            norm="l2",
+        )
+        self.model = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=0)
+        self.classes = list(STANDARD_CATEGORIES)
+        self.trained_rows = 0
+        self.last_trained_id = None
+
+    def _features(self, descriptions):
+        return self.vectorizer.transform([normalize_description(d) for d in descriptions])
+
+    def _labels(self, labels) -> List[str]:
+        return [label if label in self.classes else "Other" for label in labels]
+
+    @property
+    def is_trained(self) -> bool:
+        return self.trained_rows > 0
+
+    def partial_fit(self, descriptions, labels, epochs: int = 5):
+        """Update the model with more labelled descriptions."""
+        if len(descriptions) == 0:
+            return self
+
+        X = self._features(descriptions)
+        y = np.array(self._labels(labels))
+        for _ in range(epochs):
+            self.model.partial_fit(X, y, classes=self.classes)
+        self.trained_rows += len(descriptions)
+        return self
+
+    def predict(self, descriptions) -> Tuple[List[str], List[float]]:
+        """Return the predicted category and its probability per description."""
+        if len(descriptions) == 0:
+            return [], []
+
+        proba = self.model.predict_proba(self._features(descriptions))
+        best = proba.argmax(axis=1)
+        labels = [str(label) for label in self.model.classes_[best]]
+        confidences = proba[np.arange(len(best)), best].tolist()
+        return labels, confidences
+
+    def save(self) -> str:
+        path = data_path(MODEL_FILE)
+        joblib.dump(self, path)
+        return path
+
+    @staticmethod
+    def load():
+        """Load the saved model, or None if none has been trained yet."""
+        path = data_path(MODEL_FILE)
+        if not os.path.exists(path):
+            return None
+        try:
+            return joblib.load(path)
+        except Exception as e:
+            print(f"Could not load transaction classifier from {path}: {e}")
+            return None
+
+
+_classifier = None
+_classifier_lock = threading.Lock()
+
+
+def get_txn_classifier():
+    """Process-wide trained classifier, or None if no model artifact exists."""
+    global _classifier
+    with _classifier_lock:
+        if _classifier is None:
+            _classifier = TransactionClassifier.load()
+        return _classifier
+
+
+def train_from_mongo(full: bool = False, batch_size: int = 10_000) -> dict:
+    """
+    Train the classifier on categorized transactions stored in MongoDB.
+
+    By default training is incremental: only documents inserted after the
+    last one the saved model has seen are read. `full=True` starts a new
+    model from the whole collection.
+    """
+    global _classifier
+    from bson import ObjectId
+    from Tools.mongo_tools import get_mongo_client
+
+    classifier = None if full else TransactionClassifier.load()
+    if classifier is None:
+        classifier = TransactionClassifier()
+
+    query = {
+        "category": {"$nin": [None, ""]},
+        "category_source": {"$in": TRAINABLE_SOURCES},
+    }
+    if classifier.last_trained_id:
+        query["_id"] = {"$gt": ObjectId(classifier.last_trained_id)}
+
+    client = get_mongo_client()
+    collection = client[os.getenv("FINOVA_DB_NAME")]["transactions"]
+    cursor = collection.find(query, {"description": 1, "category": 1}).sort("_id", 1)
+
+    start = time.perf_counter()
+    new_rows = 0
+    descriptions, labels = [], []
+    for doc in cursor:
+        descriptions.append(doc.get("description", ""))
+        labels.append(doc["category"])
+        classifier.last_trained_id = str(doc["_id"])
+        if len(descriptions) >= batch_size:
+            classifier.partial_fit(descriptions, labels)
+            new_rows += len(descriptions)
+            descriptions, labels = [], []
+
+    if descriptions:
+        classifier.partial_fit(descriptions, labels)
+        new_rows += len(descriptions)
+
+    if new_rows:
+        classifier.save()
+        with _classifier_lock:
+            _classifier = classifier
+
+    return {
+        "status": "success",
+        "new_rows": new_rows,
+        "trained_rows": classifier.trained_rows,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def evaluate(classifier: TransactionClassifier, descriptions, labels,
+             threshold: float = CONFIDENCE_THRESHOLD) -> dict:
+    """
+    Accuracy and throughput of the classifier against reference labels
+    (e.g. the LLM's answers), overall and for predictions above `threshold`.
+    """
+    start = time.perf_counter()
+    predicted, confidences = classifier.predict(list(descriptions))
+    seconds = time.perf_counter() - start
+
+    reference = classifier._labels(list(labels))
+    correct = np.array(predicted) == np.array(reference)
+    confident = np.array(confidences) >= threshold
+
+    return {
+        "rows": len(reference),
+        "accuracy": float(correct.mean()) if len(reference) else 0.0,
+        "threshold": threshold,
+        "coverage": float(confident.mean()) if len(reference) else 0.0,
+        "confident_accuracy": float(correct[confident].mean()) if confident.any() else 0.0,
+        "rows_per_second": len(reference) / seconds if seconds else 0.0,
+    }
@@ -1,10 +1,18 @@
 # agents/__init__.py
-from google.adk.models.google_llm import Gemini
 
 def get_model():
     """
-    Returns a Gemini model instance for use with ADK LlmAgent.
-    ADK will pick up GOOGLE_API_KEY / GOOGLE_GENAI_USE_VERTEXAI from env.
+    Returns the model for use with ADK LlmAgent.
+
+    FINOVA_MODEL_BACKEND picks it (see agents/model_backends.py):
+      - gemini (default): Gemini; ADK picks up GOOGLE_API_KEY /
+        GOOGLE_GENAI_USE_VERTEXAI from env
+      - record: Gemini, saving every prompt → response pair to disk
+      - replay: serves recorded responses with simulated latency, offline
+      - synthetic: answers Finova's agent prompts locally, offline
+    google.adk is imported here rather than at package import, so importing
+    a single tool or agent helper doesn't load it.
     """
-    # You can switch model_id to "gemini-1.5-flash" if your course uses that.
-    return Gemini(model_id="gemini-2.0-flash")
+    from agents.model_backends import get_model_backend
+
+    return get_model_backend()
@@ -9,7 +9,7 @@ insights_agent = LlmAgent(
     name="insights_agent",
     model=model,
     description="Agent 4: Generate financial insights from transaction data.",
-    instructions="""
+    instruction="""
 You are Agent 4: Financial Insights Analyst.
 
 Your job:
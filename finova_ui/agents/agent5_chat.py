@@ -4,6 +4,7 @@ from google.adk.agents import LlmAgent
 from google.adk.tools import AgentTool
 from . import get_model
 from .agent4_insights import insights_agent
+from Tools.query_tools import query_transactions
 
 model = get_model()
 
@@ -19,12 +20,17 @@ You can:
   - "How much did I spend last month?"
   - "What is my total income between 2015-04-01 and 2015-04-30?"
   - "Did I save money in April 2015?"
-- When the question requires real numbers, call the insights_tool.
-  Make sure you pass:
+- When the question requires real numbers (totals, averages, counts,
+  largest transactions, spend by month / category / merchant), call
+  `query_transactions`. It runs the aggregation on the stored data and
+  returns only the result. Pass the filters you know:
     - bank_name
     - account_id
     - start_date
     - end_date
+  plus category / merchant / type, the metric, the aggregate and group_by.
+- For a broader written analysis of a period, call the insights_tool.
+- Never guess numbers; phrase the answer from what the tools return.
 
 Ask the user clarifying questions if they don't specify a time period or account.
 
@@ -39,5 +45,5 @@ chat_agent = LlmAgent(
     model=model,
     description="Conversational interface for Finova over user financial data.",
     instruction=instruction,
-    tools=[insights_tool],
+    tools=[query_transactions, insights_tool],
 )
@@ -1,6 +1,7 @@
 # agents/agent6_categorizer.py
 
 from google.adk.agents import LlmAgent
+from google.genai import types
 from agents import get_model
 
 model = get_model()
@@ -11,4 +12,8 @@ txn_categorizer_agent = LlmAgent(
     model=model,
     description="Agent 6: Categorize the statement entries and transactions",
     tools=[],
+    # Answers are a compact {row id: category} JSON mapping
+    generate_content_config=types.GenerateContentConfig(
+        response_mime_type="application/json",
+    ),
 )
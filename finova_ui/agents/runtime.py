@@ -0,0 +1,140 @@
+# agents/runtime.py
+
+import threading
+import uuid
+from typing import Dict, Union
+
+from google.adk.memory import InMemoryMemoryService
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from Tools.metrics import track_call
+
+APP_NAME = "finova_app"
+USER_ID = "finova_user"
+
+
+class AgentRuntime:
+    """
+    Long-lived ADK runtime shared by the CLI pipeline and the Streamlit app.
+
+    Keeps one Runner per agent on a single session/memory service instead
+    of building them on every call. Each invoke() runs in its own new
+    session, so concurrent calls never share history, and the session is
+    deleted when the call finishes. (An in-memory session is cheap to
+    create; the Runner and services are what is worth keeping.)
+
+    Only plain dicts guarded by a threading lock are shared, so one runtime
+    can be used from several threads and event loops (Streamlit reruns
+    each call with asyncio.run).
+    """
+
+    def __init__(self, app_name: str = APP_NAME, user_id: str = USER_ID):
+        self.app_name = app_name
+        self.user_id = user_id
+        self.session_service = InMemorySessionService()
+        self.memory_service = InMemoryMemoryService()
+        self._runners: Dict[str, Runner] = {}
+        self._lock = threading.Lock()
+        self.sessions_created = 0
+        self.sessions_open = 0
+
+    def runner_for(self, agent) -> Runner:
+        """The Runner for `agent`, created on first use."""
+        with self._lock:
+            runner = self._runners.get(agent.name)
+            if runner is None:
+                runner = Runner(
+                    agent=agent,
+                    app_name=self.app_name,
+                    session_service=self.session_service,
+                    memory_service=self.memory_service,
+                )
+                self._runners[agent.name] = runner
+            return runner
+
+    # ---------------------------------------
+    # Sessions
+    # ---------------------------------------
+    async def open_session(self, agent) -> str:
+        """Create a new, empty session for one call to `agent`."""
+        session_id = f"{agent.name}_{uuid.uuid4().hex}"
+        await self.session_service.create_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=session_id,
+        )
+        with self._lock:
+            self.sessions_created += 1
+            self.sessions_open += 1
+        return session_id
+
+    async def close_session(self, agent, session_id: str):
+        """Delete a finished call's session and its history."""
+        await self.session_service.delete_session(
+            app_name=self.app_name,
+            user_id=self.user_id,
+            session_id=session_id,
+        )
+        with self._lock:
+            self.sessions_open -= 1
+
+    # ---------------------------------------
+    # Invocation
+    # ---------------------------------------
+    async def invoke(self, agent, message: Union[str, types.Content]) -> str:
+        """
+        Send one message to `agent` in a fresh session and return the text
+        of its final response ("" if there was none). Timing, sizes and
+        token usage are recorded in the metrics registry (Tools/metrics.py).
+        """
+        if isinstance(message, str):
+            message = types.Content(role="user", parts=[types.Part(text=message)])
+        prompt = "".join(part.text or "" for part in message.parts or [])
+
+        runner = self.runner_for(agent)
+        session_id = await self.open_session(agent)
+        final_text = ""
+        try:
+            with track_call("agent", agent.name, prompt=prompt) as call:
+                async for event in runner.run_async(
+                    user_id=self.user_id,
+                    session_id=session_id,
+                    new_message=message,
+                ):
+                    call.mark_first_event()
+                    call.add_usage(getattr(event, "usage_metadata", None))
+                    if event.is_final_response() and event.content and event.content.parts:
+                        final_text = event.content.parts[0].text or ""
+                call.response_chars = len(final_text)
+        finally:
+            await self.close_session(agent, session_id)
+
+        return final_text
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "runners": len(self._runners),
+                "sessions_created": self.sessions_created,
+                "sessions_open": self.sessions_open,
+            }
+
+
+_runtime = None
+_runtime_lock = threading.Lock()
+
+
+def get_runtime() -> AgentRuntime:
+    """Process-wide agent runtime, created on first use."""
+    global _runtime
+    with _runtime_lock:
+        if _runtime is None:
+            _runtime = AgentRuntime()
+        return _runtime
+
+
+async def invoke(agent, message: Union[str, types.Content]) -> str:
+    """Run `agent` on `message` with the shared runtime (see AgentRuntime.invoke)."""
+    return await get_runtime().invoke(agent, message)
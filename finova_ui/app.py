@@ -1,23 +1,19 @@
 # finova_ui/app.py
 
 import asyncio
-import io
+import hashlib
 import os
 import sys
-import json
+from contextlib import closing
+from pathlib import Path
+
 import streamlit as st
 import pandas as pd
 from dotenv import load_dotenv
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.memory import InMemoryMemoryService
-from google.genai import types
-
-from Tools.csv_tools import parse_statement_csv
 
-from agents.agent1_email_monitor import email_monitor_agent
+from Tools.csv_tools import iter_statement_csv
 
-from main import parse_file, run_agent6_categorizer, save_transactions
+from main import categorize_dataframe, save_transaction_batches
 
 # ======================================================
 # Load .env
@@ -36,15 +32,21 @@ if PROJECT_ROOT not in sys.path:
 # ======================================================
 # Imports
 # ======================================================
+# matplotlib (chart_tools) and google.genai are imported where they are
+# first used, so they don't slow down every Streamlit cold start.
 from Tools.mongo_tools import get_mongo_client
-from Tools.chart_tools import generate_insight_charts
-from Tools.csv_tools import parse_statement_csv  # <-- CSV parser
+from Tools.mongo_indexes import ensure_indexes_in_background
+from Tools.answer_cache import get_answer_cache
+from Tools.metrics import get_registry, record_cache_hit, track_call
+from Tools.llm_scheduler import estimate_tokens, get_scheduler
+from Tools.query_tools import (
+    MAX_LIMIT, answer_prompt, get_data_overview, parse_query, query_prompt, run_query_mongo,
+)
+from Tools.search_index import CONTEXT_FIELDS, get_search_index
 
-try:
-    from google.genai import Client
-    from pathlib import Path
-except ImportError:
-    Client = None
+
+# Indexes of the transactions / uploaded_files collections (once per process)
+ensure_indexes_in_background()
 
 
 # ======================================================
@@ -57,9 +59,34 @@ def get_transactions():
     return list(db["transactions"].find({}, {"_id": 0}))
 
 
+def get_transactions_collection():
+    return get_mongo_client()[os.getenv("FINOVA_DB_NAME")]["transactions"]
+
+
+def load_index_rows():
+    """Fields of every stored transaction the chat search index needs."""
+    fields = {*CONTEXT_FIELDS, "merchant_key", "counterparty", "channel", "dedup_key"}
+    return list(get_transactions_collection().find({}, {field: 1 for field in fields}))
+
+
+def categorized_upload_batches(uploaded_file):
+    """Parse, categorize and yield an uploaded statement one chunk at a time."""
+    for batch in iter_statement_csv(
+        uploaded_file=uploaded_file,
+        bank_name="User Upload",
+        account_id="USER001",
+    ):
+        df = asyncio.run(categorize_dataframe(pd.DataFrame(batch)))
+        yield df.to_dict(orient="records")
+
+
 def get_gemini_client():
     api_key = os.getenv("GOOGLE_API_KEY")
-    if not api_key or Client is None:
+    if not api_key:
+        return None
+    try:
+        from google.genai import Client
+    except ImportError:
         return None
     return Client(api_key=api_key)
 
@@ -67,48 +94,169 @@ def get_gemini_client():
 # ======================================================
 # LLM Logic
 # ======================================================
-def answer_question_with_llm(question: str, transactions):
-    import matplotlib.pyplot as plt
+def answer_question_with_llm(question: str):
+    """
+    Answer a chat question: a chart dict, a string (cached answers and
+    errors) or a generator streaming a new answer. Answers are cached per
+    normalized question and data version (Tools/answer_cache.py).
 
+    Queries run inside MongoDB (Tools/query_tools.run_query_mongo); only
+    their small results are loaded, never the whole collection.
+    """
+    cache = get_answer_cache()
     chart_keywords = ["chart", "plot", "graph", "visualize", "trend"]
 
     if any(word in question.lower() for word in chart_keywords):
-        df = pd.DataFrame(transactions)
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-        df = df.dropna(subset=["date"])
+        # Every chart question draws the same monthly spend chart
+        key = cache.key("chart")
+        cached = cache.get(key)
+        if cached is not None and os.path.exists(cached["path"]):
+            return cached
+
+        import matplotlib.pyplot as plt
 
-        df["month"] = df["date"].dt.to_period("M").astype(str)
-        df_grouped = df.groupby("month")["debit"].sum().reset_index()
+        monthly = run_query_mongo(get_transactions_collection(), parse_query(
+            {"metric": "debit", "aggregate": "sum", "group_by": "month", "limit": MAX_LIMIT}))
+        months = [group for group in monthly["groups"] if group["key"]]
 
         plt.figure(figsize=(10, 4))
-        plt.plot(df_grouped["month"], df_grouped["debit"])
+        plt.plot([group["key"] for group in months], [group["value"] for group in months])
         plt.xticks(rotation=45)
         plt.tight_layout()
 
         chart_path = "generated_chart.png"
         plt.savefig(chart_path)
+        plt.close()
 
-        return {"type": "chart", "path": chart_path, "message": "Here is your chart."}
+        reply = {"type": "chart", "path": chart_path, "message": "Here is your chart."}
+        cache.put(key, reply)
+        return reply
+
+    key = cache.key(question)
+    cached = cache.get(key)
+    if cached is not None:
+        record_cache_hit("generate_content", "chat", prompt=question, response=str(cached))
+        return cached
 
     client = get_gemini_client()
     if client is None:
         return "Gemini client not configured."
 
-    prompt = f"""
-    You are Finova, an AI assistant.
-    User asked: {question}
-    Transactions: {json.dumps(transactions)}
-    Provide a clear answer.
+    return _cache_when_complete(_stream_answer(client, question), key)
+
+
+def _cache_when_complete(stream, key: str):
+    """Pass a streamed answer through and cache it once it finished without errors."""
+    parts = []
+    try:
+        for text in stream:
+            parts.append(text)
+            yield text
+    except Exception as e:
+        yield str(e)
+        return
+    get_answer_cache().put(key, "".join(parts))
+
+
+def _stream_answer(client, question: str):
     """
+    Generator over the answer text as Gemini produces it.
 
+    The model only sees a small overview of the data: it writes a structured
+    query, Finova runs it in MongoDB and the model phrases the (small) result.
+    Open-ended questions get the best-matching rows from the search index.
+    """
+    collection = get_transactions_collection()
+    raw_query = _generate(client, query_prompt(question, get_data_overview(collection)), "chat_query")
     try:
-        response = client.models.generate_content(
-            model="gemini-2.0-flash",
-            contents=[prompt],
+        query = parse_query(raw_query)
+    except ValueError as e:
+        print(f"Unusable chat query ({e}); answering from retrieved transactions")
+        query = None
+
+    if query is None or query["aggregate"] == "search":
+        # Open-ended question: top matches from the local index plus period totals
+        context = get_search_index(loader=load_index_rows).context(question)
+        prompt = answer_prompt(question, context=context)
+    else:
+        prompt = answer_prompt(question, run_query_mongo(collection, query))
+
+    yield from _generate_stream(client, prompt, "chat")
+
+
+def _generate(client, prompt: str, name: str) -> str:
+    """One generate_content call in the interactive lane of the shared rate limiter."""
+    with track_call("generate_content", name, prompt=prompt) as call:
+        # Interactive lane, ahead of background categorization
+        response = get_scheduler().run_sync(
+            lambda: client.models.generate_content(
+                model="gemini-2.0-flash",
+                contents=[prompt],
+            ),
+            key=hashlib.sha256(prompt.encode("utf-8")).hexdigest(),
+            estimated_tokens=estimate_tokens(prompt),
+            tokens_used=lambda r: getattr(getattr(r, "usage_metadata", None), "total_token_count", None),
+            lane_name="interactive",
         )
-        return getattr(response, "text", str(response))
-    except Exception as e:
-        return str(e)
+        call.mark_first_event()
+        call.add_usage(getattr(response, "usage_metadata", None))
+        answer = getattr(response, "text", str(response))
+        call.response_chars = len(answer or "")
+    return answer
+
+
+def _generate_stream(client, prompt: str, name: str):
+    """Streamed counterpart of _generate: yields text chunks as they arrive."""
+    def total_tokens(chunk):
+        return getattr(getattr(chunk, "usage_metadata", None), "total_token_count", None)
+
+    with track_call("generate_content", name, prompt=prompt) as call:
+        stream = get_scheduler().stream_sync(
+            lambda: client.models.generate_content_stream(
+                model="gemini-2.0-flash",
+                contents=[prompt],
+            ),
+            estimated_tokens=estimate_tokens(prompt),
+            tokens_used=total_tokens,
+            lane_name="interactive",
+        )
+        last = None
+        with closing(stream):
+            for chunk in stream:
+                call.mark_first_event()
+                last = chunk
+                text = chunk.text or ""
+                call.response_chars += len(text)
+                if text:
+                    yield text
+        # Usage is cumulative; the last chunk carries the totals
+        call.add_usage(getattr(last, "usage_metadata", None))
+
+
+def _render_stream(stream) -> str:
+    """
+    Render a streamed answer in the current chat bubble as it arrives and
+    return the full text. Sending a new message reruns the script, which
+    interrupts this: the stream is closed and the partial answer is kept in
+    the chat history.
+    """
+    parts = []
+
+    def collect():
+        for text in stream:
+            parts.append(text)
+            yield text
+
+    try:
+        st.write_stream(collect())
+    except BaseException:
+        stream.close()
+        if parts:
+            st.session_state.chat_history.append(
+                {"role": "assistant", "content": "".join(parts) + " …*(stopped)*"}
+            )
+        raise
+    return "".join(parts)
 
 
 # ======================================================
@@ -160,6 +308,24 @@ with st.sidebar:
     st.markdown("---")
     st.caption("Multi-agent AI finance assistant")
 
+    # Optional: latency / token metrics of the last model calls
+    if st.checkbox("Show model call metrics", value=os.getenv("FINOVA_METRICS_PANEL") == "1"):
+        registry = get_registry()
+        last_n = st.number_input("Last N calls", min_value=5, max_value=500, value=20, step=5)
+        calls = registry.recent(int(last_n))
+        if calls:
+            st.dataframe(
+                pd.DataFrame(calls)[[
+                    "kind", "name", "seconds", "first_event_seconds", "prompt_tokens",
+                    "response_tokens", "retries", "cache_hit", "status",
+                ]],
+                hide_index=True,
+            )
+        else:
+            st.caption("No model calls yet.")
+        st.download_button("Export JSON lines", registry.to_jsonl(), "finova_metrics.jsonl")
+        st.download_button("Export Prometheus", registry.to_prometheus(), "finova_metrics.prom")
+
 page = st.session_state.page
 
 
@@ -211,31 +377,24 @@ if page == "upload":
             st.stop()
         
         with st.spinner("Processing file..."):
-
-            parsed = parse_statement_csv(
-                path=None,
-                uploaded_file=uploaded_file,
-                bank_name="User Upload",
-                account_id="USER001"
-            )
-
-            parsed_csv = pd.DataFrame(parsed["transactions"]).to_csv(index=False)
-            categorized = asyncio.run(run_agent6_categorizer(parsed_csv))
-            df = pd.read_csv(io.StringIO(categorized))
-            records = df.to_dict(orient="records")
-            parsed = {
-                "bank_name": records[0]["bank_name"] if records else None,
-                "account_id": records[0]["account_id"] if records else None,
-                "transactions": records
-            }
-
-            print(parsed)
             print("saving transactions")
-            saved = asyncio.run(save_transactions(parsed, uploaded_file.name))
-            if saved: print ("Saved")
-
-        st.success("File uploaded and processed successfully!")
-        st.info("You can now check the Dashboard or chat with Finova.")
+            result = save_transaction_batches(
+                categorized_upload_batches(uploaded_file), uploaded_file.name
+            )
+            print({key: value for key, value in result.items() if key != "errors"})
+            if result["status"] == "success": print ("Saved")
+
+        rejected = result["failed_count"] - result["duplicate_count"]
+        total = result["inserted_count"] + result["failed_count"]
+        if result.get("duplicate_count"):
+            st.info(f"{result['duplicate_count']} transactions were already stored and were skipped.")
+        if result["status"] == "success":
+            st.success("File uploaded and processed successfully!")
+            st.info("You can now check the Dashboard or chat with Finova.")
+        elif result["status"] == "partial":
+            st.warning(f"File uploaded, but {rejected} of {total} transactions could not be stored.")
+        else:
+            st.error(f"The file could not be stored ({rejected} of {total} transactions rejected).")
 
     # NEW: fetch upload history collection
     client = get_mongo_client()
@@ -285,6 +444,8 @@ elif page == "dashboard":
     if not transactions:
         st.warning("No transactions found. Upload a statement in CSV format.")
     else:
+        from Tools.chart_tools import generate_insight_charts
+
         summary_data, chart_paths = generate_insight_charts(transactions)
 
         st.markdown("### Overview")
@@ -351,6 +512,24 @@ elif page == "dashboard":
                 unsafe_allow_html=True,
             )
 
+        recurring = summary_data.get("recurring_payments", [])
+        if recurring:
+            st.markdown('<div class="section-gap"></div>', unsafe_allow_html=True)
+            st.markdown("### Recurring Payments")
+            items = "".join(
+                f"<li>{item['merchant']}: <b>{_fmt_inr(item['average_amount'])}</b>"
+                f" avg · {item['months']} months</li>"
+                for item in recurring
+            )
+            st.markdown(
+                f"""
+                <div style="background:white;padding:16px;border-radius:12px;border:1px solid #e5e7eb;">
+                    <ul>{items}</ul>
+                </div>
+                """,
+                unsafe_allow_html=True,
+            )
+
         st.markdown('<div class="section-gap"></div>', unsafe_allow_html=True)
         st.markdown("### Charts")
 
@@ -371,9 +550,8 @@ elif page == "dashboard":
 elif page == "chat":
     st.title("💬 Chat with Finova")
 
-    transactions = get_transactions()
-
-    if not transactions:
+    # Only an overview is loaded here; questions are answered by Mongo queries
+    if not get_data_overview(get_transactions_collection())["transactions"]:
         st.warning("Upload a CSV first.")
     else:
         if "chat_history" not in st.session_state:
@@ -394,10 +572,12 @@ elif page == "chat":
                 st.markdown(user_input)
 
             with st.chat_message("assistant"):
-                reply = answer_question_with_llm(user_input, transactions)
+                reply = answer_question_with_llm(user_input)
                 if isinstance(reply, dict):
                     st.image(reply["path"])
-                else:
+                elif isinstance(reply, str):
                     st.markdown(reply)
+                else:
+                    reply = _render_stream(reply)
 
             st.session_state.chat_history.append({"role": "assistant", "content": reply})
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Finova Batch Ingest
+
+Parses a whole directory (or glob) of statement CSVs in parallel with a
+process pool and stores the transactions in MongoDB with bulk writes.
+
+Usage:
+    python batch_ingest.py <directory-or-glob> [options]
+
+Options:
+    --workers N       Number of parser processes (default: CPU count)
+    --batch-size N    Transactions per bulk insert (default: 5000)
+    --bank-name NAME  Bank name stored on every transaction
+    --account-id ID   Account id stored on every transaction
+    --dry-run         Parse only, do not write to MongoDB
+
+Example:
+    python batch_ingest.py ../sample-data
+    python batch_ingest.py "../sample-data/bank_statement_*.csv" --workers 4 --dry-run
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add current directory to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+DEFAULT_BATCH_SIZE = 5000
+
+
+def resolve_statement_files(target: str) -> list:
+    """Return the CSV files in a directory, or the files matching a glob."""
+    if os.path.isdir(target):
+        pattern = os.path.join(target, "*.csv")
+    else:
+        pattern = target
+    return sorted(path for path in glob.glob(pattern) if os.path.isfile(path))
+
+
+def _parse_one(path: str, bank_name: str, account_id: str) -> dict:
+    """Worker: parse a single statement file and time it."""
+    from Tools.csv_tools import parse_statement_csv
+
+    start = time.perf_counter()
+    parsed = parse_statement_csv(path=path, bank_name=bank_name, account_id=account_id)
+    return {
+        "path": path,
+        "transactions": parsed["transactions"],
+        "date_parse_failures": parsed["date_parse_failures"],
+        "date_lenient_parses": parsed["date_lenient_parses"],
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def _learn_profiles(paths: list):
+    """
+    Learn the bank profiles of new headers here, before the workers start,
+    so parser processes never learn and save the same header concurrently.
+    """
+    from Tools.csv_tools import ensure_profile
+
+    for path in paths:
+        try:
+            ensure_profile(path=path)
+        except Exception as e:
+            # The worker parsing this file reports the error
+            print(f"⚠️ Could not learn a profile for {os.path.basename(path)}: {e}")
+
+
+def ingest_files(paths: list, workers: int = None, batch_size: int = DEFAULT_BATCH_SIZE,
+                 bank_name: str = "Unknown bank", account_id: str = "Unknown",
+                 dry_run: bool = False) -> dict:
+    """
+    Parse statement files in parallel and bulk-insert their transactions.
+
+    Profiles of new headers are learned first in this process; then files
+    are handed to a process pool, and as each one finishes its timing and
+    row count are printed and it is stored as one upload (save_upload:
+    bulk inserts of `batch_size` rows and an uploaded_files record with
+    the number of rows actually inserted).
+
+    Returns:
+        dict with per-file results (without transactions) and totals
+    """
+    files = []
+    _learn_profiles(paths)
+
+    def completed_results():
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {
+                pool.submit(_parse_one, path, bank_name, account_id): path
+                for path in paths
+            }
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    print(f"❌ {os.path.basename(path)}: {e}")
+                    files.append({"path": path, "status": "error", "message": str(e)})
+                    continue
+
+                rows = len(result["transactions"])
+                print(f"📄 {os.path.basename(path)}: {rows} rows in {result['seconds']:.2f}s")
+                file = {
+                    "path": path,
+                    "status": "success",
+                    "rows": rows,
+                    "seconds": result["seconds"],
+                    "date_parse_failures": result["date_parse_failures"],
+                    "date_lenient_parses": result["date_lenient_parses"],
+                }
+                files.append(file)
+                yield file, result
+
+    start = time.perf_counter()
+    if dry_run:
+        parsed = sum(len(result["transactions"]) for _, result in completed_results())
+        insert_result = {"status": "skipped", "parsed_count": parsed}
+    else:
+        from Tools.mongo_indexes import ensure_indexes
+        from Tools.mongo_tools import save_upload
+
+        ensure_indexes()
+        insert_result = {"inserted_count": 0, "failed_count": 0, "duplicate_count": 0,
+                         "batch_count": 0}
+        for file, result in completed_results():
+            report = save_upload(
+                db_name=os.getenv("FINOVA_DB_NAME"),
+                filename=os.path.basename(file["path"]),
+                batches=[result["transactions"]],
+                bank_name=bank_name,
+                batch_size=batch_size,
+            )
+            file["upload"] = {key: report[key] for key in
+                              ("status", "upload_id", "inserted_count", "failed_count", "duplicate_count")}
+            for key in ("inserted_count", "failed_count", "duplicate_count", "batch_count"):
+                insert_result[key] += report[key]
+
+        statuses = {file["upload"]["status"] for file in files if "upload" in file}
+        insert_result["status"] = ("success" if statuses <= {"success"} else
+                                   "partial" if insert_result["inserted_count"] else "error")
+
+    return {
+        "files": files,
+        "insert": insert_result,
+        "total_rows": sum(file.get("rows", 0) for file in files),
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def main():
+    """Main function to handle command line arguments and execute batch ingestion."""
+    parser = argparse.ArgumentParser(description="Parse and store a directory of statement CSVs.")
+    parser.add_argument("target", help="Directory of CSV files or a glob pattern")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--bank-name", default="Unknown bank")
+    parser.add_argument("--account-id", default="Unknown")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    paths = resolve_statement_files(args.target)
+    if not paths:
+        print(f"❌ Error: no CSV files found for {args.target}")
+        sys.exit(1)
+
+    print(f"📁 Ingesting {len(paths)} files with {args.workers or os.cpu_count()} workers...")
+
+    try:
+        result = ingest_files(
+            paths,
+            workers=args.workers,
+            batch_size=args.batch_size,
+            bank_name=args.bank_name,
+            account_id=args.account_id,
+            dry_run=args.dry_run,
+        )
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
+
+    failed = sum(1 for file in result["files"] if file["status"] == "error")
+    print(f"\n🎉 Ingested {result['total_rows']} rows from {len(paths) - failed} files "
+          f"in {result['seconds']:.2f}s")
+    print(f"🗄️  Mongo: {result['insert']}")
+    if failed:
+        print(f"⚠️ {failed} files failed to parse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Benchmark: startup (import) time of each Finova entry point.
+
+Runs every entry point in a fresh interpreter with `python -X importtime`,
+sums the cumulative time of its top-level imports and compares it to a
+budget, so an eager import of the agents, google.adk, matplotlib or
+sklearn creeping back in is caught. The slowest imports of each entry
+point are listed to show where the time goes.
+
+Usage:
+    python benchmarks/bench_import_time.py [--check] [--runs N] [--top N]
+
+Options:
+    --check    Exit with status 1 if any entry point is over its budget
+    --runs N   Take the best of N runs per entry point (default 3)
+    --top N    Slowest imports listed per entry point (default 5)
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(current_dir)
+
+# Entry point -> (code run at startup, budget in ms).
+# app.py renders the Streamlit page when it is imported; Streamlit runs it
+# in bare mode here, with a page that renders nothing, so the whole module
+# is imported without a MongoDB or a browser session.
+ENTRY_POINTS = {
+    "main": ("import main", 300),
+    "app": ("import streamlit; streamlit.session_state.page = 'import-time'; import app", 1500),
+    "categorize_transactions --help": (
+        "import sys; sys.argv = ['categorize_transactions.py', '--help'];"
+        "import runpy; runpy.run_path('categorize_transactions.py', run_name='__main__')",
+        300,
+    ),
+    "batch_ingest --help": (
+        "import sys; sys.argv = ['batch_ingest.py', '--help'];"
+        "import runpy; runpy.run_path('batch_ingest.py', run_name='__main__')",
+        300,
+    ),
+    "train_classifier --help": (
+        "import sys; sys.argv = ['train_classifier.py', '--help'];"
+        "import runpy; runpy.run_path('train_classifier.py', run_name='__main__')",
+        300,
+    ),
+}
+
+# "import time:   self [us] | cumulative | imported package"
+_LINE_RE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+
+def measure(code: str):
+    """
+    Total import time (ms) of one run, and the cumulative time (µs) of the
+    outermost import of each top-level package, e.g. "google" or "pandas".
+    """
+    env = dict(os.environ, FINOVA_DB_NAME=os.getenv("FINOVA_DB_NAME") or "finova_bench")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=project_dir,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+
+    total_us = 0
+    packages = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        _, cumulative, indent, module = match.groups()
+        # Nested imports are indented two spaces per level
+        if len(indent) == 1:
+            total_us += int(cumulative)
+        package = module.split(".")[0]
+        packages[package] = max(packages.get(package, 0), int(cumulative))
+
+    return total_us / 1000, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure Finova entry point import times.")
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    over_budget = []
+    print(f"{'entry point':<32} {'import (ms)':>11} {'budget (ms)':>11}")
+    for name, (code, budget_ms) in ENTRY_POINTS.items():
+        try:
+            runs = [measure(code) for _ in range(args.runs)]
+        except RuntimeError as e:
+            print(f"{name:<32} {'failed':>11} {budget_ms:>11}  ({e})")
+            over_budget.append(name)
+            continue
+
+        total_ms, modules = min(runs, key=lambda run: run[0])
+
+        flag = "" if total_ms <= budget_ms else "  ❌ over budget"
+        print(f"{name:<32} {total_ms:>11.0f} {budget_ms:>11}{flag}")
+        for module, us in sorted(modules.items(), key=lambda item: -item[1])[:args.top]:
+            print(f"    {module:<40} {us / 1000:>8.0f} ms")
+
+        if total_ms > budget_ms:
+            over_budget.append(name)
+
+    if args.check and over_budget:
+        print(f"❌ Over budget: {', '.join(over_budget)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
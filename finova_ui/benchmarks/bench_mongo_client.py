@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark: a new MongoClient per request (the old get_mongo_client) vs the
+shared process-wide client.
+
+Each request is one `ping`. With a new client per request every ping pays
+for client construction, server discovery and a TCP/TLS handshake; with
+the shared client only the first one does. If no server answers at the
+URI, only the construction / teardown cost of a client is measured.
+
+Usage:
+    python benchmarks/bench_mongo_client.py [--requests N] [--uri URI]
+
+The URI defaults to MONGODB_URI. For a local mongod without TLS:
+    FINOVA_MONGO_TLS=0 python benchmarks/bench_mongo_client.py --uri mongodb://localhost:27017
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+from dotenv import load_dotenv
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+
+# Add finova_ui to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(current_dir)
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+load_dotenv(os.path.join(project_dir, ".env"))
+
+from Tools.mongo_tools import client_options, close_mongo_client, get_mongo_client
+
+
+def _report(label: str, samples: list):
+    samples_ms = [s * 1000 for s in samples]
+    print(f"{label:<26} {statistics.mean(samples_ms):>9.2f} {statistics.median(samples_ms):>9.2f} "
+          f"{max(samples_ms):>9.2f}")
+
+
+def per_request(uri: str, requests: int, ping: bool) -> list:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client = MongoClient(uri, **client_options())
+        if ping:
+            client.admin.command("ping")
+        client.close()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def shared(requests: int, ping: bool) -> list:
+    samples = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        client = get_mongo_client()
+        if ping:
+            client.admin.command("ping")
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MongoClient reuse.")
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--uri", default=os.getenv("MONGODB_URI") or "mongodb://localhost:27017")
+    args = parser.parse_args()
+    os.environ["MONGODB_URI"] = args.uri
+
+    try:
+        get_mongo_client().admin.command("ping")
+        ping = True
+        print(f"Server: {args.uri.split('@')[-1]}")
+    except PyMongoError as e:
+        ping = False
+        print(f"No server reachable ({type(e).__name__}); measuring client construction only")
+    close_mongo_client()
+
+    print(f"{'per request':<26} {'mean ms':>9} {'median ms':>9} {'max ms':>9}")
+    _report("new client per request", per_request(args.uri, args.requests, ping))
+    _report("shared client", shared(args.requests, ping))
+    close_mongo_client()
+
+
+if __name__ == "__main__":
+    main()
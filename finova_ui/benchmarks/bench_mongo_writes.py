@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-row insert_one (the old save_transactions) vs batched
+unordered insert_many (Tools/mongo_tools.insert_batches).
+
+By default the writes go to an in-process stand-in for a remote collection:
+each call costs one network round trip (--rtt-ms) plus a per-document
+server cost, added to a virtual clock instead of slept, so a 50k-row
+statement over a slow link is measured in seconds. With --uri the same
+writes go to a real server (e.g. a local mongod) in a scratch database
+that is dropped afterwards.
+
+Every --duplicate-every'th row reuses the _id of the row before it, so the
+partial-failure report of the unordered inserts is exercised too.
+
+Usage:
+    python benchmarks/bench_mongo_writes.py [--rows N] [--batch-sizes 100 1000 ...]
+        [--rtt-ms MS] [--uri mongodb://localhost:27017] [--write-concern 1|majority|0]
+
+Example:
+    python benchmarks/bench_mongo_writes.py --rows 50000 --rtt-ms 30
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+# Add finova_ui to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(current_dir)
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+from Tools.mongo_tools import insert_batches
+
+
+class SimulatedCollection:
+    """
+    Stand-in for a remote collection. Every call is charged one round trip
+    of `rtt_ms` plus `per_doc_us` per document on a virtual clock
+    (network_seconds). Duplicate _ids are rejected like the server does.
+    """
+
+    def __init__(self, rtt_ms: float, per_doc_us: float = 10):
+        self.rtt = rtt_ms / 1000
+        self.per_doc = per_doc_us / 1_000_000
+        self.network_seconds = 0.0
+        self.calls = 0
+        self.ids = set()
+
+    def with_options(self, **kwargs):
+        return self
+
+    def _charge(self, docs: int):
+        self.calls += 1
+        self.network_seconds += self.rtt + docs * self.per_doc
+
+    def _insert(self, doc) -> bool:
+        doc.setdefault("_id", ObjectId())
+        if doc["_id"] in self.ids:
+            return False
+        self.ids.add(doc["_id"])
+        return True
+
+    def insert_one(self, doc):
+        self._charge(1)
+        if not self._insert(doc):
+            raise ValueError(f"E11000 duplicate key {doc['_id']}")
+
+    def insert_many(self, docs, ordered=True):
+        self._charge(len(docs))
+        errors = []
+        for index, doc in enumerate(docs):
+            if not self._insert(doc):
+                errors.append({"index": index, "code": 11000, "errmsg": "E11000 duplicate key error"})
+                if ordered:
+                    break
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nInserted": len(docs) - len(errors)})
+
+    def drop(self):
+        self.ids.clear()
+
+
+def make_transactions(rows: int, duplicate_every: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(100, 500_000, rows) / 100.0
+    txns = []
+    for i in range(rows):
+        txn = {
+            "date": f"2024-{1 + i % 12:02d}-{1 + i % 28:02d}",
+            "description": f"UPI-{rng.integers(7_000_000_000, 9_999_999_999)}-MERCHANT {i % 500}",
+            "debit": float(amounts[i]),
+            "credit": 0.0,
+            "balance": None,
+            "bank_name": "Bench Bank",
+            "account_id": "BENCH001",
+            "_id": ObjectId(),
+        }
+        if duplicate_every and i and i % duplicate_every == 0:
+            txn["_id"] = txns[-1]["_id"]
+        txns.append(txn)
+    return txns
+
+
+def per_row(collection, txns) -> dict:
+    inserted = failed = 0
+    for tx in txns:
+        try:
+            collection.insert_one(tx)
+            inserted += 1
+        except Exception:
+            failed += 1
+    return {"inserted_count": inserted, "failed_count": failed, "batch_count": len(txns)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batched Mongo writes.")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1_000, 5_000])
+    parser.add_argument("--rtt-ms", type=float, default=30, help="simulated round trip (stand-in only)")
+    parser.add_argument("--duplicate-every", type=int, default=10_000)
+    parser.add_argument("--uri", default=None, help="real MongoDB to write to instead of the stand-in")
+    parser.add_argument("--write-concern", default=None)
+    args = parser.parse_args()
+
+    if args.uri:
+        from pymongo import MongoClient
+        client = MongoClient(args.uri)
+        db = client["finova_bench_writes"]
+        new_collection = lambda: db["transactions"]
+        print(f"Target: {args.uri}")
+    else:
+        new_collection = lambda: SimulatedCollection(args.rtt_ms)
+        print(f"Target: in-process stand-in, {args.rtt_ms:.0f} ms round trip")
+
+    print(f"{'method':<22} {'seconds':>9} {'rows/s':>10} {'calls':>7} {'inserted':>9} {'rejected':>9}")
+
+    runs = [("insert_one per row", None)] + [(f"insert_many x{size}", size) for size in args.batch_sizes]
+    for label, batch_size in runs:
+        collection = new_collection()
+        collection.drop()
+        txns = make_transactions(args.rows, args.duplicate_every)
+
+        start = time.perf_counter()
+        if batch_size is None:
+            report = per_row(collection, txns)
+        else:
+            report = insert_batches(collection, [txns], batch_size=batch_size, w=args.write_concern)
+        seconds = time.perf_counter() - start + getattr(collection, "network_seconds", 0.0)
+
+        print(f"{label:<22} {seconds:>9.2f} {args.rows / seconds:>10,.0f} {report['batch_count']:>7} "
+              f"{report['inserted_count']:>9} {report['failed_count']:>9}")
+
+    if args.uri:
+        client.drop_database("finova_bench_writes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Check: the upload page and chat queries are served by the indexes of
+Tools/mongo_indexes.py, not by collection scans.
+
+Seeds a scratch database with synthetic transactions and uploads (or uses
+an existing database with --no-seed), ensures the indexes, then runs
+`explain` (executionStats) on the queries the app sends: the upload
+history of the upload page, the overview and chat aggregations the chat
+page runs through Tools/query_tools.py (get_data_overview,
+run_query_mongo), plus lookups by dedup_key and upload_id, which the
+storage path relies on those indexes for (duplicate rejection, cleaning up
+an unfinished upload). Prints the winning plan of each and exits with
+status 1 if any of them scans the collection or misses its expected index.
+(The overview's bank list and top merchants do scan; they are computed
+once per data version, not per question.) Every query is explained with
+the collation the app sends it with: the case-insensitive one for name
+filters and groupings, none for date-only queries, which use the
+uncollated `date` index.
+
+Usage:
+    python benchmarks/check_query_plans.py [--rows N] [--uri URI] [--db NAME] [--no-seed] [--keep]
+
+Example (local mongod without TLS):
+    FINOVA_MONGO_TLS=0 python benchmarks/check_query_plans.py --uri mongodb://localhost:27017 --rows 200000
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+from dotenv import load_dotenv
+
+# Add finova_ui to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_dir = os.path.dirname(current_dir)
+if project_dir not in sys.path:
+    sys.path.append(project_dir)
+
+load_dotenv(os.path.join(project_dir, ".env"))
+
+from Tools.mongo_indexes import CASE_INSENSITIVE, add_dedup_keys, ensure_indexes
+from Tools.mongo_tools import get_mongo_client, insert_batches, iter_batches
+from Tools.query_tools import parse_query, query_collation, to_pipeline
+
+ACCOUNTS = ["SAV001", "SAV002", "CC0001", "CC0002"]
+CATEGORIES = ["Food", "Groceries", "Shopping", "Bills", "Travel", "Health", "Salary", "Other"]
+
+
+def seed(db, rows: int):
+    """Synthetic transactions over ten years plus one uploaded_files record per 1000 rows."""
+    rng = np.random.default_rng(0)
+    days = np.sort(rng.integers(0, 3650, rows))
+    dates = (np.datetime64("2015-01-01") + days).astype(str)
+    amounts = rng.integers(100, 500_000, rows) / 100.0
+    upload_ids = [f"upload{i:05d}" for i in range(rows // 1000 + 1)]
+
+    def transactions():
+        for i in range(rows):
+            yield {
+                "date": dates[i],
+                "description": f"UPI-{rng.integers(7_000_000_000, 9_999_999_999)}-MERCHANT {i % 800}",
+                "debit": float(amounts[i]),
+                "credit": 0.0,
+                "balance": None,
+                "bank_name": "Plan Bank",
+                "account_id": ACCOUNTS[i % len(ACCOUNTS)],
+                "category": CATEGORIES[i % len(CATEGORIES)],
+                "merchant_key": f"MERCHANT {i % 800}",
+                "upload_id": upload_ids[i // 1000],
+            }
+
+    report = insert_batches(db["transactions"], add_dedup_keys(iter_batches(transactions())), w=1)
+    db["uploaded_files"].insert_many([
+        {"upload_id": upload_id, "filename": f"{upload_id}.csv", "transaction_count": 1000,
+         "uploaded_at": f"2025-{1 + i % 12:02d}-{1 + i % 28:02d} {i % 24:02d}:00:00",
+         "bank_name": "Plan Bank", "status": "success"}
+        for i, upload_id in enumerate(upload_ids)
+    ])
+    print(f"Seeded {report['inserted_count']} transactions and {len(upload_ids)} uploads")
+
+
+def _walk(node, key):
+    """Every value stored under `key` anywhere in an explain document."""
+    if isinstance(node, dict):
+        for k, value in node.items():
+            if k == key:
+                yield value
+            yield from _walk(value, key)
+    elif isinstance(node, list):
+        for value in node:
+            yield from _walk(value, key)
+
+
+def plan_summary(explain: dict) -> dict:
+    """Stages, index names and execution counts of an explain result."""
+    winning = list(_walk(explain, "winningPlan"))
+    stats = next(_walk(explain, "executionStats"), {})
+    return {
+        "stages": sorted({stage for plan in winning for stage in _walk(plan, "stage")}),
+        "indexes": sorted({name for plan in winning for name in _walk(plan, "indexName")}),
+        "examined": stats.get("totalDocsExamined"),
+        "keys": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "ms": stats.get("executionTimeMillis"),
+    }
+
+
+def chat_query(db, spec: dict) -> dict:
+    """Explain of the aggregation run_query_mongo sends for a chat query."""
+    query = parse_query(spec)
+    command = {"aggregate": "transactions", "pipeline": to_pipeline(query), "cursor": {}}
+    collation = query_collation(query)
+    if collation is not None:
+        command["collation"] = collation.document
+    return db.command("explain", command, verbosity="executionStats")
+
+
+def find_query(db, collection: str, filter_: dict, sort: dict = None, limit: int = 0,
+               collation: dict = None) -> dict:
+    command = {"find": collection, "filter": filter_}
+    if sort:
+        command["sort"] = sort
+    if limit:
+        command["limit"] = limit
+    if collation:
+        command["collation"] = collation
+    return db.command("explain", command, verbosity="executionStats")
+
+
+def distinct_query(db, key: str) -> dict:
+    """Explain of a distinct of the chat overview (describe_data_mongo)."""
+    return db.command(
+        "explain",
+        {"distinct": "transactions", "key": key, "query": {}, "collation": CASE_INSENSITIVE.document},
+        verbosity="executionStats",
+    )
+
+
+def checks(db):
+    """(label, explain result, acceptable indexes) of every query the app sends."""
+    sample = db["transactions"].find_one({}, {"dedup_key": 1, "upload_id": 1}) or {}
+    return [
+        ("upload history (newest 5)",
+         find_query(db, "uploaded_files", {}, sort={"uploaded_at": -1}, limit=5), ["uploaded_at"]),
+        ("overview: last date",
+         find_query(db, "transactions", {"date": {"$gt": ""}}, sort={"date": -1}, limit=1),
+         ["date"]),
+        ("overview: accounts", distinct_query(db, "account_id"), ["account_date"]),
+        ("overview: categories", distinct_query(db, "category"), ["category_date"]),
+        ("chat: spend in a month",
+         chat_query(db, {"start_date": "2024-04-01", "end_date": "2024-04-30"}), ["date"]),
+        ("chat: account + period",
+         chat_query(db, {"account_id": "sav001", "start_date": "2024-01-01",
+                         "end_date": "2024-03-31"}), ["account_date"]),
+        ("chat: category by month",
+         chat_query(db, {"category": "food", "start_date": "2023-01-01", "end_date": "2023-12-31",
+                         "group_by": "month"}), ["category_date"]),
+        ("chat: largest in account",
+         chat_query(db, {"account_id": "CC0001", "start_date": "2024-06-01",
+                         "end_date": "2024-06-30", "aggregate": "list"}), ["account_date"]),
+        ("chat: category, all time",
+         chat_query(db, {"category": "Travel", "aggregate": "count"}), ["category_date"]),
+        ("dedup key lookup",
+         find_query(db, "transactions", {"dedup_key": sample.get("dedup_key")}), ["dedup_key"]),
+        ("rows of one upload",
+         find_query(db, "transactions", {"upload_id": sample.get("upload_id")}), ["upload_id"]),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the query plans of Finova's Mongo queries.")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--uri", default=None, help="default: MONGODB_URI")
+    parser.add_argument("--db", default=None,
+                        help="database (default: finova_plan_check, or FINOVA_DB_NAME with --no-seed)")
+    parser.add_argument("--no-seed", action="store_true", help="check an existing database as is")
+    parser.add_argument("--keep", action="store_true", help="don't drop the seeded database")
+    args = parser.parse_args()
+
+    if args.uri:
+        os.environ["MONGODB_URI"] = args.uri
+    db_name = args.db or (os.getenv("FINOVA_DB_NAME") if args.no_seed else "finova_plan_check")
+    client = get_mongo_client()
+    db = client[db_name]
+
+    if not args.no_seed:
+        client.drop_database(db_name)
+        seed(db, args.rows)
+    ensure = ensure_indexes(db_name, force=True)
+    if ensure["status"] != "success":
+        sys.exit(f"Could not create the indexes: {ensure.get('error')}")
+
+    failures = 0
+    print(f"{'query':<28} {'ok':<4} {'indexes':<22} {'stages':<40} {'keys':>8} {'docs':>8} {'ret':>6} {'ms':>5}")
+    for label, explain, expected in checks(db):
+        summary = plan_summary(explain)
+        ok = "COLLSCAN" not in summary["stages"] and bool(set(summary["indexes"]) & set(expected))
+        failures += not ok
+        print(f"{label:<28} {'yes' if ok else 'NO':<4} {','.join(summary['indexes']) or '-':<22} "
+              f"{','.join(summary['stages'])[:40]:<40} {summary['keys'] or 0:>8} "
+              f"{summary['examined'] or 0:>8} {summary['returned'] or 0:>6} {summary['ms'] or 0:>5}")
+
+    if not args.no_seed and not args.keep:
+        client.drop_database(db_name)
+
+    if failures:
+        sys.exit(f"{failures} queries don't use their index")
+    print("All queries use their indexes")
+
+
+if __name__ == "__main__":
+    main()
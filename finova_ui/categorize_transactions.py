@@ -31,8 +31,6 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-from main import run_agent6_categorizer
-
 
 async def categorize_csv_file(input_path: str, output_path: str = None) -> str:
     """
@@ -59,6 +57,7 @@ async def categorize_csv_file(input_path: str, output_path: str = None) -> str:
         csv_content = file.read()
     
     print(f"🤖 Processing with Agent 6 Transaction Categorizer...")
+    from main import run_agent6_categorizer
     
     # Use Agent 6 to categorize the transactions
     categorized_csv = await run_agent6_categorizer(csv_content)
@@ -76,6 +75,9 @@ def main():
     if len(sys.argv) < 2:
         print(__doc__)
         sys.exit(1)
+    if sys.argv[1] in ("-h", "--help"):
+        print(__doc__)
+        return
     
     input_file = sys.argv[1]
     output_file = sys.argv[2] if len(sys.argv) > 2 else None
@@ -1,37 +1,25 @@
-import os
-
-import pandas as pd
-
-from Tools.mongo_tools import get_mongo_client
-print("=== DEBUG: Current Working Directory ===")
-print(os.getcwd())
-print("=== DEBUG: Files in this directory ===")
-print(os.listdir(os.getcwd()))
-print("========================================")
-
-from Tools.chart_tools import generate_insight_charts
-
 # main.py
-from dotenv import load_dotenv
-load_dotenv()
+#
+# Heavy dependencies (pandas, matplotlib, google.adk and the agents, which
+# build a Gemini model) are imported inside the functions that use them, so
+# importing this module for one helper stays fast.
 
-import json
 import asyncio
+import json
+import os
 
-from Tools.csv_tools import parse_statement_csv
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.adk.memory import InMemoryMemoryService
-from google.genai import types
-
-from agents.agent1_email_monitor import email_monitor_agent
+from dotenv import load_dotenv
+load_dotenv()
 
 
-APP_NAME = "finova_app"
-USER_ID = "finova_user"
-SESSION_ID_EMAIL = "session_email_1"
 DB_NAME = os.getenv("FINOVA_DB_NAME")
 
+# Agent 6: rows per LLM request, concurrent requests, attempts per chunk
+# when the model returns an invalid or partial mapping
+CATEGORIZER_CHUNK_SIZE = int(os.getenv("FINOVA_CATEGORIZER_CHUNK_SIZE", "100"))
+CATEGORIZER_CONCURRENCY = int(os.getenv("FINOVA_CATEGORIZER_CONCURRENCY", "4"))
+CATEGORIZER_MAX_ATTEMPTS = 3
+
 # Fail fast if DB_NAME is not provided
 if not DB_NAME:
     raise RuntimeError("Environment variable FINOVA_DB_NAME is required but not set or empty. Please set FINOVA_DB_NAME before running.")
@@ -56,36 +44,13 @@ def clean_json(text: str) -> str:
 async def run_agent1_email_monitor():
     print("=== Agent 1: Email Monitoring ===")
 
-    session_service = InMemorySessionService()
-    memory_service = InMemoryMemoryService()
-
-    runner = Runner(
-        agent=email_monitor_agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-        memory_service=memory_service,
-    )
-
-    await runner.session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=SESSION_ID_EMAIL,
-    )
-
-    user_message = types.Content(
-        role="user",
-        parts=[types.Part(text="Fetch the latest bank statement email and return JSON.")],
-    )
-
-    final_text = "(no final response received)"
+    from agents.agent1_email_monitor import email_monitor_agent
+    from agents.runtime import invoke
 
-    async for event in runner.run_async(
-        user_id=USER_ID,
-        session_id=SESSION_ID_EMAIL,
-        new_message=user_message,
-    ):
-        if event.is_final_response() and event.content and event.content.parts:
-            final_text = event.content.parts[0].text
+    final_text = await invoke(
+        email_monitor_agent,
+        "Fetch the latest bank statement email and return JSON.",
+    ) or "(no final response received)"
 
     print("\n--- Agent 1 Final JSON Output ---")
     print(final_text)
@@ -99,27 +64,34 @@ async def run_agent1_email_monitor():
 # AGENT 2 — CLASSIFIER
 # ============================================================
 async def run_agent2_classifier(email_json: dict):
-    print("=== Agent 2: Bank + Statement Type Classifier ===")
+    """
+    Works out bank_name and statement_type for a statement email.
 
-    from agents.agent2_classifier import bank_classifier_agent
+    Known senders are answered from the local sender index
+    (Tools/sender_index.py); only unknown senders go to
+    bank_classifier_agent, and its answer is added to the index.
+    """
+    print("=== Agent 2: Bank + Statement Type Classifier ===")
 
-    session_service = InMemorySessionService()
-    memory_service = InMemoryMemoryService()
+    from Tools.sender_index import classify_email, learn_sender
 
-    runner = Runner(
-        agent=bank_classifier_agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-        memory_service=memory_service,
-    )
+    classification = classify_email(email_json)
+    if classification is not None:
+        from Tools.metrics import get_registry, record_cache_hit
 
-    session_id = "session_classifier_1"
+        if classification["source"] == "email":
+            learn_sender(email_json, classification)
+        final_text = json.dumps(classification)
+        # Answered by the index instead of bank_classifier_agent
+        get_registry().incr("cache_hits", cache="sender_index")
+        record_cache_hit("agent", "bank_classifier_agent", response=final_text)
+        print(f"\n--- Agent 2 Output (from {classification['source']}, no LLM call) ---")
+        print(final_text)
+        print("----------------------")
+        return final_text
 
-    await runner.session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=session_id,
-    )
+    from agents.agent2_classifier import bank_classifier_agent
+    from agents.runtime import invoke
 
     instruction = f"""
 You are Agent 2: Classifier.
@@ -142,20 +114,12 @@ Your job:
 }}
 """
 
-    user_message = types.Content(
-        role="user",
-        parts=[types.Part(text=instruction)],
-    )
-
-    final_text = "(no classifier output)"
+    final_text = await invoke(bank_classifier_agent, instruction) or "(no classifier output)"
 
-    async for event in runner.run_async(
-        user_id=USER_ID,
-        session_id=session_id,
-        new_message=user_message,
-    ):
-        if event.is_final_response() and event.content:
-            final_text = event.content.parts[0].text
+    try:
+        learn_sender(email_json, json.loads(clean_json(final_text)))
+    except (ValueError, AttributeError) as e:
+        print(f"Could not add classifier answer to the sender index: {e}")
 
     print("\n--- Agent 2 Output ---")
     print(final_text)
@@ -167,28 +131,37 @@ Your job:
 # ============================================================
 # AGENT 3 — STORAGE AGENT - SAVE INTO MONGODB
 # ============================================================
-async def save_transactions(json_content: str, filename: str) -> bool:
+async def save_transactions(json_content: str, filename: str) -> dict:
+    """
+    Store parsed transactions and their uploaded_files record with batched,
+    unordered inserts (see save_upload). Returns the insert report.
+    """
+    from Tools.mongo_tools import save_upload
 
-    from agents.agent3_storage import storage_agent
-    
-    client = get_mongo_client()
-    db = client[os.getenv("FINOVA_DB_NAME")]
-    col = db["transactions"]
-    uploads_col = db["uploaded_files"]
-    txn_count = len(json_content["transactions"])
-
-    # Insert transactions
-    for tx in json_content["transactions"]:
-        col.insert_one(tx)
-
-    # Save upload info
-    uploads_col.insert_one({
-        "filename": filename,
-        "uploaded_at": pd.Timestamp.now().strftime("%Y-%m-%d %H:%M:%S"),
-        "transaction_count": len(json_content["transactions"]),
-        "bank_name": "User Upload"
-    })
-    return True
+    result = save_upload(
+        db_name=os.getenv("FINOVA_DB_NAME"),
+        filename=filename,
+        batches=[json_content["transactions"]],
+    )
+    print(f"stored {result['inserted_count']} txns in {result['batch_count']} batches "
+          f"({result['failed_count']} rejected)")
+    return result
+
+
+def save_transaction_batches(batches, filename: str) -> dict:
+    """
+    Streaming counterpart of save_transactions.
+
+    Consumes transaction batches (e.g. from iter_parse_file) as they are
+    produced and inserts each one, then records the upload with the total count.
+    """
+    from Tools.mongo_tools import save_upload
+
+    return save_upload(
+        db_name=os.getenv("FINOVA_DB_NAME"),
+        filename=filename,
+        batches=batches,
+    )
 
 
 # ============================================================
@@ -197,37 +170,18 @@ async def save_transactions(json_content: str, filename: str) -> bool:
 async def run_agent6_categorizer(csv_content: str) -> str:
     """
     Takes a CSV file as string input and returns the same CSV with an additional 'category' column.
+
+    See categorize_dataframe for how rows are categorized.
     
     Args:
         csv_content (str): CSV file content as a string
     
     Returns:
-        str: CSV content with added 'category' column
+        str: CSV content with added 'category' and 'category_source' columns
     """
-    print("=== Agent 6: Transaction Categorization ===")
-    
-    from agents.agent6_categorizer import txn_categorizer_agent
     import pandas as pd
     from io import StringIO
     
-    session_service = InMemorySessionService()
-    memory_service = InMemoryMemoryService()
-    
-    runner = Runner(
-        agent=txn_categorizer_agent,
-        app_name=APP_NAME,
-        session_service=session_service,
-        memory_service=memory_service,
-    )
-    
-    session_id = "session_categorizer_1"
-    
-    await runner.session_service.create_session(
-        app_name=APP_NAME,
-        user_id=USER_ID,
-        session_id=session_id,
-    )
-    
     # Parse CSV to understand structure
     try:
         df = pd.read_csv(StringIO(csv_content))
@@ -236,60 +190,239 @@ async def run_agent6_categorizer(csv_content: str) -> str:
     except Exception as e:
         print(f"Error parsing CSV: {e}")
         return csv_content
+
+    df = await categorize_dataframe(df)
+    return df.to_csv(index=False)
+
+
+async def categorize_dataframe(df):
+    """
+    Adds 'category' and 'category_source' columns to a transactions DataFrame.
+
+    Obvious transactions are categorized locally by the keyword rules in
+    Tools/category_rules.py, then looked up in the persistent category
+    cache, then predicted by the local trained classifier where it is
+    confident. Only one description per distinct merchant key (see
+    Tools/merchant_tools.py) still unlabelled is sent to the LLM, as
+    (id, description) pairs; it answers with an id → category
+    mapping that is joined back onto the rows locally, so amounts and dates
+    never pass through the model. LLM answers are written back to the cache.
+    'category_source' records which path ('rule', 'cache', 'model' or
+    'llm') labelled each row.
+    """
+    print("=== Agent 6: Transaction Categorization ===")
+
+    import pandas as pd
+    from Tools.category_cache import cache_keys, get_category_cache
+    from Tools.category_rules import categorize_by_rules
+    from Tools.csv_tools import COLUMN_ALIASES, find_column
+    from Tools.txn_classifier import CONFIDENCE_THRESHOLD, get_txn_classifier
+
+    df = df.copy()
+    input_columns = [c for c in df.columns if c not in ("category", "category_source")]
+
+    # Text the categorizer sees per row: the description, or the whole row if there is none
+    desc_col = find_column(df, COLUMN_ALIASES["description"])
+    if desc_col is not None:
+        descriptions = df[desc_col].astype(str)
+    else:
+        descriptions = df[input_columns].astype(str).agg(" | ".join, axis=1)
+
+    # Fast path: local keyword rules
+    df["category"] = categorize_by_rules(descriptions)
+    df["category_source"] = df["category"].notna().map({True: "rule", False: None})
+
+    pending = df["category"].isna()
+    print(f"Rules categorized {int((~pending).sum())} of {len(df)} rows")
+
+    # Cached answers from earlier LLM calls
+    cache = get_category_cache()
+    if pending.any():
+        cached = pd.Series(cache.lookup(descriptions[pending]), index=df.index[pending])
+        hits = cached.dropna().index
+        df.loc[hits, "category"] = cached[hits]
+        df.loc[hits, "category_source"] = "cache"
+        pending = df["category"].isna()
+        print(f"Cache categorized {len(hits)} rows ({cache.stats()})")
+
+    # Local trained classifier, for the rows it is confident about
+    classifier = get_txn_classifier()
+    if classifier is not None and pending.any():
+        unique_descriptions = descriptions[pending].unique().tolist()
+        labels, confidences = classifier.predict(unique_descriptions)
+        confident = {
+            desc: label
+            for desc, label, confidence in zip(unique_descriptions, labels, confidences)
+            if confidence >= CONFIDENCE_THRESHOLD
+        }
+        predicted = descriptions[pending].map(confident).dropna()
+        df.loc[predicted.index, "category"] = predicted
+        df.loc[predicted.index, "category_source"] = "model"
+        pending = df["category"].isna()
+        print(f"Classifier categorized {len(predicted)} rows (threshold {CONFIDENCE_THRESHOLD})")
+
+    # Slow path: one description per distinct merchant goes to the LLM once
+    if pending.any():
+        if "merchant_key" in df.columns:
+            keys = df["merchant_key"].where(df["merchant_key"].notna(), descriptions)
+        else:
+            keys = pd.Series(cache_keys(descriptions), index=df.index)
+
+        representatives = descriptions[pending].groupby(keys[pending], sort=False).first()
+        unique_descriptions = representatives.tolist()
+        categories, sources = await _categorize_descriptions_with_llm(unique_descriptions)
+
+        category_by_key = dict(zip(representatives.index, categories))
+        source_by_key = dict(zip(representatives.index, sources))
+        df.loc[pending, "category"] = keys[pending].map(category_by_key)
+        df.loc[pending, "category_source"] = keys[pending].map(source_by_key)
+
+        answered = [i for i, source in enumerate(sources) if source == "llm"]
+        cache.store([unique_descriptions[i] for i in answered], [categories[i] for i in answered])
+
+    from Tools.metrics import get_registry
+
+    registry = get_registry()
+    for source, rows in df["category_source"].value_counts().items():
+        registry.incr("categorized_rows", int(rows), source=source)
+
+    print("\n--- Agent 6 Output ---")
+    print("Categorized transactions generated successfully")
+    print("----------------------")
+
+    return df
+
+
+async def _categorize_descriptions_with_llm(descriptions: list) -> tuple:
+    """
+    Categorizes descriptions with txn_categorizer_agent in fixed-size chunks.
+
+    Each description gets a row id (its position in `descriptions`).
+    Chunks of CATEGORIZER_CHUNK_SIZE run concurrently (at most
+    CATEGORIZER_CONCURRENCY at a time) through the shared agent runtime,
+    each in its own session. Every chunk is validated and retried on its own, and the
+    results are stitched back together by id.
+
+    Returns:
+        (categories, sources): one entry per description; source is 'llm',
+        or 'fallback' when a chunk kept failing or the model answered with
+        a label outside STANDARD_CATEGORIES, and the row was set to 'Other'.
+    """
+    semaphore = asyncio.Semaphore(CATEGORIZER_CONCURRENCY)
+
+    items = list(enumerate(descriptions))
+    chunks = [
+        items[start:start + CATEGORIZER_CHUNK_SIZE]
+        for start in range(0, len(items), CATEGORIZER_CHUNK_SIZE)
+    ]
+    print(f"Sending {len(items)} distinct descriptions to the LLM in {len(chunks)} chunks "
+          f"(concurrency {CATEGORIZER_CONCURRENCY})")
+
+    from Tools.llm_scheduler import lane
+
+    # Background lane: interactive chat requests are served first
+    with lane("background"):
+        results = await asyncio.gather(*(
+            _categorize_chunk(semaphore, chunk, index)
+            for index, chunk in enumerate(chunks)
+        ))
+
+    categories, sources = [], []
+    for chunk_categories, chunk_sources in results:
+        categories.extend(chunk_categories)
+        sources.extend(chunk_sources)
+    return categories, sources
+
+
+def _get_categorizer_agent():
+    from agents.agent6_categorizer import txn_categorizer_agent
+    return txn_categorizer_agent
+
+
+async def _categorize_chunk(semaphore, chunk: list, index: int) -> tuple:
+    """
+    Categorizes one chunk of (id, description) pairs, asking again only
+    when the model's mapping is not valid JSON or misses ids. Transport and
+    rate-limit errors are already retried by the LLM scheduler; when they
+    still fail, the chunk falls back to 'Other' without more calls. Labels
+    outside STANDARD_CATEGORIES become 'Other' with source 'fallback', so
+    they never reach the category cache.
+
+    Returns:
+        (categories, sources) of the chunk's rows, in order.
+    """
+    from Tools.category_rules import standard_category
+    from Tools.metrics import get_registry, retry_attempt
+
+    # Chunks are counted on their own; the model calls inside them are
+    # already recorded by the agent runtime, with the earlier attempts as retries
+    registry = get_registry()
+    for attempt in range(1, CATEGORIZER_MAX_ATTEMPTS + 1):
+        if attempt > 1:
+            registry.incr("categorizer_chunk_retries")
+        try:
+            async with semaphore:
+                with retry_attempt(attempt):
+                    mapping = await _ask_categorizer(chunk)
+
+            missing = [row_id for row_id, _ in chunk if not mapping.get(str(row_id))]
+            if missing:
+                raise ValueError(f"no category for ids {missing[:5]}")
+
+            registry.incr("categorizer_chunks", status="ok")
+            labels = [standard_category(mapping[str(row_id)]) for row_id, _ in chunk]
+            unknown = sum(label is None for label in labels)
+            if unknown:
+                print(f"Chunk {index}: {unknown} labels outside the standard categories; using 'Other'")
+                registry.incr("categorizer_unknown_labels", unknown)
+            return ([label or "Other" for label in labels],
+                    ["llm" if label else "fallback" for label in labels])
+        except ValueError as e:
+            # Bad or partial mapping (json.JSONDecodeError is a ValueError)
+            print(f"Chunk {index} attempt {attempt} failed: {e}")
+        except Exception as e:
+            print(f"Chunk {index} failed after the scheduler's retries: {e}")
+            break
+
+    print(f"Chunk {index} could not be categorized; using 'Other'")
+    registry.incr("categorizer_chunks", status="fallback")
+    return ["Other"] * len(chunk), ["fallback"] * len(chunk)
+
+
+async def _ask_categorizer(chunk: list) -> dict:
+    """
+    Sends (id, description) pairs to txn_categorizer_agent in a fresh
+    session and returns its {id: category} answer.
+    """
+    from Tools.category_rules import STANDARD_CATEGORIES
+    from agents.runtime import invoke
+
+    categories = "\n".join(f"   - {category}" for category in STANDARD_CATEGORIES)
+    rows = json.dumps([{"id": row_id, "description": desc} for row_id, desc in chunk])
     
     # Create instruction for the agent
     instruction = f"""
 You are Agent 6: Transaction Categorizer.
 
 Your job:
-1. Analyze the CSV data below and categorize each transaction
-2. Add appropriate categories based on transaction descriptions, amounts, and patterns
-3. Use these standard categories when possible:
-   - Groceries
-   - Transport
-   - Dining
-   - Shopping
-   - Bills & Utilities
-   - Healthcare
-   - Entertainment
-   - Rent
-   - Salary
-   - Transfer
-   - Investment
-   - Other
-
-4. Return the EXACT same CSV structure with one additional column called 'category' at the end
-5. Do NOT include any explanations or markdown formatting
-6. Return ONLY the CSV content with headers
-
-CSV Data:
-{csv_content}
-
-Return the categorized CSV:
+1. Categorize each transaction below based on its description
+2. Use these standard categories when possible:
+{categories}
+
+3. Return ONLY a JSON object mapping every id (as a string) to its category, e.g.
+{{"0": "Dining", "1": "Salary"}}
+4. Do NOT include any explanations or markdown formatting
+
+Transactions:
+{rows}
 """
     
-    user_message = types.Content(
-        role="user",
-        parts=[types.Part(text=instruction)],
-    )
-    
-    final_text = "(no categorizer output)"
-    
-    async for event in runner.run_async(
-        user_id=USER_ID,
-        session_id=session_id,
-        new_message=user_message,
-    ):
-        if event.is_final_response() and event.content:
-            final_text = event.content.parts[0].text
-    
-    print("\n--- Agent 6 Output ---")
-    print("Categorized CSV generated successfully")
-    print("----------------------")
+    final_text = await invoke(_get_categorizer_agent(), instruction) or "(no categorizer output)"
     
-    # Clean up the response to ensure it's valid CSV
-    cleaned_output = clean_csv_response(final_text)
-    return cleaned_output
+    mapping = json.loads(clean_json(final_text))
+    if not isinstance(mapping, dict):
+        raise ValueError(f"expected a JSON object, got {type(mapping).__name__}")
+    return mapping
 
 
 def clean_csv_response(text: str) -> str:
@@ -346,6 +479,8 @@ def categorize_csv_file(input_csv_path: str, output_csv_path: str = None) -> str
 # Parse file
 # ============================================================
 def parse_file(email_json, classifier_json):
+    from Tools.csv_tools import parse_statement_csv
+
     attachment_path = email_json["attachment_path"]
     bank_name = classifier_json["bank_name"]
     account_id = "ACC123"
@@ -368,78 +503,150 @@ def parse_file(email_json, classifier_json):
     return transactions
 
 
+def iter_parse_file(email_json, classifier_json, chunksize=None):
+    """
+    Streaming variant of parse_file: yields batches of at most `chunksize`
+    (default DEFAULT_CHUNK_SIZE) normalized transactions instead of
+    returning one big list.
+    """
+    from Tools.csv_tools import DEFAULT_CHUNK_SIZE, iter_statement_csv
+
+    attachment_path = email_json["attachment_path"]
+    bank_name = classifier_json["bank_name"]
+    account_id = "ACC123"
+
+    yield from iter_statement_csv(
+        path=attachment_path,
+        bank_name=bank_name,
+        account_id=account_id,
+        chunksize=chunksize or DEFAULT_CHUNK_SIZE,
+    )
+
+
 # ============================================================
 # MAIN PIPELINE
 # ============================================================
 async def main():
+    """
+    Runs the pipeline as a stage graph (Tools/stage_graph.py):
 
-    # ---------------------------------------
-    # Agent 1 — Email Monitor
-    # ---------------------------------------
+        email → classify → parse ─┬→ store → sample
+                                  ├→ charts
+                                  └→ categorize → category_charts
+
+    Storing and the charts that don't need categories (balance trend,
+    totals, top and recurring merchants) only need the parsed transactions,
+    so they run alongside categorization; only the category chart waits
+    for it. pymongo, matplotlib and file I/O run in worker threads. Per-stage timings and the critical path are printed
+    at the end.
+    """
+    from Tools.mongo_indexes import ensure_indexes_in_background
+    from Tools.stage_graph import StageGraph
+
+    # Indexes are created once at startup, alongside the first stages
+    ensure_indexes_in_background(DB_NAME)
+
+    graph = StageGraph()
+    graph.add("email", _stage_email)
+    graph.add("classify", _stage_classify, inputs=["email"])
+    graph.add("parse", parse_file, inputs=["email", "classify"], blocking=True)
+    graph.add("store", _stage_store, inputs=["parse"], blocking=True)
+    graph.add("sample", _stage_sample, inputs=["store"], blocking=True)
+    graph.add("categorize", _stage_categorize, inputs=["parse"])
+    graph.add("charts", _stage_charts, inputs=["parse"], blocking=True)
+    graph.add("category_charts", _stage_category_charts, inputs=["categorize"], blocking=True)
+
+    try:
+        await graph.run()
+    finally:
+        print("\n=== Pipeline timings ===")
+        print(graph.report())
+
+
+# ---------------------------------------
+# Agent 1 — Email Monitor
+# ---------------------------------------
+async def _stage_email():
     email_json_text = await run_agent1_email_monitor()
-    email_json = json.loads(email_json_text)
+    return json.loads(email_json_text)
+
 
-    # ---------------------------------------
-    # Agent 2 — Classifier
-    # ---------------------------------------
+# ---------------------------------------
+# Agent 2 — Classifier
+# ---------------------------------------
+async def _stage_classify(email_json):
     classifier_json_text = await run_agent2_classifier(email_json)
-    classifier_clean = clean_json(classifier_json_text)
-    classifier_json = json.loads(classifier_clean)
+    return json.loads(clean_json(classifier_json_text))
 
-    # ---------------------------------------
-    # Agent 3 — CSV Parsing
-    # ---------------------------------------
-    transactions = parse_file(email_json, classifier_json)
 
-    # ---------------------------------------
-    # Agent 3.3 — MongoDB Insert
-    # ---------------------------------------
+# ---------------------------------------
+# Agent 3.3 — MongoDB Insert
+# ---------------------------------------
+def _stage_store(transactions):
     print("\n=== Agent 3.3: Storing Transactions into MongoDB ===")
-    from Tools.mongo_tools import insert_transactions, list_transactions
- 
+    from Tools.mongo_tools import insert_transactions
+
+    # insert_many adds _id to the dicts it is given; the other branches share these
     result = insert_transactions(
         db_name=DB_NAME,
         collection_name="transactions",
-        transactions=transactions,
+        transactions=[dict(tx) for tx in transactions],
     )
-
     print(result)
+    return result
+
+
+def _stage_sample(insert_result):
+    from Tools.mongo_tools import list_transactions
 
     print("\n=== Sample from Mongo ===")
     sample = list_transactions(DB_NAME, "transactions", limit=3)
     for doc in sample:
         print(doc)
+    return sample
 
-        # ---------------------------------------
-    # Agent 4 — Charts and Insights
-    # ---------------------------------------
-    print("\n=== Agent 4: Generating charts and insights ===")
-    summary_text, chart_paths = generate_insight_charts(transactions)
 
-    print(summary_text)
-    print("\nCharts saved:")
-    for name, path in chart_paths.items():
-        print(f"  - {name}: {path}")
-
-    # ---------------------------------------
-    # Agent 6 — Transaction Categorization (Optional Demo)
-    # ---------------------------------------
+# ---------------------------------------
+# Agent 6 — Transaction Categorization (Optional Demo)
+# ---------------------------------------
+async def _stage_categorize(transactions):
     print("\n=== Agent 6: Transaction Categorization Demo ===")
-    
-    # Convert transactions to CSV format for demonstration
     import pandas as pd
+
     df_transactions = pd.DataFrame(transactions)
-    csv_content = df_transactions.to_csv(index=False)
-    
-    # Categorize the transactions
-    categorized_csv = await run_agent6_categorizer(csv_content)
-    
+    categorized = await categorize_dataframe(df_transactions)
+
     # Save categorized results
     output_path = "categorized_transactions.csv"
-    with open(output_path, 'w', encoding='utf-8') as file:
-        file.write(categorized_csv)
-    
+    await asyncio.to_thread(categorized.to_csv, output_path, index=False)
+
     print(f"Categorized transactions saved to: {output_path}")
+    return categorized.to_dict("records")
+
+
+# ---------------------------------------
+# Agent 4 — Charts and Insights
+# ---------------------------------------
+def _stage_charts(transactions):
+    print("\n=== Agent 4: Generating charts and insights ===")
+    from Tools.chart_tools import generate_flow_charts
+
+    return _print_charts(*generate_flow_charts(transactions))
+
+
+def _stage_category_charts(transactions):
+    print("\n=== Agent 4: Generating category charts ===")
+    from Tools.chart_tools import generate_category_charts
+
+    return _print_charts(*generate_category_charts(transactions))
+
+
+def _print_charts(summary_text, chart_paths):
+    print(summary_text)
+    print("\nCharts saved:")
+    for name, path in chart_paths.items():
+        print(f"  - {name}: {path}")
+    return chart_paths
 
 
 # ============================================================
@@ -0,0 +1,40 @@
+import pytest
+
+import Tools.category_cache as category_cache
+from Tools.category_cache import KEY_VERSION, CategoryCache
+
+
+@pytest.fixture
+def cache_file(monkeypatch):
+    stored = {}
+    monkeypatch.setattr(category_cache, "load_json", lambda filename, default=None: stored.get(filename, default))
+    monkeypatch.setattr(category_cache, "save_json",
+                        lambda filename, data: stored.__setitem__(filename, data))
+    return stored
+
+
+def test_round_trip_keeps_key_version(cache_file):
+    cache = CategoryCache(use_mongo=False)
+    cache.store(["UPI-1234567890-ZOMATO ORDER"], ["Dining"])
+    assert cache_file["category_cache.json"]["key_version"] == KEY_VERSION
+    assert CategoryCache(use_mongo=False).lookup(["UPI-5550001111-ZOMATO"]) == ["Dining"]
+
+
+def test_unversioned_description_keys_are_migrated(cache_file):
+    # Saved before merchant keys: letters-only descriptions, no version
+    cache_file["category_cache.json"] = {"entries": [["UPI AMAZON INDIA PAYMENT", "Shopping"]]}
+    cache = CategoryCache(use_mongo=False)
+    assert cache.lookup(["UPI-1234567890-AMAZON INDIA PAYMENT"]) == ["Shopping"]
+    assert cache_file["category_cache.json"]["key_version"] == KEY_VERSION
+
+
+def test_newer_key_version_is_dropped(cache_file):
+    cache_file["category_cache.json"] = {"key_version": KEY_VERSION + 1, "entries": [["AMAZON", "Shopping"]]}
+    assert CategoryCache(use_mongo=False).lookup(["AMAZON"]) == [None]
+
+
+def test_payments_naming_no_payee_are_not_cached(cache_file):
+    cache = CategoryCache(use_mongo=False)
+    cache.store(["UPI/1112223334/Payment from Phone"], ["Transfer"])
+    assert cache.lookup(["UPI/5556667778/Payment from Phone", "UPI PAYMENT"]) == [None, None]
+    assert cache.stats()["size"] == 0
@@ -0,0 +1,35 @@
+from Tools.category_rules import categorize_by_rules, standard_category
+
+
+def test_atm_rule():
+    assert categorize_by_rules(["ATM CASH WITHDRAWAL 1234", "ATM-WDL-HDFC"]) == ["Transfer", "Transfer"]
+
+
+def test_atm_inside_words_is_not_a_transfer():
+    categories = categorize_by_rules(["DENTAL TREATMENT", "PHARMATM STORE"])
+    assert "Transfer" not in categories
+
+
+def test_ambiguous_descriptions_go_to_the_llm():
+    assert categorize_by_rules(["AMAZON REFUND"]) == [None]
+
+
+def test_payment_channels_and_deposits_are_not_transfers():
+    categories = categorize_by_rules([
+        "NEFT DR - ACME TRADERS INVOICE",
+        "IMPS- TO 8123456789 - SHARMA STORES",
+        "NEFT-N123-LIC PREMIUM",
+        "ATM CASH DEPOSIT",
+    ])
+    assert "Transfer" not in categories
+
+
+def test_own_account_transfers():
+    assert categorize_by_rules(["SELF TRANSFER TO SAVINGS", "FUND TRANSFER 00123"]) == ["Transfer", "Transfer"]
+
+
+def test_model_labels_map_to_standard_categories():
+    assert standard_category(" dining ") == "Dining"
+    assert standard_category("Bills and Utilities") == "Bills & Utilities"
+    assert standard_category("Food & Drinks") is None
+    assert standard_category(None) is None
@@ -0,0 +1,29 @@
+import pandas as pd
+
+from Tools.csv_tools import _parse_date_column, detect_date_formats
+
+
+def test_detected_format_converts_column():
+    stats = {}
+    dates = _parse_date_column(pd.Series(["03/04/2025", "15/04/2025"]), ["%d/%m/%Y"], stats)
+    assert dates == ["2025-04-03", "2025-04-15"]
+    assert stats == {"date_parse_failures": 0, "date_lenient_parses": 0}
+
+
+def test_values_outside_detected_formats_are_failures_not_guesses():
+    stats = {}
+    dates = _parse_date_column(pd.Series(["03/04/2025", "April 5th 2025", "03/04/2025"]),
+                               ["%d/%m/%Y"], stats)
+    assert dates == ["2025-04-03", "NaT", "2025-04-03"]
+    assert stats["date_parse_failures"] == 1
+    assert stats["date_lenient_parses"] == 0
+
+
+def test_lenient_parse_only_without_formats():
+    stats = {}
+    series = pd.Series(["April 5th 2025", "not a date"])
+    assert detect_date_formats(series) == []
+    dates = _parse_date_column(series, [], stats)
+    assert dates[1] == "NaT"
+    assert stats["date_lenient_parses"] == 1
+    assert stats["date_parse_failures"] == 1
@@ -0,0 +1,46 @@
+import pytest
+
+from Tools.merchant_tools import merchant_key, normalize_merchants
+
+
+@pytest.mark.parametrize("description, expected", [
+    ("UPI-1234567890-AMAZON INDIA PAYMENT", "AMAZON"),
+    ("UPI-123456789-ZOMATO ORDER", "ZOMATO"),
+    ("UPI/9876543210/SWIGGY@YBL/Payment from Phone", "SWIGGY"),
+    ("UPI-RAJ.KUMAR@OKAXIS-Sent using Paytm UPI", "RAJ KUMAR"),
+    ("POS CARD PURCHASE - BIG BAZAAR GHAZIABAD", "BIG BAZAAR"),
+    ("POS 4111XXXX1234 STARBUCKS MUMBAI", "STARBUCKS"),
+    ("NEFT-N123456789-ACME PVT LTD", "ACME"),
+    ("NEFT/HDFC0001234/ACME CORP", "ACME CORP"),
+])
+def test_merchant_key_formats(description, expected):
+    assert merchant_key(description) == expected
+
+
+def test_same_merchant_collapses_across_references():
+    keys = normalize_merchants([
+        "UPI-1234567890-ZOMATO ORDER",
+        "UPI-5550001111-ZOMATO ORDER",
+        "UPI/7771112222/ZOMATO",
+    ])["merchant_key"]
+    assert set(keys) == {"ZOMATO"}
+
+
+def test_channel_and_counterparty():
+    row = normalize_merchants(["UPI-1234567890-AMAZON INDIA PAYMENT"]).iloc[0]
+    assert row["channel"] == "UPI"
+    assert row["counterparty"] == "1234567890"
+
+
+def test_fallback_strips_channel_and_noise():
+    # Only letters mixed with digits: the main path leaves nothing
+    assert merchant_key("UPI-AB12CD-PAYMENT TO RAJ99") == "AB CD RAJ"
+
+
+
+def test_payments_naming_no_payee_do_not_share_a_key():
+    # Keyed on the payee's UPI handle when there is one
+    assert merchant_key("UPI/9876543210@YBL/Payment from Phone") == "9876543210@YBL"
+    # Nothing but channel and noise words: no key at all
+    assert merchant_key("UPI PAYMENT") is None
+    assert merchant_key("UPI/4455667788/Payment from Phone") is None
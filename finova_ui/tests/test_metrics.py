@@ -0,0 +1,49 @@
+import asyncio
+
+import pytest
+
+import Tools.llm_scheduler as llm_scheduler
+import Tools.metrics as metrics
+from Tools.llm_scheduler import LlmScheduler
+from Tools.metrics import MetricsRegistry, record_cache_hit, retry_attempt, track_call
+
+
+@pytest.fixture(autouse=True)
+def registry(monkeypatch):
+    registry = MetricsRegistry(jsonl_path="")
+    monkeypatch.setattr(metrics, "_registry", registry)
+    return registry
+
+
+def test_scheduler_retries_are_counted_on_the_call(monkeypatch, registry):
+    monkeypatch.setattr(llm_scheduler, "BACKOFF_BASE_SECONDS", 0)
+    failures = [TimeoutError("slow"), TimeoutError("slow")]
+
+    def generate():
+        if failures:
+            raise failures.pop()
+        return "ok"
+
+    with track_call("generate_content", "chat"):
+        assert LlmScheduler(requests_per_minute=600).run_sync(generate) == "ok"
+
+    assert registry.recent(1)[0]["retries"] == 2
+    assert 'finova_model_call_retries_total{kind="generate_content",name="chat"} 2' in registry.to_prometheus()
+
+
+def test_earlier_attempts_of_a_retry_loop_are_retries(registry):
+    async def ask():
+        with track_call("agent", "txn_categorizer_agent"):
+            pass
+
+    with retry_attempt(3):
+        asyncio.run(ask())
+    asyncio.run(ask())
+
+    assert [call["retries"] for call in registry.recent(2)] == [0, 2]
+
+
+def test_cache_hits_are_recorded_as_calls(registry):
+    record_cache_hit("generate_content", "chat", prompt="spend in april?", response="1,200")
+    assert registry.recent(1)[0]["cache_hit"] is True
+    assert 'finova_model_call_cache_hits_total{kind="generate_content",name="chat"} 1' in registry.to_prometheus()
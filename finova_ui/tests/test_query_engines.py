@@ -0,0 +1,55 @@
+import pytest
+
+from Tools.query_tools import NO_MERCHANT, parse_query, run_query, run_query_mongo
+
+mongomock = pytest.importorskip("mongomock")
+
+TRANSACTIONS = [
+    {"date": "2024-04-01", "description": "UPI-1234567890-SWIGGY", "debit": 450.0, "credit": 0.0,
+     "category": "Dining", "account_id": "SAV001", "merchant_key": "SWIGGY"},
+    {"date": "2024-04-03", "description": "UPI-5550001111-SWIGGY", "debit": 300.0, "credit": 0.0,
+     "category": "Dining", "account_id": "SAV001", "merchant_key": "SWIGGY"},
+    {"date": "2024-04-05", "description": "UPI PAYMENT", "debit": 2000.0, "credit": 0.0,
+     "category": "Transfer", "account_id": "SAV001", "merchant_key": None},
+    {"date": "2024-04-09", "description": "UPI/4455667788/Payment from Phone", "debit": 120.0,
+     "credit": 0.0, "category": "Transfer", "account_id": "SAV001", "merchant_key": ""},
+    # Stored before merchant keys were extracted
+    {"date": "2024-04-12", "description": "POS STARBUCKS MUMBAI", "debit": 80.0, "credit": 0.0,
+     "category": "Dining", "account_id": "SAV001"},
+]
+
+
+class Uncollated:
+    """mongomock collection that ignores collations (it doesn't support them everywhere)."""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    def aggregate(self, pipeline, collation=None):
+        return self.collection.aggregate(pipeline)
+
+    def count_documents(self, query, collation=None):
+        return self.collection.count_documents(query)
+
+
+@pytest.fixture
+def collection():
+    collection = mongomock.MongoClient().db.transactions
+    collection.insert_many([dict(txn) for txn in TRANSACTIONS])
+    return Uncollated(collection)
+
+
+@pytest.mark.parametrize("spec", [
+    {"group_by": "merchant"},
+    {"group_by": "merchant", "aggregate": "count"},
+    {"merchant": "swiggy", "aggregate": "count"},
+    {"merchant": "starbucks"},
+])
+def test_both_engines_agree(collection, spec):
+    query = parse_query(spec)
+    assert run_query_mongo(collection, query) == run_query(TRANSACTIONS, query)
+
+
+def test_missing_merchant_is_one_group(collection):
+    groups = run_query_mongo(collection, parse_query({"group_by": "merchant"}))["groups"]
+    assert {"key": NO_MERCHANT, "value": 2200.0} in groups
@@ -0,0 +1,74 @@
+import Tools.search_index as search_index
+from Tools.search_index import TransactionIndex
+
+
+def purchase(key, **fields):
+    return {"dedup_key": key, "date": "2024-04-03", "description": "STARBUCKS", "debit": 250.0,
+            "credit": 0.0, "category": "Dining", **fields}
+
+
+def test_equal_purchases_are_both_counted():
+    index = TransactionIndex()
+    assert index.add([purchase("a"), purchase("b")]) == 2
+    assert index.context("starbucks")["monthly_totals"]["2024-04"]["debit"] == 500.0
+
+
+def test_same_stored_row_is_indexed_once():
+    index = TransactionIndex()
+    index.add([purchase("a")])
+    assert index.add([purchase("a")]) == 0
+
+
+def test_rebuilt_when_data_version_changes(monkeypatch):
+    version = {"value": "v1"}
+    rows = [purchase("a")]
+    monkeypatch.setattr(search_index, "data_version", lambda: version["value"])
+    monkeypatch.setattr(search_index, "_index", None)
+
+    assert len(search_index.get_search_index(lambda: list(rows))) == 1
+    rows.append(purchase("b"))
+    assert len(search_index.get_search_index(lambda: list(rows))) == 1
+
+    version["value"] = "v2"
+    assert len(search_index.get_search_index(lambda: list(rows))) == 2
+
+
+class FakeCollection:
+    def __init__(self):
+        self.documents = []
+
+    def with_options(self, **kwargs):
+        return self
+
+    def insert_many(self, documents, ordered=True):
+        self.documents += documents
+
+    def insert_one(self, document):
+        self.documents.append(document)
+
+    def update_one(self, query, update):
+        pass
+
+
+def test_rows_stored_by_this_process_are_added_without_a_reload(monkeypatch, tmp_path):
+    import Tools.local_store as local_store
+    import Tools.mongo_tools as mongo_tools
+
+    collections = {}
+    monkeypatch.setattr(local_store, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(mongo_tools, "get_mongo_client",
+                        lambda: {"db": collections.setdefault("db", {"transactions": FakeCollection(),
+                                                                     "uploaded_files": FakeCollection()})})
+    monkeypatch.setattr(search_index, "_index", None)
+    loads = []
+
+    def loader():
+        loads.append(1)
+        return [purchase("a")]
+
+    assert len(search_index.get_search_index(loader)) == 1
+    mongo_tools.save_upload("db", "april.csv", [[purchase(None, description="SWIGGY", debit=400.0)]])
+
+    index = search_index.get_search_index(loader)
+    assert len(index) == 2 and loads == [1]
+    assert index.search("swiggy")[0]["debit"] == 400.0
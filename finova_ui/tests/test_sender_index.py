@@ -0,0 +1,33 @@
+import pytest
+
+import Tools.sender_index as sender_index
+from Tools.sender_index import classify_email, learn_sender
+
+
+@pytest.fixture(autouse=True)
+def fresh_index(monkeypatch, tmp_path):
+    monkeypatch.setattr(sender_index, "_senders", None)
+    monkeypatch.setattr(sender_index, "save_json", lambda filename, data: str(tmp_path / filename))
+    monkeypatch.setattr(sender_index, "load_json", lambda filename, default=None: default)
+
+
+def email(from_address, subject="Your account statement"):
+    return {"from_address": from_address, "subject": subject}
+
+
+def test_known_bank_domain_and_subdomain():
+    result = classify_email(email("HDFC Alerts <alerts@mail.hdfcbank.net>"))
+    assert result["bank_name"] == "HDFC Bank"
+    assert result["statement_type"] == "savings_account"
+
+
+def test_learned_bank_domain_covers_other_senders():
+    learn_sender(email("estatement@newbank.in"), {"bank_name": "New Bank", "statement_type": "savings_account"})
+    assert classify_email(email("cards@newbank.in"))["bank_name"] == "New Bank"
+
+
+def test_generic_provider_is_learned_per_address():
+    learn_sender(email("My CA <ca.office@gmail.com>"),
+                 {"bank_name": "Small Coop Bank", "statement_type": "savings_account"})
+    assert classify_email(email("ca.office@gmail.com"))["bank_name"] == "Small Coop Bank"
+    assert classify_email(email("someone.else@gmail.com")) is None
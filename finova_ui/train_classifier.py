@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Finova Transaction Classifier Trainer
+
+Trains the local transaction classifier used by Agent 6 before it falls
+back to the LLM, and reports its accuracy and throughput against the
+LLM's labels.
+
+Usage:
+    python train_classifier.py [--full]
+    python train_classifier.py --report [--csv categorized.csv]
+
+Options:
+    --full        Retrain from the whole transactions collection instead of
+                  only the transactions added since the last training run
+    --report      Offline evaluation: hold out the LLM-labelled rows, train on
+                  the rest and compare predictions to the LLM's categories
+    --csv PATH    Read labelled rows from a categorized CSV (output of
+                  categorize_transactions.py) instead of MongoDB
+    --threshold X Confidence threshold used in the report
+
+Example:
+    python train_classifier.py
+    python train_classifier.py --report --csv bank_statement_categorized.csv
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Add current directory to path for imports
+current_dir = os.path.dirname(os.path.abspath(__file__))
+if current_dir not in sys.path:
+    sys.path.append(current_dir)
+
+# Same default as Tools.txn_classifier.CONFIDENCE_THRESHOLD, read here so
+# --help doesn't have to import scikit-learn
+DEFAULT_THRESHOLD = float(os.getenv("FINOVA_CLASSIFIER_THRESHOLD", "0.85"))
+
+
+def load_labelled_rows(csv_path: str = None):
+    """Labelled rows with description, category and category_source columns."""
+    import pandas as pd
+    from Tools.txn_classifier import TRAINABLE_SOURCES
+
+    if csv_path:
+        df = pd.read_csv(csv_path)
+        df.columns = [c.lower().strip() for c in df.columns]
+    else:
+        from Tools.mongo_tools import get_mongo_client
+
+        client = get_mongo_client()
+        collection = client[os.getenv("FINOVA_DB_NAME")]["transactions"]
+        df = pd.DataFrame(list(collection.find(
+            {"category": {"$nin": [None, ""]}},
+            {"_id": 0, "description": 1, "category": 1, "category_source": 1},
+        )))
+
+    if "category_source" not in df.columns:
+        df["category_source"] = None
+    df = df.dropna(subset=["description", "category"])
+    sources = df["category_source"].where(df["category_source"].notna(), None)
+    return df[sources.isin(TRAINABLE_SOURCES)]
+
+
+def report(csv_path: str = None, threshold: float = DEFAULT_THRESHOLD):
+    """Train on non-LLM rows, evaluate against the LLM-labelled rows."""
+    from Tools.txn_classifier import TransactionClassifier, evaluate
+
+    df = load_labelled_rows(csv_path)
+    is_llm = df["category_source"] == "llm"
+    train_df, test_df = df[~is_llm], df[is_llm]
+
+    if train_df.empty or test_df.empty:
+        print("❌ Need both LLM-labelled and other labelled rows for a report.")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    classifier = TransactionClassifier().partial_fit(
+        train_df["description"].tolist(), train_df["category"].tolist()
+    )
+    train_seconds = time.perf_counter() - start
+
+    result = evaluate(classifier, test_df["description"], test_df["category"], threshold)
+
+    print(f"📚 Trained on {len(train_df)} rows in {train_seconds:.2f}s")
+    print(f"🧪 Evaluated on {result['rows']} LLM-labelled rows")
+    print(f"   Accuracy (all rows):          {result['accuracy']:.1%}")
+    print(f"   Coverage at threshold {threshold:.2f}:  {result['coverage']:.1%}")
+    print(f"   Accuracy above threshold:     {result['confident_accuracy']:.1%}")
+    print(f"   Throughput:                   {result['rows_per_second']:,.0f} rows/s")
+
+
+def main():
+    """Main function to handle command line arguments and train or evaluate."""
+    parser = argparse.ArgumentParser(description="Train the local transaction classifier.")
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--report", action="store_true")
+    parser.add_argument("--csv", default=None)
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    args = parser.parse_args()
+
+    try:
+        from Tools.txn_classifier import TransactionClassifier, train_from_mongo
+
+        if args.report:
+            report(args.csv, args.threshold)
+            return
+
+        if args.csv:
+            df = load_labelled_rows(args.csv)
+            classifier = TransactionClassifier().partial_fit(
+                df["description"].tolist(), df["category"].tolist()
+            )
+            path = classifier.save()
+            print(f"✅ Trained on {len(df)} rows from {args.csv}; model saved to {path}")
+            return
+
+        result = train_from_mongo(full=args.full)
+        print(f"✅ Trained on {result['new_rows']} new rows "
+              f"({result['trained_rows']} total) in {result['seconds']:.2f}s")
+    except Exception as e:
+        print(f"❌ Unexpected error: {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()